@@ -7,12 +7,15 @@ import flet as ft
 import os
 import pyperclip
 import threading
+import multiprocessing
 import time
 import logging
 
 # Importiere
 import ocr_recognition
 import rule_engine
+import prc_index
+import debug_dump
 
 # Importiere pytesseract
 from pytesseract import TesseractNotFoundError
@@ -203,16 +206,31 @@ def main(page: ft.Page):
         page.update()
 
     # --- Kernlogik:  ---
+    def list_folder_entries(folder: str) -> list[str]:
+        """Unterordner und .prc-Dateien eines Ordners aus dem Prozess-Index."""
+        listing = prc_index.directory_index.get_listing(os.path.normpath(folder))
+        if listing is None:
+            raise FileNotFoundError(f"Ordner nicht gefunden oder nicht lesbar: {folder}")
+        return [os.path.join(folder, n) for n in sorted(listing.subdirs + listing.prc_files, key=str.lower)]
+
     def load_items(paths_to_load: list[str], highlight_path: str | None = None):
         """Lädt Ordner und .prc-Dateien in die ListView und hebt ggf. hervor."""
         reset_highlights()
         listview.controls.clear()
         dirs, prcs = [], []
         processed_paths = set()
+        entries_by_parent: dict[str, tuple[set[str], set[str]] | None] = {}
 
         for p in paths_to_load:
             try:
-                if not os.path.exists(p):
+                # Art der Einträge bekannter Ordner aus dem Prozess-Index (kein stat pro Eintrag),
+                # die Leseberechtigung wird wie bisher für jeden Eintrag geprüft
+                parent = os.path.normpath(os.path.dirname(p))
+                if parent not in entries_by_parent:
+                    listing = prc_index.directory_index.get_listing(parent)
+                    entries_by_parent[parent] = (set(listing.subdirs), set(listing.prc_files)) if listing else None
+                known_entries = entries_by_parent[parent]
+                if known_entries is None and not os.path.exists(p):
                     logging.warning(f"Pfad existiert nicht, wird übersprungen: {p}")
                     continue
                 norm_p = os.path.normpath(os.path.normcase(p))
@@ -221,12 +239,18 @@ def main(page: ft.Page):
                     continue
                 processed_paths.add(norm_p)
 
-                if os.path.isdir(p):
+                if known_entries is not None:
+                    name = os.path.basename(p)
+                    is_dir, is_prc = name in known_entries[0], name in known_entries[1]
+                else:
+                    is_dir = os.path.isdir(p)
+                    is_prc = not is_dir and p.lower().endswith(".prc") and os.path.isfile(p)
+                if is_dir:
                     if os.access(p, os.R_OK):
                         dirs.append(p)
                     else:
                         logging.warning(f"Keine Leseberechtigung für Ordner: {p}")
-                elif p.lower().endswith(".prc") and os.path.isfile(p):
+                elif is_prc:
                     if os.access(p, os.R_OK):
                         prcs.append(p)
                     else:
@@ -322,7 +346,7 @@ def main(page: ft.Page):
         try:
             if not os.access(folder, os.R_OK):
                 raise PermissionError(f"Keine Leseberechtigung für Ordner: {folder}")
-            entries = [os.path.join(folder, n) for n in sorted(os.listdir(folder), key=str.lower)]
+            entries = list_folder_entries(folder)
             load_items(entries, highlight_path=highlight_path)
 
         except (FileNotFoundError, PermissionError) as e:
@@ -436,7 +460,7 @@ def main(page: ft.Page):
             try:
                 if not os.access(parent_folder, os.R_OK):
                     raise PermissionError(f"Keine Leseberechtigung für zurücknavigierten Ordner: {parent_folder}")
-                entries = [os.path.join(parent_folder, n) for n in sorted(os.listdir(parent_folder), key=str.lower)]
+                entries = list_folder_entries(parent_folder)
                 load_items(entries)
             except Exception as e:
                 logging.error(f"Fehler beim Laden der Elemente nach 'Zurück' zu '{parent_folder}': {e}", exc_info=True)
@@ -527,7 +551,7 @@ def main(page: ft.Page):
         try:
             if not os.access(selected_folder, os.R_OK):
                 raise PermissionError(f"Keine Leseberechtigung für Root-Ordner: {selected_folder}")
-            entries = [os.path.join(selected_folder, n) for n in sorted(os.listdir(selected_folder), key=str.lower)]
+            entries = list_folder_entries(selected_folder)
             load_items(entries)
 
         except (FileNotFoundError, PermissionError) as e:
@@ -553,6 +577,17 @@ def main(page: ft.Page):
             page.update()
 
     # --- OCR Prozess Integration ---
+    def _resolve_prc(ocr_results: dict, material_root_path: str) -> rule_engine.PrcResolution | None:
+        """Regelsuche für ein OCR-Ergebnis (von ocr_recognition.scan_and_resolve aufgerufen)."""
+        found_feature_type_str = ocr_results.get("Feature-Typ")
+        if not found_feature_type_str:
+            return None
+        feature_type_lower_cleaned = found_feature_type_str.lower().strip()
+        logging.info(
+            f"OCR fand Feature-Typ: '{found_feature_type_str}' (verwendet als: '{feature_type_lower_cleaned}'). OCR-Gesamtergebnis: {ocr_results}")
+        # Übergebe alle OCR-Ergebnisse
+        return rule_engine.resolve_prc_path(feature_type_lower_cleaned, ocr_results, material_root_path)
+
     def run_ocr_process(page_ref: ft.Page):
         """Führt OCR im Hintergrund aus und aktualisiert die UI direkt."""
         global current_material_root_path, highlighted_tile
@@ -575,24 +610,19 @@ def main(page: ft.Page):
         target_prc_path_local = None
         error_message_local = None
         ocr_results_local = {}  # Initialisiere als leeres Dict
+        debug_scan = debug_dump.new_scan()  # None, wenn die Debug-Ablage aus ist
 
         try:
-            logging.info(f"Starte OCR für Region: {ocr_recognition.SCREEN_REGION}")
-            cv_img = ocr_recognition.capture_to_cv2(ocr_recognition.SCREEN_REGION)
-            gray_img = ocr_recognition.preprocess(cv_img)
-            ocr_results_local, full_text = ocr_recognition.ocr_line_parse(gray_img)
+            logging.info(f"Starte OCR für Region: {ocr_recognition.get_preprocess_pipeline().region}")
+            # Aufnahme in den wiederverwendeten Puffer (bei Bedarf neu kalibriert), OCR und Regelsuche unter
+            # einer Sperre; bei unverändertem Fenster kommen Ergebnis und PRC-Pfad aus dem Scan-Cache
+            ocr_results_local, full_text, resolution = ocr_recognition.scan_and_resolve(
+                current_material_root_path, _resolve_prc, debug_scan=debug_scan)
 
             found_feature_type_str = ocr_results_local.get("Feature-Typ")
 
             if found_feature_type_str and current_material_root_path:
-                feature_type_lower_cleaned = found_feature_type_str.lower().strip()
-                logging.info(
-                    f"OCR fand Feature-Typ: '{found_feature_type_str}' (verwendet als: '{feature_type_lower_cleaned}'). OCR-Gesamtergebnis: {ocr_results_local}")
-
-                target_prc_path_local = rule_engine.find_prc_path_by_rules(
-                    feature_type_lower_cleaned, ocr_results_local, current_material_root_path
-                    # Übergebe alle OCR-Ergebnisse
-                )
+                target_prc_path_local = resolution.path if resolution is not None else None
                 if not target_prc_path_local:
                     dia_val = ocr_results_local.get('Durchmesser', 'N/A')
                     bbox_w_val = ocr_results_local.get('Begrenzungsbox Breite', 'N/A')
@@ -614,6 +644,11 @@ def main(page: ft.Page):
             error_message_local = f"❌ Unerwarteter Fehler im OCR-Prozess: {e}"
             logging.exception("Unerwarteter Fehler im OCR-Thread.")
 
+        if debug_scan is not None:
+            debug_scan.add_json("zuordnung.json", {"material_root": current_material_root_path,
+                                                   "prc_pfad": target_prc_path_local, "meldung": error_message_local})
+            debug_dump.submit(debug_scan)
+
         logging.debug(f"Finalisiere UI nach OCR: Path='{target_prc_path_local}', Error='{error_message_local}'")
 
         if target_prc_path_local:
@@ -704,16 +739,41 @@ def main(page: ft.Page):
         ocr_button.icon = ft.Icons.CAMERA_ALT_OUTLINED
         page_ref.update()
 
+    ocr_running = threading.Lock()  # ocr_button.disabled wird erst im Scan-Thread gesetzt
+
+    def run_ocr_process_exclusive(page_ref: ft.Page):
+        try:
+            run_ocr_process(page_ref)
+        finally:
+            ocr_running.release()
+
     def start_ocr_process_thread():
         """Startet den OCR-Prozess in einem separaten Thread, um UI-Blockaden zu vermeiden."""
         if ocr_button.disabled:
             logging.warning("OCR-Button Klick ignoriert, da er deaktiviert ist.")
             return
+        if not ocr_running.acquire(blocking=False):
+            logging.warning("OCR-Button Klick ignoriert, da bereits ein Scan läuft.")
+            return
 
         logging.info("Starte OCR-Prozess in einem Hintergrund-Thread.")
-        thread = threading.Thread(target=run_ocr_process, args=(page,), daemon=True)
+        thread = threading.Thread(target=run_ocr_process_exclusive, args=(page,), daemon=True)
         thread.start()
 
+    # --- Index vorwärmen (Hintergrund) ---
+    index_status_text = ft.Text("📂 Prozess-Index wird aufgebaut…", size=12, italic=True,
+                                color=ft.Colors.BLUE_GREY_400)
+
+    def on_prewarm_progress(progress: prc_index.PrewarmProgress):
+        """Zeigt den Fortschritt des Vorwärmens an (läuft im Hintergrund-Thread)."""
+        if progress.done < progress.total:
+            index_status_text.value = f"📂 Prozess-Index: {progress.done}/{progress.total} Material-Ordner bereit…"
+        else:
+            index_status_text.value = f"📂 Prozess-Index bereit ({progress.total} Material-Ordner)."
+        if progress.error:
+            index_status_text.tooltip = f"{os.path.basename(progress.root)}: {progress.error}"
+        page.update()
+
     # --- Layout Aufbau ---
     page.add(
         ft.Column(
@@ -723,6 +783,7 @@ def main(page: ft.Page):
                     [back_button, ocr_button],
                     alignment=ft.MainAxisAlignment.START
                 ),
+                index_status_text,
                 ft.Divider(height=5, thickness=1),
                 listview
             ],
@@ -740,12 +801,22 @@ def main(page: ft.Page):
     )
     hotkey_thread.start()
 
+    try:
+        prc_index.directory_index.attach_store(prc_index.PrcIndexStore(prc_index.PRC_INDEX_DB_PATH))
+    except Exception as e:
+        logging.error(f"Persistenter Prozess-Index konnte nicht geöffnet werden, nur Speicher-Index aktiv: {e}")
+
+    logging.info("Starte Vorwärmen (Abgleich) des Prozess-Index im Hintergrund...")
+    prc_index.prewarm_roots(root_paths, rule_engine.get_rule_set().target_subdirs(),
+                            on_progress=on_prewarm_progress)
+
     logging.info("Flet App initialisiert. Warte auf Benutzerauswahl eines Material-Ordners.")
     page.update()
 
 
 # --- App Start ---
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # OCR-Prozess-Pool (ocr_recognition.OCR_LINE_WORKERS) in gepackter .exe
     logging.info("Starte Flet Anwendung...")
     try:
         ft.app(target=main, assets_dir="assets")
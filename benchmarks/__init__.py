@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+"""
+Benchmarks für ProzessORC. Aufruf aus dem Repository-Root, z.B.:
+
+    python -m benchmarks.bench_rule_engine
+"""
@@ -0,0 +1,79 @@
+# benchmarks/bench_capture.py
+"""
+Latenz einer Bildschirmaufnahme von SCREEN_REGION je Capture-Backend (ocr_recognition.CAPTURE_BACKEND_CLASSES):
+
+"<backend>":             neues Bild je Aufnahme (wie capture_to_cv2 ohne Puffer)
+"<backend> + Puffer":    in einen wiederverwendeten Puffer (out=)
+"<backend> grau alt":    Aufnahme in BGR, danach preprocess (BGR -> Grau), wie vor capture_gray
+"<backend> grau":        grab_gray in einen wiederverwendeten Graustufen-Puffer (wie capture_gray im Programm)
+"mss neues Handle":      mss mit neuem Handle je Aufnahme (wie ein "with mss.mss()" je Scan)
+
+Nicht verfügbare Backends (z.B. ohne Bildschirm/DISPLAY) werden mit Grund aufgeführt.
+Das Backend "datei" liest aus --replay (Standard: benchmarks/panel_rekonstruiert) und misst damit
+den Aufwand ohne Bildschirm; Bilder in Größe von SCREEN_REGION oder Vollbild-Screenshots.
+
+Aufruf: python -m benchmarks.bench_capture [--repeat N] [--region l,o,r,u] [--replay PFAD]
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+import ocr_recognition
+from benchmarks.fixtures import RECONSTRUCTED_PANEL_DIR
+
+
+def _samples_ms(func, repeat: int) -> np.ndarray:
+    func()  # Aufwärmen
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return np.asarray(samples)
+
+
+def _print(label: str, samples: np.ndarray):
+    print(f"  {label:22s} p50 {np.percentile(samples, 50):7.2f} ms  p95 {np.percentile(samples, 95):7.2f} ms")
+
+
+def _mss_new_handle(bbox: tuple[int, int, int, int]):
+    backend = ocr_recognition.MssBackend()
+    try:
+        backend.grab(bbox)
+    finally:
+        backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="Aufnahmen je Variante")
+    parser.add_argument("--region", default=None, help="Bereich links,oben,rechts,unten (Standard: SCREEN_REGION)")
+    parser.add_argument("--replay", default=RECONSTRUCTED_PANEL_DIR, help="Bild/Ordner für das Backend 'datei'")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    bbox = tuple(int(v) for v in args.region.split(",")) if args.region else ocr_recognition.SCREEN_REGION
+    print(f"Bereich {bbox} ({bbox[2] - bbox[0]}x{bbox[3] - bbox[1]}), {args.repeat} Aufnahmen je Variante")
+
+    for name, backend_class in ocr_recognition.CAPTURE_BACKEND_CLASSES.items():
+        try:
+            backend = backend_class(args.replay) if name == "datei" else backend_class()
+            img = backend.grab(bbox)
+        except Exception as e:
+            print(f"  {name:22s} nicht verfügbar: {e}")
+            continue
+        out, gray_out = np.empty_like(img), np.empty(img.shape[:2], dtype=np.uint8)
+        _print(name, _samples_ms(lambda: backend.grab(bbox), args.repeat))
+        _print(f"{name} + Puffer", _samples_ms(lambda: backend.grab(bbox, out), args.repeat))
+        _print(f"{name} grau alt", _samples_ms(lambda: ocr_recognition.preprocess(backend.grab(bbox)), args.repeat))
+        _print(f"{name} grau", _samples_ms(lambda: backend.grab_gray(bbox, gray_out), args.repeat))
+        if name == "mss":
+            _print("mss neues Handle", _samples_ms(lambda: _mss_new_handle(bbox), args.repeat))
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
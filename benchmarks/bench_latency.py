@@ -0,0 +1,142 @@
+# benchmarks/bench_latency.py
+"""
+Latenz-Perzentile (p50/p95/p99) der Regel-Engine über den aufgezeichneten OCR-Korpus
+auf einem synthetischen Material-Root mit einigen tausend .prc-Dateien.
+
+"regel_matching":   alle passenden Regeln ermitteln (CompiledRuleSet.iter_targets, ohne Dateisystem)
+"verzeichnis":      Datei zum ersten Treffer im Verzeichnis-Index suchen (prc_index.find_prc)
+"ende_zu_ende":     find_prc_path_by_rules ohne Ergebnis-Cache
+"ende_zu_ende_cache": find_prc_path_by_rules mit Ergebnis-Cache (wiederholte Scans)
+
+Die p95-Werte werden beim ersten Lauf (oder mit --save-baseline) in baseline.json gespeichert;
+danach wird gegen diese Datei verglichen und mit Exit-Code 1 beendet, wenn ein p95 um mehr als
+--threshold (relativ) schlechter ist. Die Baseline gilt nur für den Rechner, auf dem sie erstellt
+wurde, und ist deshalb nicht eingecheckt.
+
+Aufruf: python -m benchmarks.bench_latency [--repeat N] [--files-per-dir N] [--threshold 0.5] [--save-baseline]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import prc_index
+import rule_engine
+from benchmarks.fixtures import (KULISSEN_TREE_LAYOUT, MATERIAL_TREE_LAYOUT, build_material_tree,
+                                 load_ocr_corpus)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+PERCENTILES = (50, 95, 99)
+
+
+def check_keyword_coverage(corpus: list[dict], rule_set: rule_engine.CompiledRuleSet) -> list[tuple[str, ...]]:
+    """Keyword-Familien (Keywords einer Regel), die im Korpus nicht vorkommen."""
+    found = set()
+    for ocr_results in corpus:
+        found.update(kw for kw, _ in rule_set.keyword_matcher.match(ocr_results["Feature-Typ"].lower().strip()))
+    families = dict.fromkeys(tuple(rule.keywords) for rule in rule_set.rules)
+    return [family for family in families if not found.intersection(family)]
+
+
+def _measure_us(func, args_list: list[tuple], repeat: int) -> np.ndarray:
+    samples = []
+    for _ in range(repeat):
+        for args in args_list:
+            start = time.perf_counter_ns()
+            func(*args)
+            samples.append(time.perf_counter_ns() - start)
+    return np.asarray(samples, dtype=np.float64) / 1000.0
+
+
+def run(repeat: int, files_per_dir: int) -> dict[str, dict[str, float]]:
+    corpus = load_ocr_corpus()
+    rule_set = rule_engine.get_rule_set()
+    missing = check_keyword_coverage(corpus, rule_set)
+    if missing:
+        raise SystemExit(f"Korpus deckt nicht alle Keyword-Familien ab: {missing}")
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        roots = [build_material_tree(base_dir, "+1.2379", MATERIAL_TREE_LAYOUT, files_per_dir),
+                 build_material_tree(base_dir, "KULISSEN-2025", KULISSEN_TREE_LAYOUT, files_per_dir)]
+        prc_count = sum(len(files) for root in roots for _, _, files in os.walk(root))
+
+        calls = []  # (Feature-Typ, OCR-Dict, Root, FeatureValues, erstes Ziel oder None)
+        for root in roots:
+            prc_index.directory_index.index_root(root)
+            for ocr_results in corpus:
+                ft = ocr_results["Feature-Typ"].lower().strip()
+                features = rule_engine.FeatureValues.from_ocr(ft, ocr_results)
+                first = next(rule_set.iter_targets(features, root), None)
+                calls.append((ft, ocr_results, root, features, first[1] if first else None))
+
+        lookups = [(root, *target) for _, _, root, _, target in calls if target]
+        uncached = rule_engine.ResolutionCache(maxsize=0)
+        cached = rule_engine.resolution_cache
+        try:
+            rule_engine.resolution_cache = uncached
+            end_to_end = _measure_us(rule_engine.find_prc_path_by_rules,
+                                     [(ft, ocr, root) for ft, ocr, root, _, _ in calls], repeat)
+        finally:
+            rule_engine.resolution_cache = cached
+
+        samples = {
+            "regel_matching": _measure_us(lambda f, r: list(rule_set.iter_targets(f, r)),
+                                          [(features, root) for _, _, root, features, _ in calls], repeat),
+            "verzeichnis": _measure_us(prc_index.directory_index.find_prc, lookups, repeat),
+            "ende_zu_ende": end_to_end,
+            "ende_zu_ende_cache": _measure_us(rule_engine.find_prc_path_by_rules,
+                                              [(ft, ocr, root) for ft, ocr, root, _, _ in calls], repeat),
+        }
+
+    print(f"{len(calls)} Aufrufe x {repeat} Durchläufe, {prc_count} .prc-Dateien im Baum")
+    report = {}
+    for name, values in samples.items():
+        report[name] = {f"p{p}": round(float(np.percentile(values, p)), 2) for p in PERCENTILES}
+        print(f"  {name:20s} " + "  ".join(f"p{p} {report[name][f'p{p}']:8.1f} µs" for p in PERCENTILES))
+    return report
+
+
+def compare_with_baseline(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Messgrößen, deren p95 die Baseline um mehr als threshold (relativ) überschreitet."""
+    regressions = []
+    for name, values in report.items():
+        reference = baseline.get(name, {}).get("p95")
+        if reference and values["p95"] > reference * (1.0 + threshold):
+            regressions.append(f"{name}: p95 {values['p95']:.1f} µs > Baseline {reference:.1f} µs "
+                               f"(+{(values['p95'] / reference - 1.0) * 100:.0f} %)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30, help="Durchläufe über den Korpus")
+    parser.add_argument("--files-per-dir", type=int, default=300, help="zusätzliche .prc-Dateien je Zielordner")
+    parser.add_argument("--threshold", type=float, default=0.5, help="erlaubte Verschlechterung des p95 (0.5 = +50 %%)")
+    parser.add_argument("--save-baseline", action="store_true", help="p95-Werte als neue Baseline speichern")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)  # Logging würde die Messung dominieren
+    report = run(args.repeat, args.files_per_dir)
+
+    if args.save_baseline or not os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({name: {"p95": values["p95"]} for name, values in report.items()}, f, indent=2)
+        print(f"Baseline gespeichert: {BASELINE_PATH}")
+        return
+
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        regressions = compare_with_baseline(report, json.load(f), args.threshold)
+    if regressions:
+        print("REGRESSION:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print(f"Keine Regression (Schwelle +{args.threshold * 100:.0f} % auf p95).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_ocr_backend.py
+"""
+Vergleicht die Latenz der OCR-Backends (ocr_recognition.OCR_BACKEND_CLASSES) auf dem
+aufgenommenen Eigenschaftenfenster: Initialisierung sowie p50/p95 je Durchlauf (psm 4 und
+psm 11) und je Scan mit beiden Durchläufen. Nicht installierte Backends werden übersprungen.
+
+Aufruf: python -m benchmarks.bench_ocr_backend [--repeat N]
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+import ocr_recognition
+from benchmarks.fixtures import load_panel_image
+
+
+def _ms(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000.0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Scans je Backend")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    img = load_panel_image()
+    print(f"Bild {img.shape[1]}x{img.shape[0]}, {args.repeat} Scans je Backend")
+
+    reference_text = None
+    for name, backend_class in ocr_recognition.OCR_BACKEND_CLASSES.items():
+        try:
+            init_ms, backend = _ms(backend_class)
+            backend.image_to_string(img, 4)  # Aufwärmen
+        except Exception as e:
+            print(f"  {name:12s} nicht verfügbar: {e}")
+            continue
+
+        pass1, pass2, text = [], [], ""
+        for _ in range(args.repeat):
+            ms, text = _ms(backend.image_to_string, img, 4)
+            pass1.append(ms)
+            pass2.append(_ms(backend.image_to_string, img, 11)[0])
+        per_scan = np.add(pass1, pass2)
+        if reference_text is None:
+            reference_text = text
+        print(f"  {name:12s} Init {init_ms:7.1f} ms | psm 4 p50 {np.percentile(pass1, 50):7.1f} ms "
+              f"p95 {np.percentile(pass1, 95):7.1f} | psm 11 p50 {np.percentile(pass2, 50):7.1f} ms | "
+              f"Scan p50 {np.percentile(per_scan, 50):7.1f} ms p95 {np.percentile(per_scan, 95):7.1f} ms | "
+              f"Text {'gleich' if text == reference_text else 'abweichend'}")
+
+
+if __name__ == "__main__":
+    main()
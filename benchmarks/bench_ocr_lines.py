@@ -0,0 +1,95 @@
+# benchmarks/bench_ocr_lines.py
+"""
+Vergleicht auf dem aufgenommenen Eigenschaftenfenster die Wanduhrzeit des Volltext-Durchlaufs:
+
+"ein Bild":      das ganze Fenster in einem Tesseract-Aufruf (psm 4)
+"N Prozesse":    Zeilenstreifen (ocr_recognition.ocr_line_strips, psm 7) mit leerem Zeilen-Cache,
+                 bei N > 1 im Prozess-Pool mit N Prozessen
+"1 Zeile neu":   Zeilenstreifen im Scan-Thread, eine Zeile geändert, übrige aus dem Zeilen-Cache
+                 (Wechsel zwischen ähnlichen Features)
+
+Der Pool wird vor der Messung gestartet und aufgewärmt (Sprachdaten je Prozess geladen).
+Zusätzlich wird geprüft, ob parse_ocr_words auf beiden Ergebnissen dieselben Felder liefert.
+Ohne OCR-Backend (z.B. Tesseract nicht installiert) wird nur das gemeldet.
+
+Aufruf: python -m benchmarks.bench_ocr_lines [--repeat N] [--workers 1,2,4]
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+
+import ocr_recognition
+from benchmarks.fixtures import load_panel_image
+
+
+def _samples_ms(func, repeat: int, prepare=None) -> tuple[np.ndarray, list]:
+    samples, words = [], []
+    for _ in range(repeat):
+        if prepare is not None:
+            prepare()
+        start = time.perf_counter()
+        words = func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return np.asarray(samples), words
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Durchläufe je Variante")
+    parser.add_argument("--workers", default=None,
+                        help="Prozess-Anzahlen, kommagetrennt (Standard: 1, 2, 4, ... bis zur Kernanzahl)")
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(value) for value in args.workers.split(",")]
+    else:
+        worker_counts = [1] + [2 ** i for i in range(1, 8) if 2 ** i <= cpu_count]
+
+    logging.disable(logging.CRITICAL)
+    img = load_panel_image()
+    try:
+        ocr_recognition.run_ocr_data(img, psm=4)  # Aufwärmen
+    except Exception as e:
+        print(f"OCR-Backend nicht verfügbar: {e}")
+        return
+    print(f"Bild {img.shape[1]}x{img.shape[0]}, {len(ocr_recognition.split_text_lines(img))} Zeilenstreifen, "
+          f"Backend {ocr_recognition.get_ocr_backend().name}, {cpu_count} Kerne, {args.repeat} Durchläufe")
+
+    single, reference_words = _samples_ms(lambda: ocr_recognition.run_ocr_data(img, psm=4), args.repeat)
+    reference = ocr_recognition.parse_ocr_words(reference_words).results
+    print(f"  {'ein Bild':12s} p50 {np.percentile(single, 50):7.1f} ms  p95 {np.percentile(single, 95):7.1f} ms")
+
+    def report(label: str, samples: np.ndarray, words: list):
+        differing = [key for key, value in ocr_recognition.parse_ocr_words(words).results.items()
+                     if reference.get(key) != value]
+        print(f"  {label:12s} p50 {np.percentile(samples, 50):7.1f} ms  "
+              f"p95 {np.percentile(samples, 95):7.1f} ms  Faktor {np.median(single) / np.median(samples):5.2f}x  "
+              f"Felder {'gleich' if not differing else 'abweichend: ' + ', '.join(differing)}")
+
+    clear_cache = ocr_recognition.line_strip_cache.clear
+    for workers in worker_counts:
+        ocr_recognition.ocr_line_strips(img, workers)  # Pool starten und aufwärmen
+        report(f"{workers} Prozesse", *_samples_ms(lambda: ocr_recognition.ocr_line_strips(img, workers),
+                                                   args.repeat, clear_cache))
+
+    # Geänderte Zeile: je Messung ein weiteres Pixel am rechten Rand der ersten Zeile umschalten
+    changed = img.copy()
+    row = ocr_recognition.split_text_lines(img)[0].top + ocr_recognition._CELL_PADDING
+    ocr_recognition.ocr_line_strips(changed, 0)  # alle Zeilen in den Zeilen-Cache
+    toggled = []
+
+    def toggle_pixel():
+        column = changed.shape[1] - 1 - len(toggled)
+        changed[row, column] = 255 - changed[row, column]
+        toggled.append(column)
+
+    report("1 Zeile neu", *_samples_ms(lambda: ocr_recognition.ocr_line_strips(changed, 0), args.repeat, toggle_pixel))
+
+
+if __name__ == "__main__":
+    main()
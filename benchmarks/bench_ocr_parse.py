@@ -0,0 +1,120 @@
+# benchmarks/bench_ocr_parse.py
+"""
+Misst das Parsen der OCR-Texte (ohne Tesseract) über zwei Textsätze des Esprit-Eigenschaftenfensters:
+
+"aufgezeichnet":  echte Tesseract-Ausgaben einer Aufnahme (ocr_texts_aufgezeichnet.json,
+                  erzeugt mit benchmarks.record_ocr_texts; verschiedene psm und Bildgrößen)
+"nachgestellt":   synthetische Texte im Stil der Tesseract-Ausgabe (ocr_texts.json) mit
+                  verschiedenen Feature-Typen, Lesefehlern in Labels, Trennzeichen und Werten
+                  in der Folgezeile
+
+Je Satz wird geprüft, dass beide Varianten dieselben Felder liefern.
+
+"linear":      jede Zeile gegen alle Feldmuster per re.search(muster_string, ...) wie vor parse_ocr_text
+"kompiliert":  ocr_recognition.parse_ocr_text (Label-Scanner + einmal kompilierte Muster)
+
+Aufruf: python -m benchmarks.bench_ocr_parse [--repeat N]
+"""
+
+import argparse
+import logging
+import re
+import time
+
+import numpy as np
+
+import ocr_recognition
+from benchmarks.fixtures import load_ocr_texts, load_recorded_ocr_texts
+
+
+def _parse_number_linear(value_str: str, format_str: str | None) -> str | None:
+    cleaned_str = value_str.replace(",", ".").strip()
+    cleaned_str = re.sub(r"[^\d.\s-]*$", "", cleaned_str).strip()
+    cleaned_str = re.sub(r"^[^\d-]*", "", cleaned_str).strip()
+    match = re.search(r"(-?\d+(?:\.\d+)?)", cleaned_str)
+    if match:
+        num_str = match.group(1)
+        try:
+            return format_str.format(float(num_str)) if format_str else num_str
+        except ValueError:
+            return num_str
+    return cleaned_str if value_str.strip() else None
+
+
+def _value_linear(key: str, raw_value: str) -> str | None:
+    if key in ocr_recognition.NUMERIC_FIELDS:
+        return _parse_number_linear(raw_value, None if key == "Durchmesser" else "{:.6f}")
+    if key == "Elementnummer":
+        num_match = re.search(r"(\d+)", raw_value)
+        return num_match.group(1) if num_match else raw_value
+    return raw_value
+
+
+def _parse_linear(full_text: str) -> dict:
+    results = {
+        "Elementtyp": None, "Elementnummer": None, "Begrenzungsbox Breite": None,
+        "Begrenzungsbox Länge": None, "Tiefe": None, "Durchmesser": None,
+        "Fasendurchmesser": None,
+        "Feature-Typ": None, "Name": None, "Kleinster Radius": None
+    }
+    processed_keys, last_key_found = set(), None
+    for line in full_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        found_match_in_line = False
+        for key, pattern_str in ocr_recognition.FIELD_PATTERNS.items():
+            if key in processed_keys:
+                continue
+            match = re.search(pattern_str, line, re.IGNORECASE)
+            if match:
+                found_match_in_line = True
+                raw_value = match.group(1).strip()
+                parsed_value = _value_linear(key, raw_value) if raw_value else None
+                if parsed_value is not None and str(parsed_value).strip():
+                    results[key] = str(parsed_value)
+                    processed_keys.add(key)
+                    last_key_found = None
+                else:
+                    last_key_found = key
+                break
+        if not found_match_in_line and last_key_found:
+            parsed_value = _value_linear(last_key_found, line)
+            if parsed_value is not None and str(parsed_value).strip():
+                results[last_key_found] = str(parsed_value)
+                processed_keys.add(last_key_found)
+            last_key_found = None
+    return results
+
+
+def _samples_us(parse, texts: list[str], repeat: int) -> np.ndarray:
+    samples = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter_ns()
+            parse(text)
+            samples.append(time.perf_counter_ns() - start)
+    return np.asarray(samples, dtype=np.float64) / 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="Durchläufe über die Texte")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)  # Logging würde die Messung dominieren
+    for name, texts in (("aufgezeichnet", load_recorded_ocr_texts()), ("nachgestellt", load_ocr_texts())):
+        for text in texts:
+            assert _parse_linear(text) == ocr_recognition.parse_ocr_text(text), text
+
+        results = {
+            "linear": _samples_us(_parse_linear, texts, args.repeat),
+            "kompiliert": _samples_us(ocr_recognition.parse_ocr_text, texts, args.repeat),
+        }
+        print(f"{name}: {len(texts)} OCR-Texte x {args.repeat} Durchläufe, Ergebnisse gleich")
+        for label, values in results.items():
+            print(f"  {label:10s} " + "  ".join(f"p{p} {np.percentile(values, p):7.1f} µs" for p in (50, 95, 99)))
+        print(f"  {'Faktor':10s} {np.median(results['linear']) / np.median(results['kompiliert']):7.2f}x (p50)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/bench_ocr_passes.py
+"""
+Vergleicht auf dem aufgenommenen Eigenschaftenfenster die Volltext-Durchläufe:
+
+"seriell":     psm 4, danach psm 11 (schlechtester Fall des Korrekturlaufs in ocr_line_parse)
+"spekulativ":  psm 4 und psm 11 gleichzeitig (ocr_recognition.speculative_passes)
+
+Der Gewinn setzt mindestens zwei freie Kerne voraus; die Anzahl wird mit ausgegeben.
+Ohne OCR-Backend (z.B. Tesseract nicht installiert) wird nur das gemeldet.
+
+Aufruf: python -m benchmarks.bench_ocr_passes [--repeat N]
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+
+import ocr_recognition
+from benchmarks.fixtures import load_panel_image
+
+
+def _serial(img: np.ndarray):
+    ocr_recognition.run_ocr(img, psm=4)
+    ocr_recognition.run_ocr(img, psm=11)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Scans je Variante")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    img = load_panel_image()
+    try:
+        ocr_recognition.speculative_passes(img)  # Aufwärmen: legt auch die Engine des Hintergrund-Threads an
+    except Exception as e:
+        print(f"OCR-Backend nicht verfügbar: {e}")
+        return
+    print(f"Bild {img.shape[1]}x{img.shape[0]}, Backend {ocr_recognition.get_ocr_backend().name}, "
+          f"{os.cpu_count()} Kerne, {args.repeat} Scans je Variante")
+
+    for label, func in (("seriell", _serial), ("spekulativ", ocr_recognition.speculative_passes)):
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            func(img)
+            samples.append((time.perf_counter() - start) * 1000.0)
+        print(f"  {label:12s} p50 {np.percentile(samples, 50):7.1f} ms  p95 {np.percentile(samples, 95):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_preprocess_buffers.py
+"""
+Speicherbedarf je Scan von Aufnahme + Vorverarbeitung (ohne OCR), Aufnahmen aus --replay:
+
+"vorher":    capture_to_cv2 -> preprocess -> resize -> Schwellwert (jede Stufe legt ein neues Bild an)
+"nachher":   PreprocessPipeline.capture -> .process (Puffer der Pipeline, per out/dst wiederverwendet)
+
+Je Variante: neu angelegte Bilder je Scan (nach den ersten Scans), Spitze des per tracemalloc
+verfolgten Speichers je Scan, Spitzen-RSS des Prozesses über dem Stand vor dem ersten Scan und p50
+der Zeit. Jede Variante läuft in einem eigenen Prozess, damit sich die Spitzen-RSS nicht vermischen.
+
+Aufruf: python -m benchmarks.bench_preprocess_buffers [--scans N] [--replay PFAD]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import psutil
+
+import ocr_recognition
+from benchmarks.fixtures import RECONSTRUCTED_PANEL_DIR
+
+WARMUP_SCANS = 3
+
+
+def _peak_rss() -> int:
+    """Bisher höchste RSS des Prozesses in Bytes."""
+    info = psutil.Process().memory_info()
+    if hasattr(info, "peak_wset"):  # Windows
+        return info.peak_wset
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux: KiB
+
+
+def _scan_before(_pipeline) -> list[np.ndarray]:
+    """Die Stufen wie vor der Pipeline, jede ohne dst."""
+    config = ocr_recognition.get_preprocess_config()
+    cv_img = ocr_recognition.capture_to_cv2(ocr_recognition.SCREEN_REGION)
+    gray_img = ocr_recognition.preprocess(cv_img)
+    height, width = gray_img.shape
+    upscaled = cv2.resize(gray_img, (int(width * config.scale), int(height * config.scale)),
+                          interpolation=ocr_recognition.INTERPOLATIONS[config.interpolation])
+    if config.threshold == "otsu":
+        processed = cv2.threshold(upscaled, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+    else:
+        processed = cv2.adaptiveThreshold(upscaled, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                          config.block_size, config.c)
+    return [cv_img, gray_img, upscaled, processed]
+
+
+def _scan_after(pipeline: ocr_recognition.PreprocessPipeline) -> list[np.ndarray]:
+    gray_img = pipeline.capture()
+    processed = pipeline.process(gray_img)
+    return [gray_img, pipeline._upscaled, processed]
+
+
+def _run_variant(variant: str, replay: str, scans: int) -> dict:
+    logging.disable(logging.CRITICAL)
+    ocr_recognition._capture_backend = ocr_recognition.ReplayCaptureBackend(replay)
+    pipeline = ocr_recognition.PreprocessPipeline()
+    scan = _scan_before if variant == "vorher" else _scan_after
+    rss_start = psutil.Process().memory_info().rss
+    for _ in range(WARMUP_SCANS):
+        scan(pipeline)
+
+    # Neu angelegte Bilder: Stufen-Ergebnisse, die nicht in einem Puffer der Pipeline liegen
+    # (ohne dst liefert OpenCV immer ein neues Array), plus neu angelegte Pipeline-Puffer
+    allocations_start, new_images = pipeline.allocations, 0
+    for _ in range(scans):
+        new_images += sum(1 for img in scan(pipeline) if not pipeline.owns(img))
+    new_images += pipeline.allocations - allocations_start
+
+    traced_peaks = []
+    tracemalloc.start()
+    for _ in range(scans):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        scan(pipeline)
+        traced_peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    samples = []
+    for _ in range(scans):
+        start = time.perf_counter()
+        scan(pipeline)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {"new_images": new_images / scans, "traced_peak": float(np.max(traced_peaks)),
+            "peak_rss": _peak_rss() - rss_start, "p50_ms": float(np.percentile(samples, 50))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, default=50, help="gemessene Scans je Variante")
+    parser.add_argument("--replay", default=RECONSTRUCTED_PANEL_DIR, help="Bild/Ordner mit Aufnahmen der Region")
+    args = parser.parse_args()
+
+    config = ocr_recognition.get_preprocess_config()
+    left, top, right, bottom = ocr_recognition.SCREEN_REGION
+    print(f"Region {right - left}x{bottom - top}, Vorverarbeitung {config.describe()}, {args.scans} Scans")
+    context = multiprocessing.get_context("spawn")
+    for variant in ("vorher", "nachher"):
+        with context.Pool(1) as pool:
+            result = pool.apply(_run_variant, (variant, args.replay, args.scans))
+        print(f"  {variant:8s} neue Bilder/Scan {result['new_images']:4.1f}  "
+              f"tracemalloc-Spitze/Scan {result['traced_peak'] / 2 ** 20:6.2f} MiB  "
+              f"Spitzen-RSS +{result['peak_rss'] / 2 ** 20:6.2f} MiB  p50 {result['p50_ms']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_rule_engine.py
+"""
+Misst die Latenz von rule_engine pro Aufruf über den aufgezeichneten OCR-Korpus.
+
+"linear":      alle Regeln der Reihe nach prüfen (Keyword-Substring, Bedingung) und den Zielordner
+               per listdir + isfile durchsuchen, wie vor CompiledRuleSet
+"kompiliert":  kompiliertes Regelwerk (Keyword-Matcher, Intervall-Index) mit Verzeichnis-Index (prc_index)
+
+Aufruf: python -m benchmarks.bench_rule_engine [--repeat N]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import rule_engine
+from benchmarks.fixtures import (KULISSEN_TREE_LAYOUT, MATERIAL_TREE_LAYOUT, build_material_tree,
+                                 load_ocr_corpus)
+
+
+def _prepare_calls(corpus: list[dict], roots: list[str]) -> list[tuple]:
+    calls = []
+    for root in roots:
+        for ocr_results in corpus:
+            feature_type_lower = ocr_results["Feature-Typ"].lower().strip()
+            calls.append((rule_engine.FeatureValues.from_ocr(feature_type_lower, ocr_results), root))
+    return calls
+
+
+def _resolve_linear(rules: tuple, features, root: str) -> str | None:
+    is_kulissen = rule_engine.is_kulissen_root(root)
+    for keywords, condition, target, kulissen_only in rules:
+        if kulissen_only and not is_kulissen:
+            continue
+        if not any(kw in features.ft_lower for kw in keywords) or not condition(*features):
+            continue
+        target = target(*features) if callable(target) else target
+        if target is None:
+            continue
+        path = _find_prc_listdir(root, *target)
+        if path:
+            return path
+    return None
+
+
+def _find_prc_listdir(root: str, relative_subdir: str, prefix: str) -> str | None:
+    search_dir = os.path.normpath(os.path.join(root, relative_subdir))
+    if not os.path.isdir(search_dir):
+        return None
+    for name in sorted(os.listdir(search_dir)):
+        if name.startswith(prefix + "_") and name.lower().endswith(".prc"):
+            full_path = os.path.join(search_dir, name)
+            if os.path.isfile(full_path):
+                return full_path
+    return None
+
+
+def _time_per_call_us(resolve, calls: list[tuple], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for features, root in calls:
+            resolve(features, root)
+    return (time.perf_counter() - start) / (repeat * len(calls)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="Durchläufe über den Korpus")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)  # Logging würde die Messung dominieren
+    corpus = load_ocr_corpus()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        roots = [build_material_tree(base_dir, "+1.2379", MATERIAL_TREE_LAYOUT),
+                 build_material_tree(base_dir, "KULISSEN-2025", KULISSEN_TREE_LAYOUT)]
+        calls = _prepare_calls(corpus, roots)
+
+        compiled = rule_engine.get_rule_set()
+        for features, root in calls:
+            assert _resolve_linear(compiled.rules, features, root) == compiled.resolve(features, root)
+        results = {
+            "linear": _time_per_call_us(lambda f, r: _resolve_linear(compiled.rules, f, r), calls, args.repeat),
+            "kompiliert": _time_per_call_us(compiled.resolve, calls, args.repeat),
+        }
+
+    print(f"{len(calls)} Aufrufe x {args.repeat} Durchläufe")
+    for label, us in results.items():
+        print(f"  {label:10s} {us:9.1f} µs/Aufruf")
+    print(f"  {'Faktor':10s} {results['linear'] / results['kompiliert']:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
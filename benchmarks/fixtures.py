@@ -0,0 +1,113 @@
+# benchmarks/fixtures.py
+"""
+Gemeinsame Testdaten für die Benchmarks:
+- aufgezeichnete OCR-Ergebnisse (ocr_corpus.json)
+- nachgestellte (synthetische) Tesseract-Ausgaben des Eigenschaftenfensters (ocr_texts.json)
+- echte Tesseract-Ausgaben des aufgenommenen Eigenschaftenfensters (ocr_texts_aufgezeichnet.json)
+- ein aufgenommenes Eigenschaftenfenster, wie es Tesseract bekommt (panel_tesseract_eingabe.png)
+- beschriftete Graustufen-Aufnahmen des Eigenschaftenfensters vom Bildschirm (panel_captures/, Sollwerte in
+  labels.json; anfangs leer, Aufnahmen aus der Debug-Ablage mit tune_preprocess --add-capture übernehmen)
+- ein aus panel_tesseract_eingabe.png zurückgerechnetes Fenster in Bildschirmgröße (panel_rekonstruiert/);
+  genügt für Zeit- und Speichermessungen, ist aber keine echte Aufnahme (bereits binarisiert)
+- synthetischer Material-Root mit der Ordnerstruktur unter K:\\Esprit\\Prozesse
+"""
+
+import json
+import ntpath
+import os
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "ocr_corpus.json")
+OCR_TEXTS_PATH = os.path.join(os.path.dirname(__file__), "ocr_texts.json")
+RECORDED_OCR_TEXTS_PATH = os.path.join(os.path.dirname(__file__), "ocr_texts_aufgezeichnet.json")
+PANEL_IMAGE_PATH = os.path.join(os.path.dirname(__file__), "panel_tesseract_eingabe.png")
+PANEL_CAPTURES_DIR = os.path.join(os.path.dirname(__file__), "panel_captures")
+RECONSTRUCTED_PANEL_DIR = os.path.join(os.path.dirname(__file__), "panel_rekonstruiert")
+
+# Zielordner der Regeln mit den Präfixen, für die .prc-Dateien angelegt werden
+MATERIAL_TREE_LAYOUT = {
+    r"01_Plan-Aussen-Fase-Tasche": ["01", "02", "03", "04", "06", "07"],
+    r"02_Taschen\Profit": ["01", "02", "03", "04", "05", "06", "07", "08", "10", "11", "14"],
+    r"03_Bohrungen": ["01", "02", "03", "04", "05", "06"],
+    r"03_Bohrungen\Bohrungen mit Rückzug": ["01", "02", "03", "04", "05", "06"],
+    r"05_DGB": ["01", "02", "03", "04", "05", "06", "07", "08"],
+    r"05_DGB\+DGB mit Rückzug": ["01", "02", "03", "04", "05", "06", "07"],
+    r"05_DGB\nur Senkung": ["01", "02", "03", "04", "05", "06", "07", "08", "09"],
+    r"06_Passung Fräsen": [f"{i:02d}" for i in range(1, 14)],
+    r"07_NUTEN": ["01", "02", "03", "04", "05", "06", "07"],
+    r"07_NUTEN\NUTEN mit Rückzug": ["01", "02", "03", "04", "05", "06", "07"],
+    r"13_Trennen": ["01"],
+}
+
+KULISSEN_TREE_LAYOUT = {
+    r"01_A-Seite 2312": ["01", "02", "03"],
+    r"02_B-Seite 2312": [f"{i:02d}" for i in range(1, 21)],
+}
+
+
+def load_ocr_corpus(path: str = CORPUS_PATH) -> list[dict]:
+    """Lädt die aufgezeichneten OCR-Ergebnis-Dicts."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_ocr_texts(path: str = OCR_TEXTS_PATH) -> list[str]:
+    """Lädt die nachgestellten Roh-Texte (im Stil von image_to_string) des Eigenschaftenfensters."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_recorded_ocr_texts(path: str = RECORDED_OCR_TEXTS_PATH) -> list[str]:
+    """Lädt die mit record_ocr_texts aufgezeichneten Tesseract-Ausgaben."""
+    with open(path, encoding="utf-8") as f:
+        return [entry["text"] for entry in json.load(f)["texte"]]
+
+
+def load_panel_image(path: str = PANEL_IMAGE_PATH):
+    """Binarisiertes, 3x hochskaliertes Eigenschaftenfenster (Graustufen, uint8)."""
+    import cv2
+    img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise FileNotFoundError(path)
+    return img
+
+
+def load_panel_captures(directory: str = PANEL_CAPTURES_DIR) -> list[tuple[str, object, dict]]:
+    """
+    Lädt die beschrifteten Aufnahmen: (Dateiname, Graustufenbild, Sollwerte der Felder).
+    labels.json ordnet jedem Bild die erwarteten Feldwerte zu; nicht aufgeführte Felder werden
+    nicht bewertet. Weitere Aufnahmen sind z.B. die 2_graustufen.png der Debug-Ablage.
+    """
+    import cv2
+    with open(os.path.join(directory, "labels.json"), encoding="utf-8") as f:
+        labels = json.load(f)
+    captures = []
+    for name, expected in labels.items():
+        img = cv2.imread(os.path.join(directory, name), cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise FileNotFoundError(os.path.join(directory, name))
+        captures.append((name, img, expected))
+    return captures
+
+
+def build_material_tree(base_dir: str, name: str, layout: dict[str, list[str]],
+                        extra_files_per_dir: int = 0) -> str:
+    """
+    Legt unter base_dir/name die Unterordner aus layout an, je Präfix eine Datei
+    'XX_<Name>.prc' sowie extra_files_per_dir weitere Dateien ohne passenden Präfix.
+    Gibt den Pfad des Material-Roots zurück.
+    """
+    root = os.path.join(base_dir, name)
+    for relative_subdir, prefixes in layout.items():
+        # Gleicher Pfad wie in prc_index (unter Linux bleibt der Backslash Teil des Ordnernamens)
+        target_dir = os.path.normpath(os.path.join(root, relative_subdir))
+        os.makedirs(target_dir, exist_ok=True)
+        for prefix in prefixes:
+            _touch(os.path.join(target_dir, f"{prefix}_Prozess {ntpath.basename(relative_subdir)}.prc"))
+        for i in range(extra_files_per_dir):
+            _touch(os.path.join(target_dir, f"zz{i:05d}_Archiv.prc"))
+    return root
+
+
+def _touch(path: str):
+    with open(path, "a", encoding="utf-8"):
+        pass
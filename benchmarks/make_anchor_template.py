@@ -0,0 +1,88 @@
+# benchmarks/make_anchor_template.py
+"""
+Schneidet die Anker-Vorlage (Label "Elementtyp") für die Kalibrierung des Bildschirmbereichs aus einer
+echten Aufnahme des richtig eingestellten Bereichs bei 100 % Bildschirm-Skalierung (z.B. 2_graustufen.png
+eines Scans der Debug-Ablage) und speichert sie in ocr_recognition.ANCHOR_TEMPLATE_PATH.
+
+Vorher wird die Schwelle ocr_recognition.ANCHOR_MIN_SCORE geprüft:
+- höchste Übereinstimmung an einer anderen Stelle der Aufnahme (Label-Fläche mit Hintergrund
+  gefüllt, z.B. "Elementnummer"); die Schwelle muss mindestens --margin darüber liegen
+- je --check: Screenshot des ganzen Bildschirms, z.B. bei 125 % oder 150 % Skalierung; gezeigt
+  werden je Skalierung der Vorlage die beste Übereinstimmung und die Stelle; die Schwelle muss
+  unter der besten Übereinstimmung jedes Screenshots liegen
+Liegt die Schwelle außerhalb des so ermittelten Bereichs, wird nichts gespeichert.
+
+Aufruf: python -m benchmarks.make_anchor_template AUFNAHME [--check SCREENSHOT ...] [--margin 0.1]
+                                                 [--output PFAD] [--dry-run]
+"""
+
+import argparse
+import logging
+
+import cv2
+import numpy as np
+
+import ocr_recognition
+
+
+def _best_score(img: np.ndarray, template: np.ndarray) -> tuple[float, tuple[int, int]]:
+    if template.shape[0] > img.shape[0] or template.shape[1] > img.shape[1]:
+        return 0.0, (0, 0)
+    _, score, _, location = cv2.minMaxLoc(cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED))
+    return float(score), location
+
+
+def _read_gray(path: str) -> np.ndarray:
+    img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise SystemExit(f"Bild '{path}' nicht lesbar.")
+    return img
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="Aufnahme des Bereichs bei 100 %% Skalierung")
+    parser.add_argument("--check", nargs="*", default=[], help="Screenshots des ganzen Bildschirms zum Prüfen")
+    parser.add_argument("--margin", type=float, default=0.1, help="Mindestabstand anderer Stellen zur Schwelle")
+    parser.add_argument("--output", default=ocr_recognition.ANCHOR_TEMPLATE_PATH, help="Zieldatei")
+    parser.add_argument("--dry-run", action="store_true", help="nur prüfen, nichts speichern")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    capture = _read_gray(args.capture)
+    template = ocr_recognition.cut_anchor_template(capture)
+    templates = ocr_recognition.scale_anchor_template(template)
+    x, y = -ocr_recognition.ANCHOR_REGION_OFFSETS[0], -ocr_recognition.ANCHOR_REGION_OFFSETS[1]
+    width, height = ocr_recognition.ANCHOR_SIZE
+    threshold = ocr_recognition.ANCHOR_MIN_SCORE
+    print(f"Vorlage {width}x{height} bei ({x}, {y}), Schwelle {threshold:.2f}")
+
+    masked = capture.copy()
+    masked[y:y + height, x:x + width] = int(np.median(capture[y:y + height, x:x + width]))
+    other_score, other_location = _best_score(masked, template)
+    print(f"  andere Stelle der Aufnahme: {other_score:.3f} bei {other_location}")
+    lower, upper = other_score + args.margin, 1.0
+
+    for path in args.check:
+        screen = _read_gray(path)
+        best = max(((scale, *_best_score(screen, scaled)) for scale, scaled in templates.items()), key=lambda b: b[1])
+        upper = min(upper, best[1])
+        print(f"  {path}: beste Übereinstimmung {best[1]:.3f} bei {best[2]}, Skalierung {best[0]:g}")
+
+    ok = lower <= threshold <= upper
+    if lower > upper:
+        print(f"Vorlage nicht eindeutig: andere Stellen ({other_score:.3f}) liegen zu nah an den Treffern ({upper:.3f}).")
+    elif not ok:
+        print(f"ANCHOR_MIN_SCORE auf einen Wert zwischen {lower:.2f} und {upper:.2f} setzen.")
+    else:
+        print(f"Schwelle {threshold:.2f} liegt im zulässigen Bereich {lower:.2f} bis {upper:.2f}.")
+    if not ok:
+        raise SystemExit("Nichts gespeichert.")
+    if args.dry_run:
+        return
+    cv2.imwrite(args.output, template)
+    print(f"Gespeichert in '{args.output}'. Kalibrierung mit REGION_CALIBRATION_ENABLED = True einschalten.")
+
+
+if __name__ == "__main__":
+    main()
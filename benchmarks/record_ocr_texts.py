@@ -0,0 +1,54 @@
+# benchmarks/record_ocr_texts.py
+"""
+Zeichnet echte Tesseract-Ausgaben (image_to_string) des aufgenommenen Eigenschaftenfensters
+(panel_tesseract_eingabe.png) für bench_ocr_parse auf: je Page-Segmentation-Mode (--psm) und
+Bildgröße (--scales, INTER_AREA verkleinert) ein Text. Gespeichert werden die Texte samt psm,
+Skalierung, Backend und Tesseract-Version in ocr_texts_aufgezeichnet.json.
+
+Aufruf: python -m benchmarks.record_ocr_texts [--psm 3,4,6,11] [--scales 1,0.75,0.5] [--output PFAD]
+"""
+
+import argparse
+import json
+import logging
+
+import cv2
+
+import ocr_recognition
+from benchmarks.fixtures import RECORDED_OCR_TEXTS_PATH, load_panel_image
+
+
+def _tesseract_version() -> str | None:
+    try:
+        import tesserocr
+    except ImportError:
+        return None
+    return tesserocr.tesseract_version().splitlines()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--psm", default="3,4,6,11", help="Page-Segmentation-Modes, kommagetrennt")
+    parser.add_argument("--scales", default="1,0.75,0.5", help="Bildgrößen relativ zur Aufnahme, kommagetrennt")
+    parser.add_argument("--output", default=RECORDED_OCR_TEXTS_PATH, help="Zieldatei")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    img = load_panel_image()
+    backend = ocr_recognition.get_ocr_backend()
+    texts = []
+    for scale in (float(value) for value in args.scales.split(",")):
+        scaled = img if scale == 1.0 else cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        for psm in (int(value) for value in args.psm.split(",")):
+            texts.append({"psm": psm, "skalierung": scale,
+                          "text": ocr_recognition.run_ocr(scaled, psm, backend=backend)})
+            print(f"  psm {psm:2d}  Skalierung {scale:4g}  {len(texts[-1]['text'].splitlines()):3d} Zeilen")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"bild": "panel_tesseract_eingabe.png", "backend": backend.name,
+                   "tesseract": _tesseract_version(), "texte": texts}, f, ensure_ascii=False, indent=1)
+    print(f"{len(texts)} Texte gespeichert in '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# benchmarks/tune_preprocess.py
+"""
+Sucht die günstigste Vorverarbeitung für Tesseract, die auf den beschrifteten Bildschirm-Aufnahmen
+(benchmarks/panel_captures) die Ziel-Genauigkeit erreicht, und speichert sie in
+ocr_recognition.PREPROCESS_CONFIG_PATH; ocr_line_parse verwendet sie ab dem nächsten Start.
+
+Die Aufnahmen kommen aus der Debug-Ablage (debug_dump.DEBUG_DUMP_ENABLED): --add-capture ORDNER
+übernimmt 2_graustufen.png eines Scans und dessen ergebnis.json als Sollwerte (vor dem Tunen
+prüfen und in labels.json berichtigen). Gespeichert wird nur, wenn der Korpus mindestens
+MIN_CAPTURES Aufnahmen mit MIN_FEATURE_TYPES verschiedenen Feature-Typen enthält; sonst wird nur
+gemessen. benchmarks/panel_rekonstruiert ist keine echte Aufnahme und taugt nur zum Ausprobieren.
+
+Geprüft werden alle Kombinationen aus Skalierung (--scales), Interpolation (nearest, linear,
+cubic, lanczos) und Schwellwert (adaptiv Gauß mit mitskalierter Blockgröße, Otsu). Je Variante:
+Anteil richtig gelesener Felder über alle Aufnahmen und p50 der Scan-Zeit von ocr_line_parse
+(ohne Scan- und Zeilen-Cache).
+Günstigste Variante = kleinste p50 unter denen mit Genauigkeit >= --target.
+
+Aufruf: python -m benchmarks.tune_preprocess [--repeat N] [--target 1.0] [--scales 1.5,2,2.5,3]
+                                             [--corpus DIR] [--output PFAD] [--dry-run]
+        python -m benchmarks.tune_preprocess --add-capture debug_scans/scan_... [--corpus DIR]
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+
+import ocr_recognition
+from benchmarks.fixtures import PANEL_CAPTURES_DIR, load_panel_captures
+
+MIN_CAPTURES = 3
+MIN_FEATURE_TYPES = 2
+
+
+def candidate_configs(scales: list[float]) -> list[ocr_recognition.PreprocessConfig]:
+    """Alle Varianten; die Blockgröße des adaptiven Schwellwerts wächst mit der Skalierung (11 bei 3x)."""
+    configs = []
+    for scale in scales:
+        block_size = max(3, int(round(11 * scale / 3)) | 1)
+        for interpolation in ocr_recognition.INTERPOLATIONS:
+            for threshold in ocr_recognition.THRESHOLD_METHODS:
+                configs.append(ocr_recognition.PreprocessConfig(scale, interpolation, threshold, block_size, 2))
+    return configs
+
+
+def add_capture(scan_dir: str, corpus: str) -> tuple[str, dict]:
+    """Übernimmt Graustufen-Aufnahme und Ergebnis eines Debug-Scans in den Korpus: (Dateiname, Sollwerte)."""
+    with open(os.path.join(scan_dir, "ergebnis.json"), encoding="utf-8") as f:
+        expected = {key: value for key, value in json.load(f).items() if value is not None}
+    name = os.path.basename(os.path.normpath(scan_dir)) + ".png"
+    shutil.copyfile(os.path.join(scan_dir, "2_graustufen.png"), os.path.join(corpus, name))
+
+    labels_path = os.path.join(corpus, "labels.json")
+    with open(labels_path, encoding="utf-8") as f:
+        labels = json.load(f)
+    labels[name] = expected
+    with open(labels_path, "w", encoding="utf-8") as f:
+        json.dump(labels, f, ensure_ascii=False, indent=2)
+    return name, expected
+
+
+def corpus_shortcomings(captures: list) -> list[str]:
+    """Gründe, warum der Korpus für eine gespeicherte Vorverarbeitung nicht reicht (leer: reicht)."""
+    feature_types = {expected.get("Feature-Typ") for _, _, expected in captures} - {None}
+    reasons = []
+    if len(captures) < MIN_CAPTURES:
+        reasons.append(f"{len(captures)} Aufnahmen (mindestens {MIN_CAPTURES})")
+    if len(feature_types) < MIN_FEATURE_TYPES:
+        reasons.append(f"{len(feature_types)} Feature-Typen (mindestens {MIN_FEATURE_TYPES})")
+    return reasons
+
+
+def evaluate(config: ocr_recognition.PreprocessConfig, captures: list, repeat: int) -> tuple[float, np.ndarray, list]:
+    """(Genauigkeit, Scan-Zeiten in ms, falsche Felder als (Aufnahme, Feld, gelesen, soll))."""
+    ocr_recognition.set_preprocess_config(config)
+    correct, total, errors, samples = 0, 0, [], []
+    for name, img, expected in captures:
+        ocr_recognition.line_strip_cache.clear()
+        results, _ = ocr_recognition.ocr_line_parse(img)
+        for key, value in expected.items():
+            total += 1
+            if results.get(key) == value:
+                correct += 1
+            else:
+                errors.append((name, key, results.get(key), value))
+        for _ in range(repeat):
+            ocr_recognition.line_strip_cache.clear()
+            start = time.perf_counter()
+            ocr_recognition.ocr_line_parse(img)
+            samples.append((time.perf_counter() - start) * 1000.0)
+    return correct / total if total else 0.0, np.asarray(samples), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="gemessene Scans je Aufnahme und Variante")
+    parser.add_argument("--target", type=float, default=1.0, help="geforderter Anteil richtig gelesener Felder")
+    parser.add_argument("--scales", default="1.5,2,2.5,3", help="Skalierungen, kommagetrennt")
+    parser.add_argument("--corpus", default=PANEL_CAPTURES_DIR, help="Ordner mit Aufnahmen und labels.json")
+    parser.add_argument("--output", default=ocr_recognition.PREPROCESS_CONFIG_PATH, help="Zieldatei")
+    parser.add_argument("--dry-run", action="store_true", help="nur messen, nichts speichern")
+    parser.add_argument("--add-capture", metavar="ORDNER", help="Scan der Debug-Ablage in den Korpus übernehmen")
+    args = parser.parse_args()
+
+    if args.add_capture:
+        name, expected = add_capture(args.add_capture, args.corpus)
+        print(f"'{name}' übernommen. Sollwerte aus dem Scan, bitte in labels.json prüfen:")
+        for key, value in expected.items():
+            print(f"  {key:22s} {value}")
+        return
+
+    logging.disable(logging.CRITICAL)
+    captures = load_panel_captures(args.corpus)
+    if not captures:
+        raise SystemExit(f"Keine Aufnahmen in '{args.corpus}'. Debug-Ablage einschalten, einige Scans "
+                         f"verschiedener Feature-Typen machen und mit --add-capture übernehmen.")
+    shortcomings = corpus_shortcomings(captures)
+    if shortcomings and not args.dry_run:
+        print(f"Korpus zu klein zum Speichern ({', '.join(shortcomings)}); es wird nur gemessen.")
+        args.dry_run = True
+    fields = sum(len(expected) for _, _, expected in captures)
+    ocr_recognition.SCAN_CACHE_ENABLED = False
+    print(f"{len(captures)} Aufnahmen, {fields} Sollwerte, Backend {ocr_recognition.get_ocr_backend().name}, "
+          f"Zeilenstreifen {'an' if ocr_recognition.OCR_LINE_STRIPS else 'aus'}, {args.repeat} Scans je Aufnahme")
+
+    measured = []
+    for config in candidate_configs([float(value) for value in args.scales.split(",")]):
+        accuracy, samples, errors = evaluate(config, captures, args.repeat)
+        measured.append((config, accuracy, float(np.percentile(samples, 50)), float(np.percentile(samples, 95)), errors))
+        marker = "  (bisher)" if config == ocr_recognition.DEFAULT_PREPROCESS_CONFIG else ""
+        print(f"  {config.describe():28s} Genauigkeit {accuracy:6.1%}  p50 {measured[-1][2]:7.1f} ms  "
+              f"p95 {measured[-1][3]:7.1f} ms{marker}")
+
+    passing = [entry for entry in measured if entry[1] >= args.target]
+    if not passing:
+        best = max(measured, key=lambda entry: (entry[1], -entry[2]))
+        print(f"Keine Variante erreicht {args.target:.1%}; beste: {best[0].describe()} mit {best[1]:.1%}, "
+              f"falsch: {best[4]}. Nichts gespeichert.")
+        raise SystemExit(1)
+
+    config, accuracy, p50, p95, _ = min(passing, key=lambda entry: entry[2])
+    print(f"Günstigste Variante mit >= {args.target:.1%}: {config.describe()} (p50 {p50:.1f} ms)")
+    if args.dry_run:
+        return
+    ocr_recognition.save_preprocess_config(config, args.output, measurement={
+        "genauigkeit": round(accuracy, 4), "p50_ms": round(p50, 1), "p95_ms": round(p95, 1),
+        "aufnahmen": len(captures), "sollwerte": fields, "backend": ocr_recognition.get_ocr_backend().name,
+        "zeilenstreifen": ocr_recognition.OCR_LINE_STRIPS,
+        "erstellt": time.strftime("%Y-%m-%d %H:%M:%S")})
+    print(f"Gespeichert in '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
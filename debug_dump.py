@@ -0,0 +1,147 @@
+# debug_dump.py
+"""
+Dieses Modul enthält die optionale Debug-Ablage der Scans (standardmäßig aus).
+
+Ist DEBUG_DUMP_ENABLED gesetzt, sammelt ein DebugScan die Zwischenstände eines Scans
+(Aufnahme, vorverarbeitete Bilder, OCR-Texte, Ergebnisse). submit() übergibt ihn an einen
+Hintergrund-Thread, der ihn in einen eigenen Unterordner von DEBUG_DUMP_DIR schreibt und
+nur die letzten DEBUG_DUMP_MAX_SCANS Scans behält. Der Scan selbst wartet nie auf das
+Schreiben: ist die Warteschlange voll, wird der Debug-Scan verworfen.
+"""
+
+import os
+import json
+import time
+import queue
+import shutil
+import logging
+import threading
+
+import cv2
+import numpy as np
+
+# --- Logging  ---
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - (%(module)s) - %(message)s')
+
+# --- Konfiguration ---
+DEBUG_DUMP_ENABLED = False
+DEBUG_DUMP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug_scans")
+DEBUG_DUMP_MAX_SCANS = 20
+DEBUG_DUMP_QUEUE_SIZE = 4  # Scans, die höchstens auf das Schreiben warten
+
+
+class DebugScan:
+    """Zwischenstände eines Scans; Bilder werden kopiert, da die Puffer weiterverwendet werden können."""
+
+    def __init__(self):
+        self.created = time.time()
+        self.images: dict[str, np.ndarray] = {}
+        self.texts: dict[str, str] = {}
+
+    def add_image(self, name: str, img: np.ndarray | None):
+        if img is not None:
+            self.images[name] = img.copy()
+
+    def add_text(self, name: str, text: str | None):
+        if text is not None:
+            self.texts[name] = text
+
+    def add_json(self, name: str, data):
+        self.texts[name] = json.dumps(data, ensure_ascii=False, indent=2, default=str)
+
+
+class DebugDumpWriter:
+    """Schreibt DebugScans im Hintergrund in einen Ringordner mit den letzten max_scans Scans."""
+
+    def __init__(self, directory: str = DEBUG_DUMP_DIR, max_scans: int = DEBUG_DUMP_MAX_SCANS,
+                 queue_size: int = DEBUG_DUMP_QUEUE_SIZE):
+        self.directory = directory
+        self.max_scans = max_scans
+        self._queue: queue.Queue[DebugScan] = queue.Queue(maxsize=queue_size)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._sequence = 0
+        self.written = 0
+        self.dropped = 0
+
+    def submit(self, scan: DebugScan) -> bool:
+        """Übergibt den Scan ohne zu warten. False, wenn er verworfen wurde."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(scan)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Debug-Ablage ausgelastet, Scan verworfen (bisher {self.dropped} verworfen).")
+            return False
+
+    def flush(self, timeout: float | None = None):
+        """Wartet, bis alle übergebenen Scans geschrieben sind (z.B. für Tests und Benchmarks)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return
+            time.sleep(0.01)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="debug-dump", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            scan = self._queue.get()
+            try:
+                self._write(scan)
+                self._prune()
+                self.written += 1
+            except Exception as e:
+                logger.error(f"Fehler beim Schreiben des Debug-Scans: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, scan: DebugScan):
+        self._sequence += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(scan.created))
+        scan_dir = os.path.join(self.directory, f"scan_{stamp}_{int(scan.created * 1000) % 1000:03d}_{self._sequence:04d}")
+        os.makedirs(scan_dir, exist_ok=True)
+        for name, img in scan.images.items():
+            cv2.imwrite(os.path.join(scan_dir, f"{name}.png"), img)
+        for name, text in scan.texts.items():
+            with open(os.path.join(scan_dir, name), "w", encoding="utf-8") as f:
+                f.write(text)
+        logger.debug(f"Debug-Scan geschrieben: '{scan_dir}'.")
+
+    def _prune(self):
+        scans = sorted(entry.path for entry in os.scandir(self.directory)
+                       if entry.is_dir() and entry.name.startswith("scan_"))
+        for old_dir in scans[:max(0, len(scans) - self.max_scans)]:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+
+_writer: DebugDumpWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def new_scan() -> DebugScan | None:
+    """Neuer DebugScan, oder None, wenn die Debug-Ablage ausgeschaltet ist."""
+    return DebugScan() if DEBUG_DUMP_ENABLED else None
+
+
+def submit(scan: DebugScan | None) -> bool:
+    """Übergibt den Scan an den Hintergrund-Schreiber (ohne zu warten); None wird ignoriert."""
+    global _writer
+    if scan is None:
+        return False
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = DebugDumpWriter()
+                logger.info(f"Debug-Ablage aktiv: '{_writer.directory}' (letzte {_writer.max_scans} Scans).")
+    return _writer.submit(scan)
@@ -8,13 +8,33 @@ Dieses Modul enthält Hilfsfunktionen für den OCR-Prozess:
 
 import os
 import re
+import json
+import zlib
+import hashlib
+import glob
+import ctypes
+import ctypes.util
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, NamedTuple
 import cv2
 import numpy as np
 from PIL import ImageGrab, Image
 import pytesseract
 import time
+try:
+    import mss  # optional: schnelle Bildschirmaufnahme mit dauerhaftem Handle
+except Exception:
+    mss = None
+try:
+    import tesserocr  # optional; muss im Hauptthread importiert werden (cysignals), nicht erst im Scan-Thread
+except Exception:
+    tesserocr = None
 import logging
 
+import debug_dump
+
 # --- Logging  ---
 logger = logging.getLogger(__name__)
 if not logger.hasHandlers():
@@ -25,6 +45,37 @@ if not logger.hasHandlers():
 SCREEN_REGION = (7, 496, 364, 1382)  # (links, oben, rechts, unten) - ANPASSEN!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 TESS_LANG = "deu"
 TESS_CMD_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"  # ANPASSEN!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+TESS_DPI = 300
+# "auto": tesserocr -> Tesseract-C-API (ctypes) -> pytesseract; oder fest "tesserocr", "capi", "pytesseract"
+OCR_BACKEND = "auto"
+# "auto": mss -> PIL.ImageGrab; oder fest "mss", "imagegrab", "datei" (Wiedergabe gespeicherter Aufnahmen)
+CAPTURE_BACKEND = "auto"
+CAPTURE_REPLAY_PATH = None  # Bild oder Ordner mit Bildern für CAPTURE_BACKEND = "datei" (z.B. ohne Bildschirm)
+NUMBER_WHITELIST = "0123456789.-"  # Esprit zeigt die Werte mit Dezimalpunkt
+# Volltext: psm 4 und psm 11 gleichzeitig laufen lassen und die Felder nach Konfidenz zusammenführen,
+# statt psm 11 nur nachträglich als Korrekturlauf (Mehrkern-Rechner: Latenz eines Durchlaufs statt zwei)
+OCR_SPECULATIVE_PASSES = False
+# Volltext: Durchlauf 1 in Textzeilen-Streifen (psm 7) zerlegen; Zeilen mit unveränderten Pixeln kommen aus
+# dem Zeilen-Cache, nur geänderte Zeilen gehen an Tesseract. False: das ganze Fenster in einem Aufruf (psm 4)
+OCR_LINE_STRIPS = True
+# Volltext: die neu zu erkennenden Zeilenstreifen auf so viele Prozesse verteilen (0 = im Scan-Thread)
+OCR_LINE_WORKERS = 0
+# Unverändertes Fenster (gleiche Graustufen-Pixel) -> Ergebnis des letzten Scans ohne OCR
+SCAN_CACHE_ENABLED = True
+SCAN_CACHE_SIZE = 32
+SCAN_CACHE_PIXEL_TOLERANCE = 8  # erlaubte Abweichung je Pixel (Graustufen); geänderte Ziffern liegen weit darüber
+# Vorverarbeitung für Tesseract (Skalierung, Interpolation, Schwellwert), ermittelt mit
+# benchmarks/tune_preprocess.py; ohne Datei gilt DEFAULT_PREPROCESS_CONFIG (3x kubisch, adaptiv)
+PREPROCESS_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_vorverarbeitung.json")
+# Vor dem Hochskalieren auf den Inhalt zuschneiden (leere Ränder, Fläche unter der Tabelle, Bildlaufleiste)
+CONTENT_CROP_ENABLED = True
+# Bildschirmbereich über den Anker "Elementtyp" (Vorlage ANCHOR_TEMPLATE_PATH) selbst finden und in
+# REGION_CALIBRATION_PATH speichern; neu gesucht wird nur, wenn der Anker im Bereich fehlt. Ohne
+# gespeicherten Bereich gilt SCREEN_REGION. Die Vorlage wird aus einer Aufnahme des eigenen Bildschirms
+# geschnitten (benchmarks/make_anchor_template.py), erst danach einschalten.
+REGION_CALIBRATION_ENABLED = False
+REGION_CALIBRATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_bereich.json")
+ANCHOR_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "anker_elementtyp.png")
 
 # --- Tesseract Pfad  ---
 tesseract_cmd_set = False
@@ -48,24 +99,537 @@ except pytesseract.TesseractNotFoundError:
 except Exception as e:
     logger.error(f"Fehler beim Überprüfen der Tesseract-Version: {e}")
 
-# --- OCR Funktionen ---
+# --- OCR-Backends ---
+
+class OcrWord(NamedTuple):
+    text: str
+    confidence: float               # 0-100
+    box: tuple[int, int, int, int]  # (links, oben, rechts, unten) im Eingabebild
+    line: int                       # laufende Nummer der Textzeile
+
+
+class OcrBackend:
+    """
+    Schnittstelle der OCR-Engines: Text eines Graustufen-/Binärbildes mit gegebenem Page-Segmentation-Mode.
+    Mit whitelist werden nur diese Zeichen erkannt (tessedit_char_whitelist), z.B. für Zahlenfelder.
+    image_to_data liefert die Wörter mit Konfidenz, Position und Zeilennummer.
+    """
+    name = "basis"
+
+    def image_to_string(self, img: np.ndarray, psm: int, whitelist: str | None = None) -> str:
+        raise NotImplementedError
+
+    def image_to_data(self, img: np.ndarray, psm: int, whitelist: str | None = None) -> list["OcrWord"]:
+        raise NotImplementedError
+
+
+class PytesseractBackend(OcrBackend):
+    """Startet pro Aufruf tesseract.exe (lädt die Sprachdaten jedes Mal neu). Immer verfügbar, aber langsam."""
+    name = "pytesseract"
+
+    def image_to_string(self, img: np.ndarray, psm: int, whitelist: str | None = None) -> str:
+        config = f"--oem 3 --psm {psm} --dpi {TESS_DPI} -l {TESS_LANG}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        return pytesseract.image_to_string(img, config=config)
+
+    def image_to_data(self, img: np.ndarray, psm: int, whitelist: str | None = None) -> list[OcrWord]:
+        config = f"--oem 3 --psm {psm} --dpi {TESS_DPI} -l {TESS_LANG}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        data = pytesseract.image_to_data(img, config=config, output_type=pytesseract.Output.DICT)
+        words, line_numbers = [], {}
+        for i, text in enumerate(data["text"]):
+            conf = float(data["conf"][i])
+            if conf < 0 or not text.strip():
+                continue  # Seiten-, Block- und Zeilen-Einträge ohne Wort
+            line = line_numbers.setdefault((data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+                                           len(line_numbers))
+            left, top = data["left"][i], data["top"][i]
+            words.append(OcrWord(text.strip(), conf, (left, top, left + data["width"][i], top + data["height"][i]), line))
+        return words
+
+
+def _tessdata_dir() -> str | None:
+    """tessdata-Ordner neben TESS_CMD_PATH (Windows-Installation), sonst None (TESSDATA_PREFIX/Standard)."""
+    if TESS_CMD_PATH:
+        candidate = os.path.join(os.path.dirname(TESS_CMD_PATH), "tessdata")
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def _as_gray_bytes(img: np.ndarray) -> tuple[bytes, int, int]:
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    img = np.ascontiguousarray(img, dtype=np.uint8)
+    height, width = img.shape
+    return img.tobytes(), width, height
+
+
+class TesserocrBackend(OcrBackend):
+    """In-Process-Tesseract über tesserocr; die Sprachdaten bleiben zwischen den Scans geladen."""
+    name = "tesserocr"
+
+    def __init__(self):
+        if tesserocr is None:
+            raise ImportError("tesserocr ist nicht installiert.")
+        options = {"lang": TESS_LANG, "oem": tesserocr.OEM.DEFAULT}
+        if _tessdata_dir():
+            options["path"] = _tessdata_dir()
+        self._api = tesserocr.PyTessBaseAPI(**options)
+        self._lock = threading.Lock()
+
+    def image_to_string(self, img: np.ndarray, psm: int, whitelist: str | None = None) -> str:
+        data, width, height = _as_gray_bytes(img)
+        with self._lock:
+            self._api.SetVariable("tessedit_char_whitelist", whitelist or "")
+            self._api.SetPageSegMode(psm)
+            self._api.SetImageBytes(data, width, height, 1, width)
+            self._api.SetSourceResolution(TESS_DPI)
+            return self._api.GetUTF8Text()
+
+    def image_to_data(self, img: np.ndarray, psm: int, whitelist: str | None = None) -> list[OcrWord]:
+        data, width, height = _as_gray_bytes(img)
+        word_level, line_level = tesserocr.RIL.WORD, tesserocr.RIL.TEXTLINE
+        words, line = [], -1
+        with self._lock:
+            self._api.SetVariable("tessedit_char_whitelist", whitelist or "")
+            self._api.SetPageSegMode(psm)
+            self._api.SetImageBytes(data, width, height, 1, width)
+            self._api.SetSourceResolution(TESS_DPI)
+            self._api.Recognize()
+            iterator = self._api.GetIterator()
+            if iterator is None:
+                return words
+            for word in tesserocr.iterate_level(iterator, word_level):
+                if word.IsAtBeginningOf(line_level):
+                    line += 1
+                try:
+                    text = (word.GetUTF8Text(word_level) or "").strip()
+                except RuntimeError:  # tesserocr meldet leere Seiten/Wörter als Ausnahme
+                    continue
+                box = word.BoundingBox(word_level)
+                if text and box:
+                    words.append(OcrWord(text, word.Confidence(word_level), tuple(box), max(line, 0)))
+        return words
+
+
+class TesseractCApiBackend(OcrBackend):
+    """In-Process-Tesseract über die C-API von libtesseract (ctypes), z.B. libtesseract-5.dll der Windows-Installation."""
+    name = "capi"
+
+    def __init__(self):
+        self._lib = self._load_library()
+        lib = self._lib
+        lib.TessBaseAPICreate.restype = ctypes.c_void_p
+        lib.TessBaseAPIInit2.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+        lib.TessBaseAPISetVariable.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+        lib.TessBaseAPISetPageSegMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessBaseAPISetImage.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_int,
+                                            ctypes.c_int, ctypes.c_int]
+        lib.TessBaseAPISetSourceResolution.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p  # muss mit TessDeleteText freigegeben werden
+        lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIClear.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIRecognize.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        lib.TessBaseAPIGetIterator.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIGetIterator.restype = ctypes.c_void_p
+        lib.TessResultIteratorGetUTF8Text.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessResultIteratorGetUTF8Text.restype = ctypes.c_void_p
+        lib.TessResultIteratorConfidence.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessResultIteratorConfidence.restype = ctypes.c_float
+        lib.TessResultIteratorNext.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessResultIteratorDelete.argtypes = [ctypes.c_void_p]
+        lib.TessResultIteratorGetPageIterator.argtypes = [ctypes.c_void_p]
+        lib.TessResultIteratorGetPageIterator.restype = ctypes.c_void_p
+        lib.TessPageIteratorIsAtBeginningOf.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        int_ptr = ctypes.POINTER(ctypes.c_int)
+        lib.TessPageIteratorBoundingBox.argtypes = [ctypes.c_void_p, ctypes.c_int, int_ptr, int_ptr, int_ptr, int_ptr]
+
+        self._handle = lib.TessBaseAPICreate()
+        datapath = _tessdata_dir()
+        if lib.TessBaseAPIInit2(self._handle, datapath.encode() if datapath else None, TESS_LANG.encode(), 3) != 0:
+            raise RuntimeError(f"TessBaseAPIInit2 fehlgeschlagen (Sprache '{TESS_LANG}', tessdata '{datapath}').")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load_library() -> ctypes.CDLL:
+        if os.name == "nt" and TESS_CMD_PATH:
+            tess_dir = os.path.dirname(TESS_CMD_PATH)
+            dlls = sorted(glob.glob(os.path.join(tess_dir, "libtesseract-*.dll")))
+            if dlls:
+                os.add_dll_directory(tess_dir)  # für die Abhängigkeiten (Leptonica usw.)
+                return ctypes.CDLL(dlls[-1])
+        name = ctypes.util.find_library("tesseract")
+        if not name:
+            raise OSError("libtesseract nicht gefunden.")
+        return ctypes.CDLL(name)
+
+    def image_to_string(self, img: np.ndarray, psm: int, whitelist: str | None = None) -> str:
+        data, width, height = _as_gray_bytes(img)
+        lib = self._lib
+        with self._lock:
+            lib.TessBaseAPISetVariable(self._handle, b"tessedit_char_whitelist", (whitelist or "").encode())
+            lib.TessBaseAPISetPageSegMode(self._handle, psm)
+            lib.TessBaseAPISetImage(self._handle, data, width, height, 1, width)
+            lib.TessBaseAPISetSourceResolution(self._handle, TESS_DPI)
+            text_ptr = lib.TessBaseAPIGetUTF8Text(self._handle)
+            try:
+                return ctypes.string_at(text_ptr).decode("utf-8") if text_ptr else ""
+            finally:
+                if text_ptr:
+                    lib.TessDeleteText(text_ptr)
+                lib.TessBaseAPIClear(self._handle)
+
+    def image_to_data(self, img: np.ndarray, psm: int, whitelist: str | None = None) -> list[OcrWord]:
+        data, width, height = _as_gray_bytes(img)
+        lib, word_level, line_level = self._lib, 3, 2  # RIL_WORD, RIL_TEXTLINE
+        words, line = [], -1
+        box = [ctypes.c_int() for _ in range(4)]
+        with self._lock:
+            lib.TessBaseAPISetVariable(self._handle, b"tessedit_char_whitelist", (whitelist or "").encode())
+            lib.TessBaseAPISetPageSegMode(self._handle, psm)
+            lib.TessBaseAPISetImage(self._handle, data, width, height, 1, width)
+            lib.TessBaseAPISetSourceResolution(self._handle, TESS_DPI)
+            try:
+                if lib.TessBaseAPIRecognize(self._handle, None) != 0:
+                    raise RuntimeError("TessBaseAPIRecognize fehlgeschlagen.")
+                iterator = lib.TessBaseAPIGetIterator(self._handle)
+                if not iterator:
+                    return words
+                page_iterator = lib.TessResultIteratorGetPageIterator(iterator)
+                try:
+                    while True:
+                        if lib.TessPageIteratorIsAtBeginningOf(page_iterator, line_level):
+                            line += 1
+                        text_ptr = lib.TessResultIteratorGetUTF8Text(iterator, word_level)
+                        text = ctypes.string_at(text_ptr).decode("utf-8").strip() if text_ptr else ""
+                        if text_ptr:
+                            lib.TessDeleteText(text_ptr)
+                        if text and lib.TessPageIteratorBoundingBox(page_iterator, word_level,
+                                                                    *(ctypes.byref(value) for value in box)):
+                            words.append(OcrWord(text, float(lib.TessResultIteratorConfidence(iterator, word_level)),
+                                                 tuple(value.value for value in box), max(line, 0)))
+                        if not lib.TessResultIteratorNext(iterator, word_level):
+                            break
+                finally:
+                    lib.TessResultIteratorDelete(iterator)
+            finally:
+                lib.TessBaseAPIClear(self._handle)
+        return words
+
+
+OCR_BACKEND_CLASSES = {
+    "tesserocr": TesserocrBackend,
+    "capi": TesseractCApiBackend,
+    "pytesseract": PytesseractBackend,
+}
+
+_ocr_backend: OcrBackend | None = None
+_ocr_backend_lock = threading.Lock()
+
+
+def create_ocr_backend(name: str = OCR_BACKEND) -> OcrBackend:
+    """Erzeugt das gewünschte Backend; bei "auto" oder Fehlern das nächste verfügbare bis hin zu pytesseract."""
+    names = list(OCR_BACKEND_CLASSES) if name == "auto" else [name, "pytesseract"]
+    for candidate in dict.fromkeys(names):
+        try:
+            backend = OCR_BACKEND_CLASSES[candidate]()
+            logger.info(f"OCR-Backend: {backend.name}")
+            return backend
+        except Exception as e:
+            logger.info(f"OCR-Backend '{candidate}' nicht verfügbar: {e}")
+    raise RuntimeError("Kein OCR-Backend verfügbar.")
+
+
+def get_ocr_backend() -> OcrBackend:
+    """Das gemeinsame OCR-Backend (wird beim ersten Scan erzeugt und danach wiederverwendet)."""
+    global _ocr_backend
+    if _ocr_backend is None:
+        with _ocr_backend_lock:
+            if _ocr_backend is None:
+                _ocr_backend = create_ocr_backend()
+    return _ocr_backend
+
+
+_thread_backends = threading.local()
+
 
-def capture_to_cv2(bbox: tuple[int, int, int, int]) -> np.ndarray:
-    """Erfasst Screenshot des Bereichs bbox und konvertiert zu OpenCV-Format."""
+def get_thread_ocr_backend() -> OcrBackend:
+    """Eigenes Backend des aktuellen Threads (gleiche Art wie get_ocr_backend), für parallele Durchläufe."""
+    backend = getattr(_thread_backends, "backend", None)
+    if backend is None:
+        backend = _thread_backends.backend = create_ocr_backend(get_ocr_backend().name)
+    return backend
+
+
+def _call_backend(backend: OcrBackend | None, method: str, *args):
+    """Ruft method am Backend (Standard: das gemeinsame) auf; schlägt ein In-Process-Backend fehl, einmalig per pytesseract."""
+    backend = backend or get_ocr_backend()
     try:
-        pil_img = ImageGrab.grab(bbox=bbox, all_screens=True)
-        if pil_img is None:
-            raise RuntimeError("ImageGrab.grab (all_screens=True) lieferte None zurück.")
-        return cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+        return getattr(backend, method)(*args)
     except Exception as e:
-        logger.warning(f"Fehler bei ImageGrab (all_screens=True): {e}. Versuche Standard-Grab...")
-        time.sleep(0.2)
+        if isinstance(backend, PytesseractBackend):
+            raise
+        logger.error(f"OCR-Backend '{backend.name}' fehlgeschlagen: {e}. Verwende pytesseract für diesen Durchlauf.")
+        return getattr(PytesseractBackend(), method)(*args)
+
+
+def run_ocr(img: np.ndarray, psm: int, whitelist: str | None = None, backend: OcrBackend | None = None) -> str:
+    """OCR-Text des Bildes (Standard: gemeinsames Backend)."""
+    return _call_backend(backend, "image_to_string", img, psm, whitelist)
+
+
+def run_ocr_data(img: np.ndarray, psm: int, whitelist: str | None = None,
+                 backend: OcrBackend | None = None) -> list[OcrWord]:
+    """OCR-Wörter des Bildes mit Konfidenz und Position (Standard: gemeinsames Backend)."""
+    return _call_backend(backend, "image_to_data", img, psm, whitelist)
+
+
+def group_lines(words: list[OcrWord]) -> list[list[OcrWord]]:
+    """Wörter je Textzeile, in Lesereihenfolge."""
+    lines: dict[int, list[OcrWord]] = {}
+    for word in words:
+        lines.setdefault(word.line, []).append(word)
+    return list(lines.values())
+
+
+# --- Capture-Backends ---
+
+class CaptureBackend:
+    """
+    Schnittstelle der Bildschirmaufnahme: grab(bbox) liefert den Bereich (links, oben, rechts, unten)
+    als BGR-Bild (uint8, H x B x 3), grab_gray(bbox) direkt als Graustufenbild (H x B). Mit out
+    (passende Form) wird in diesen Puffer geschrieben.
+    """
+    name = "basis"
+
+    def grab(self, bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+        raise NotImplementedError
+
+    def grab_gray(self, bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+        return cv2.cvtColor(self.grab(bbox), cv2.COLOR_BGR2GRAY, dst=out)
+
+    def screen_bounds(self) -> tuple[int, int, int, int]:
+        """Bereich aller Bildschirme (links, oben, rechts, unten) in Bildschirmkoordinaten."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ImageGrabBackend(CaptureBackend):
+    """PIL.ImageGrab: baut je Aufnahme ein PIL-Bild auf und kopiert es nach NumPy. Unter Windows immer verfügbar."""
+    name = "imagegrab"
+
+    def grab(self, bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+        return cv2.cvtColor(self._grab_rgb(bbox), cv2.COLOR_RGB2BGR, dst=out)
+
+    def grab_gray(self, bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+        return cv2.cvtColor(self._grab_rgb(bbox), cv2.COLOR_RGB2GRAY, dst=out)
+
+    def screen_bounds(self) -> tuple[int, int, int, int]:
+        if os.name == "nt":
+            metrics = ctypes.windll.user32.GetSystemMetrics  # virtueller Bildschirm über alle Monitore
+            left, top = metrics(76), metrics(77)  # SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN
+            return left, top, left + metrics(78), top + metrics(79)  # SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN
+        width, height = ImageGrab.grab(all_screens=True).size
+        return 0, 0, width, height
+
+    @staticmethod
+    def _grab_rgb(bbox: tuple[int, int, int, int]) -> np.ndarray:
         try:
+            pil_img = ImageGrab.grab(bbox=bbox, all_screens=True)
+            if pil_img is None:
+                raise RuntimeError("ImageGrab.grab (all_screens=True) lieferte None zurück.")
+        except Exception as e:
+            logger.warning(f"Fehler bei ImageGrab (all_screens=True): {e}. Versuche Standard-Grab...")
+            time.sleep(0.2)
             pil_img = ImageGrab.grab(bbox=bbox)
             if pil_img is None:
-                 raise RuntimeError("ImageGrab.grab lieferte None zurück.")
+                raise RuntimeError("ImageGrab.grab lieferte None zurück.")
             logger.info("Erneuter Versuch der Screenshot-Erfassung (Standard) erfolgreich.")
-            return cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+        return np.asarray(pil_img.convert("RGB") if pil_img.mode != "RGB" else pil_img)
+
+
+class MssBackend(CaptureBackend):
+    """
+    mss (GDI BitBlt unter Windows, XGetImage/XShm unter X11/Xvfb) mit einem dauerhaften Handle für alle
+    Threads. Die Scans laufen je in einem eigenen Thread; ein Handle je Thread bliebe nach dessen Ende
+    offen. Ab mss 10.2 darf ein Handle von mehreren Threads benutzt werden, die Aufnahmen laufen
+    trotzdem nacheinander (Sperre). Die Rohpixel (BGRA) werden ohne Zwischenbild in einem Schritt
+    nach BGR umgewandelt.
+    """
+    name = "mss"
+
+    def __init__(self):
+        if mss is None:
+            raise ImportError("mss ist nicht installiert.")
+        self._sct = None
+        self._lock = threading.Lock()
+        with self._lock:
+            self._handle()  # früh scheitern, z.B. ohne Bildschirm (kein DISPLAY)
+
+    def _handle(self):
+        """Das gemeinsame Handle (nach close neu angelegt); nur unter self._lock aufrufen."""
+        if self._sct is None:
+            self._sct = mss.mss()
+        return self._sct
+
+    def grab(self, bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+        return cv2.cvtColor(self._grab_bgra(bbox), cv2.COLOR_BGRA2BGR, dst=out)
+
+    def grab_gray(self, bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+        return cv2.cvtColor(self._grab_bgra(bbox), cv2.COLOR_BGRA2GRAY, dst=out)
+
+    def screen_bounds(self) -> tuple[int, int, int, int]:
+        with self._lock:
+            monitor = self._handle().monitors[0]  # alle Monitore zusammen
+        return monitor["left"], monitor["top"], monitor["left"] + monitor["width"], monitor["top"] + monitor["height"]
+
+    def _grab_bgra(self, bbox: tuple[int, int, int, int]) -> np.ndarray:
+        """Sicht auf die Rohpixel der Aufnahme (keine Kopie; jede Aufnahme hat ihren eigenen Speicher)."""
+        left, top, right, bottom = bbox
+        with self._lock:
+            shot = self._handle().grab({"left": left, "top": top, "width": right - left, "height": bottom - top})
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def close(self):
+        with self._lock:
+            if self._sct is not None:
+                self._sct.close()
+                self._sct = None
+
+
+class ReplayCaptureBackend(CaptureBackend):
+    """
+    Liefert gespeicherte Aufnahmen statt des Bildschirms (Tests und Benchmarks ohne Anzeige).
+    CAPTURE_REPLAY_PATH ist ein Bild oder ein Ordner; die Bilder werden der Reihe nach im Kreis geliefert.
+    Ist ein Bild größer als bbox (Vollbild-Screenshot), wird bbox daraus ausgeschnitten, sonst muss
+    es genau die Größe von bbox haben.
+    """
+    name = "datei"
+    IMAGE_EXTENSIONS = (".png", ".bmp", ".jpg", ".jpeg", ".tif", ".tiff")
+
+    def __init__(self, path: str | None = None):
+        path = path or CAPTURE_REPLAY_PATH
+        if not path:
+            raise ValueError("CAPTURE_REPLAY_PATH ist nicht gesetzt.")
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                           if name.lower().endswith(self.IMAGE_EXTENSIONS))
+        else:
+            files = [path]
+        self._frames = []
+        for file in files:
+            img = cv2.imread(file, cv2.IMREAD_COLOR)
+            if img is None:
+                raise ValueError(f"Bild '{file}' konnte nicht gelesen werden.")
+            self._frames.append(img)
+        if not self._frames:
+            raise ValueError(f"Keine Bilder in '{path}'.")
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def grab(self, bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+        frame = self._next_frame(bbox)
+        if out is not None and out.shape == frame.shape and out.dtype == frame.dtype:
+            np.copyto(out, frame)
+            return out
+        return frame.copy()
+
+    def grab_gray(self, bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+        return cv2.cvtColor(self._next_frame(bbox), cv2.COLOR_BGR2GRAY, dst=out)
+
+    def screen_bounds(self) -> tuple[int, int, int, int]:
+        with self._lock:
+            height, width = self._frames[self._next].shape[:2]
+        return 0, 0, width, height
+
+    def _next_frame(self, bbox: tuple[int, int, int, int]) -> np.ndarray:
+        """Nächste Aufnahme bzw. der Ausschnitt bbox daraus (Sicht, keine Kopie)."""
+        with self._lock:
+            frame = self._frames[self._next]
+            self._next = (self._next + 1) % len(self._frames)
+        left, top, right, bottom = bbox
+        if frame.shape[:2] == (bottom - top, right - left):
+            return frame
+        if frame.shape[0] < bottom or frame.shape[1] < right or left < 0 or top < 0:
+            raise ValueError(f"Aufnahme {frame.shape[1]}x{frame.shape[0]} passt nicht zum Bereich {bbox}.")
+        return frame[top:bottom, left:right]
+
+
+CAPTURE_BACKEND_CLASSES = {
+    "mss": MssBackend,
+    "imagegrab": ImageGrabBackend,
+    "datei": ReplayCaptureBackend,
+}
+_AUTO_CAPTURE_BACKENDS = ("mss", "imagegrab")  # "datei" nur ausdrücklich
+
+_capture_backend: CaptureBackend | None = None
+_capture_backend_lock = threading.Lock()
+
+
+def create_capture_backend(name: str = CAPTURE_BACKEND) -> CaptureBackend:
+    """Erzeugt das gewünschte Capture-Backend; bei "auto" oder Fehlern das nächste verfügbare bis hin zu ImageGrab."""
+    names = list(_AUTO_CAPTURE_BACKENDS) if name == "auto" else [name, "imagegrab"]
+    for candidate in dict.fromkeys(names):
+        try:
+            backend = CAPTURE_BACKEND_CLASSES[candidate]()
+            logger.info(f"Capture-Backend: {backend.name}")
+            return backend
+        except Exception as e:
+            logger.info(f"Capture-Backend '{candidate}' nicht verfügbar: {e}")
+    raise RuntimeError("Kein Capture-Backend verfügbar.")
+
+
+def get_capture_backend() -> CaptureBackend:
+    """Das gemeinsame Capture-Backend (wird bei der ersten Aufnahme erzeugt und danach wiederverwendet)."""
+    global _capture_backend
+    if _capture_backend is None:
+        with _capture_backend_lock:
+            if _capture_backend is None:
+                _capture_backend = create_capture_backend()
+    return _capture_backend
+
+
+# --- OCR Funktionen ---
+
+def capture_to_cv2(bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Erfasst Screenshot des Bereichs bbox und konvertiert zu OpenCV-Format (BGR).
+    Mit out wird in den übergebenen Puffer geschrieben (wiederholte Scans ohne neue Bilder).
+    """
+    return _capture(bbox, "grab", out)
+
+
+def capture_gray(bbox: tuple[int, int, int, int], out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Aufnahme des Bereichs bbox direkt als Graustufenbild (ersetzt capture_to_cv2 + preprocess):
+    die Pixel des Backends werden in einem Schritt umgewandelt, ohne Farb-Zwischenbilder.
+    Mit out (uint8, H x B) wird in diesen Puffer geschrieben; wiederholte Scans legen dann kein
+    neues Bild an. Passt out nicht zur Größe von bbox, wird ein neues Bild geliefert.
+    """
+    return _capture(bbox, "grab_gray", out)
+
+
+def _capture(bbox: tuple[int, int, int, int], method: str, out: np.ndarray | None) -> np.ndarray:
+    """Ruft method am gemeinsamen Capture-Backend auf; schlägt es fehl, einmalig per ImageGrab."""
+    backend = get_capture_backend()
+    try:
+        img = getattr(backend, method)(bbox, out)
+        if img is None or img.size == 0:
+            raise RuntimeError(f"Capture-Backend '{backend.name}' lieferte kein Bild.")
+        return img
+    except Exception as e:
+        if isinstance(backend, ImageGrabBackend):
+            logger.error(f"Erneuter Fehler bei ImageGrab: {e}", exc_info=True)
+            raise RuntimeError(f"Screenshot konnte nicht erfasst werden: {e}") from e
+        logger.error(f"Capture-Backend '{backend.name}' fehlgeschlagen: {e}. Verwende ImageGrab für diese Aufnahme.")
+        try:
+            return getattr(ImageGrabBackend(), method)(bbox, out)
         except Exception as e2:
             logger.error(f"Erneuter Fehler bei ImageGrab: {e2}", exc_info=True)
             raise RuntimeError(f"Screenshot konnte nicht erfasst werden: {e2}") from e2
@@ -78,139 +642,598 @@ def preprocess(cv_img: np.ndarray) -> np.ndarray:
     return cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY)
 
 
-# In ocr_recognition.py
+# --- Vorverarbeitung für Tesseract (Hochskalieren + Binarisieren) ---
 
-def ocr_line_parse(gray_img: np.ndarray) -> tuple[dict, str]:
+INTERPOLATIONS = {
+    "nearest": cv2.INTER_NEAREST,
+    "linear": cv2.INTER_LINEAR,
+    "cubic": cv2.INTER_CUBIC,
+    "lanczos": cv2.INTER_LANCZOS4,
+}
+THRESHOLD_METHODS = ("adaptive", "otsu")
+
+
+class PreprocessConfig(NamedTuple):
+    scale: float = 3.0              # Ein höherer Skalierungsfaktor gibt Tesseract mehr Pixel zum Arbeiten
+    interpolation: str = "cubic"    # Schlüssel von INTERPOLATIONS
+    threshold: str = "adaptive"     # "adaptive" (Gauß, lokal) oder "otsu" (global)
+    block_size: int = 11            # Nachbarschaft des adaptiven Schwellwerts (ungerade)
+    c: int = 2                      # vom lokalen Mittel abgezogene Konstante
+
+    def describe(self) -> str:
+        threshold = f"adaptiv {self.block_size}/{self.c}" if self.threshold == "adaptive" else "Otsu"
+        return f"{self.scale:g}x {self.interpolation}, {threshold}"
+
+
+DEFAULT_PREPROCESS_CONFIG = PreprocessConfig()
+
+_preprocess_config: PreprocessConfig | None = None
+_preprocess_config_lock = threading.Lock()
+
+
+def _validate_preprocess_config(config: PreprocessConfig) -> PreprocessConfig:
+    if not 1.0 <= config.scale <= 6.0:
+        raise ValueError(f"Skalierung {config.scale} außerhalb von 1..6")
+    if config.interpolation not in INTERPOLATIONS:
+        raise ValueError(f"Unbekannte Interpolation '{config.interpolation}'")
+    if config.threshold not in THRESHOLD_METHODS:
+        raise ValueError(f"Unbekannter Schwellwert '{config.threshold}'")
+    if config.block_size < 3 or config.block_size % 2 == 0:
+        raise ValueError(f"Blockgröße {config.block_size} muss ungerade und mindestens 3 sein")
+    return config
+
+
+def load_preprocess_config(path: str = PREPROCESS_CONFIG_PATH) -> PreprocessConfig:
     """
-    Führt OCR durch und extrahiert spezifische Daten.
-    Verwendet eine Zwei-Durchlauf-Strategie, um spezifische Erkennungsfehler zu korrigieren.
+    Lädt die Vorverarbeitung aus der Datei (geschrieben von save_preprocess_config).
+    Fehlt die Datei oder ist sie ungültig, gilt DEFAULT_PREPROCESS_CONFIG.
     """
-    if gray_img is None or gray_img.size == 0:
-        logger.error("Ungültiges Graustufenbild an ocr_line_parse übergeben.")
-        raise ValueError("Ungültiges Graustufenbild für OCR erhalten.")
+    if not os.path.exists(path):
+        return DEFAULT_PREPROCESS_CONFIG
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        config = PreprocessConfig(**{key: data[key] for key in PreprocessConfig._fields if key in data})
+        config = _validate_preprocess_config(config._replace(scale=float(config.scale), block_size=int(config.block_size),
+                                                             c=int(config.c)))
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Vorverarbeitung aus '{path}' ungültig ({e}). Verwende Standard "
+                       f"({DEFAULT_PREPROCESS_CONFIG.describe()}).")
+        return DEFAULT_PREPROCESS_CONFIG
+    logger.info(f"Vorverarbeitung aus '{path}' geladen: {config.describe()}")
+    return config
 
-    # --- Bildvorverarbeitung (Upscaling + Binarisierung für bessere Erkennung) ---
-    scale_factor = 3.0  # Ein höherer Skalierungsfaktor gibt Tesseract mehr Pixel zum Arbeiten
-    logger.info(f"Upscaling Graustufenbild mit Faktor: {scale_factor}")
+
+def save_preprocess_config(config: PreprocessConfig, path: str = PREPROCESS_CONFIG_PATH,
+                           measurement: dict | None = None):
+    """Speichert die Vorverarbeitung (mit optionalen Messwerten des Tuners zur Nachvollziehbarkeit)."""
+    data = dict(_validate_preprocess_config(config)._asdict())
+    if measurement:
+        data["messung"] = measurement
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    logger.info(f"Vorverarbeitung gespeichert in '{path}': {config.describe()}")
+
+
+def get_preprocess_config() -> PreprocessConfig:
+    """Aktive Vorverarbeitung (beim ersten Aufruf aus PREPROCESS_CONFIG_PATH geladen)."""
+    global _preprocess_config
+    if _preprocess_config is None:
+        with _preprocess_config_lock:
+            if _preprocess_config is None:
+                _preprocess_config = load_preprocess_config()
+    return _preprocess_config
+
+
+def set_preprocess_config(config: PreprocessConfig):
+    """Setzt die aktive Vorverarbeitung (ohne zu speichern); der Scan-Cache verwirft danach seine Ergebnisse."""
+    global _preprocess_config
+    with _preprocess_config_lock:
+        _preprocess_config = _validate_preprocess_config(config)
+
+
+def preprocess_for_ocr(gray_img: np.ndarray, config: PreprocessConfig | None = None,
+                       upscaled_out: np.ndarray | None = None, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Skaliert das Graustufenbild hoch und binarisiert es (Schrift schwarz auf weiß).
+    upscaled_out/out sind optionale Puffer für das hochskalierte und das binarisierte Bild.
+    """
+    config = config or get_preprocess_config()
+    height, width = gray_img.shape
+    upscaled = cv2.resize(gray_img, (int(width * config.scale), int(height * config.scale)), dst=upscaled_out,
+                          interpolation=INTERPOLATIONS[config.interpolation])
+    if config.threshold == "otsu":
+        return cv2.threshold(upscaled, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=out)[1]
+    return cv2.adaptiveThreshold(upscaled, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                 config.block_size, config.c, dst=out)
+
+
+_CONTENT_DARK_MAX = 160        # Graustufen darunter sind Schrift oder Linien
+_CONTENT_LINE_MIN_INK = 0.3    # Spalten mit mehr dunklen Pixeln sind senkrechte Linien (Rahmen, Trenner)
+_CONTENT_MAX_GAP = 24          # leere Bildzeilen (ungeskaliert), ab denen ein neuer Block beginnt
+_CONTENT_TEXT_MIN_RUNS = 8     # Blöcke mit einer Zeile aus so vielen dunklen Abschnitten enthalten Schrift
+_CONTENT_MARGIN = 3
+
+
+def content_bounds(gray_img: np.ndarray) -> tuple[int, int, int, int] | None:
+    """
+    Umriss (oben, unten, links, rechts) des Inhalts im Graustufenbild über die Projektionsprofile
+    der dunklen Pixel. Zeilen, in denen nur senkrechte Linien liegen, gelten als leer. Von den durch
+    größere Lücken getrennten Blöcken bleiben alle mit Schrift (eine Zeile mit mindestens
+    _CONTENT_TEXT_MIN_RUNS dunklen Abschnitten) samt allem dazwischen; wegfallen nur Blöcke davor und
+    danach ohne Schrift, z.B. die Bildlaufleiste am unteren Rand. Ohne Block mit Schrift bleibt der mit
+    den meisten Inhaltszeilen. None, wenn nichts gefunden wird.
+    """
+    dark = gray_img < _CONTENT_DARK_MAX
+    lines = dark.mean(axis=0) >= _CONTENT_LINE_MIN_INK
+    content = dark[:, ~lines]
+    rows = np.flatnonzero(content.any(axis=1))
+    if rows.size == 0:
+        return None
+    blocks = np.split(rows, np.flatnonzero(np.diff(rows) > _CONTENT_MAX_GAP) + 1)
+    runs = np.count_nonzero(content[:, 1:] & ~content[:, :-1], axis=1)  # Beginne dunkler Abschnitte je Bildzeile
+    text_blocks = [block for block in blocks if runs[block].max() >= _CONTENT_TEXT_MIN_RUNS]
+    first, last = (text_blocks[0], text_blocks[-1]) if text_blocks else (max(blocks, key=len),) * 2
     height, width = gray_img.shape
-    new_width = int(width * scale_factor)
-    new_height = int(height * scale_factor)
-    upscaled_gray_img = cv2.resize(gray_img, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+    top, bottom = max(0, int(first[0]) - _CONTENT_MARGIN), min(height, int(last[-1]) + 1 + _CONTENT_MARGIN)
+    columns = np.flatnonzero(dark[top:bottom].any(axis=0))
+    left, right = max(0, int(columns[0]) - _CONTENT_MARGIN), min(width, int(columns[-1]) + 1 + _CONTENT_MARGIN)
+    return top, bottom, left, right
+
+
+def crop_to_content(gray_img: np.ndarray) -> np.ndarray:
+    """Ausschnitt (Sicht, keine Kopie) des Graustufenbildes auf content_bounds; ohne Inhalt das ganze Bild."""
+    bounds = content_bounds(gray_img)
+    if bounds is None:
+        return gray_img
+    top, bottom, left, right = bounds
+    cropped = gray_img[top:bottom, left:right]
+    logger.info(f"Zuschnitt auf Inhalt: {gray_img.shape[1]}x{gray_img.shape[0]} -> {cropped.shape[1]}x{cropped.shape[0]} "
+                f"({1 - cropped.size / gray_img.size:.0%} weniger Pixel)")
+    return cropped
+
+
+class PreprocessPipeline:
+    """
+    Aufnahme und Vorverarbeitung eines festen Bildschirmbereichs mit eigenen Puffern
+    (Graustufen, hochskaliert, binarisiert), die über die Scans wiederverwendet werden:
+    capture_gray, resize und Schwellwert schreiben per out/dst direkt hinein. Neu angelegt wird
+    nur, wenn ein Puffer zu klein ist (größerer Bereich oder Skalierung); kleinere Bilder, z.B.
+    nach dem Zuschnitt auf den Inhalt, nutzen den Anfang des Puffers. allocations zählt die
+    angelegten Puffer. Die gelieferten Bilder gehören der Pipeline und werden vom nächsten Scan
+    überschrieben; lock (wiedereintrittsfähig) schützt die Puffer von der Aufnahme bis zum Ende der
+    Erkennung (scan_panel).
+    """
+
+    def __init__(self, region: tuple[int, int, int, int] | None = None):
+        self.region = region or SCREEN_REGION
+        self.allocations = 0
+        self.lock = threading.RLock()
+        self._storage: dict[str, np.ndarray] = {}
+        self._gray: np.ndarray | None = None
+        self._upscaled: np.ndarray | None = None
+        self._processed: np.ndarray | None = None
+
+    def _view(self, name: str, shape: tuple[int, int]) -> np.ndarray:
+        """Zusammenhängende Sicht der Form shape auf den Puffer name (wird nur bei Bedarf vergrößert)."""
+        size = shape[0] * shape[1]
+        storage = self._storage.get(name)
+        if storage is None or storage.size < size:
+            self.allocations += 1
+            storage = self._storage[name] = np.empty(size, dtype=np.uint8)
+        return storage[:size].reshape(shape)
+
+    def owns(self, img: np.ndarray) -> bool:
+        """True, wenn img in einem Puffer der Pipeline liegt."""
+        return any(np.shares_memory(img, storage) for storage in self._storage.values())
+
+    def capture(self) -> np.ndarray:
+        """Graustufen-Aufnahme von region in den Puffer der Pipeline."""
+        left, top, right, bottom = self.region
+        self._gray = self._view("gray", (bottom - top, right - left))
+        gray = capture_gray(self.region, out=self._gray)
+        if gray is not self._gray:  # Backend lieferte eine andere Größe (z.B. Bildschirm-Skalierung)
+            self.allocations += 1
+            self._gray = gray
+        return gray
+
+    def process(self, gray_img: np.ndarray, config: PreprocessConfig | None = None) -> np.ndarray:
+        """preprocess_for_ocr in die Puffer der Pipeline."""
+        config = config or get_preprocess_config()
+        height, width = gray_img.shape
+        shape = (int(height * config.scale), int(width * config.scale))
+        self._upscaled = self._view("upscaled", shape)
+        self._processed = self._view("processed", shape)
+        return preprocess_for_ocr(gray_img, config, self._upscaled, self._processed)
+
+
+_preprocess_pipeline: PreprocessPipeline | None = None
+
 
-    # Adaptives Thresholding ist oft besser als nur Graustufen
-    processed_img = cv2.adaptiveThreshold(upscaled_gray_img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11,
-                                          2)
+def get_preprocess_pipeline() -> PreprocessPipeline:
+    """Die gemeinsame Pipeline für den Bildschirmbereich (kalibriert oder SCREEN_REGION, beim ersten Scan angelegt)."""
+    global _preprocess_pipeline
+    if _preprocess_pipeline is None:
+        with _preprocess_config_lock:
+            if _preprocess_pipeline is None:
+                region = load_calibrated_region() if REGION_CALIBRATION_ENABLED else None
+                _preprocess_pipeline = PreprocessPipeline(region or SCREEN_REGION)
+    return _preprocess_pipeline
 
-    # Debug-Bild speichern, um zu sehen, was Tesseract bekommt
-    cv2.imwrite("debug_ocr_final_image.png", processed_img)
-    logger.info("Debug-Bild zur Überprüfung als 'debug_ocr_final_image.png' gespeichert.")
 
-    # --- 1. ERSTER OCR-DURCHLAUF (Standard mit psm 4) ---
-    config_pass1 = f"--oem 3 --psm 4 --dpi 300 -l {TESS_LANG}"
-    full_text_pass1 = ""
+# --- Kalibrierung des Bildschirmbereichs (Anker "Elementtyp") ---
+# Die Vorlage ist das Label "Elementtyp" aus einer Aufnahme des richtig eingestellten Bereichs bei 100 %
+# Bildschirm-Skalierung (cut_anchor_template). Die Suche über den ganzen Bildschirm läuft im Hintergrund;
+# der Scan selbst prüft nur, ob der Anker an seiner Stelle im Bereich liegt.
+
+ANCHOR_REGION_OFFSETS = (-43, -89, 314, 797)  # Bereich relativ zur linken oberen Ecke des Ankers (Skalierung 1)
+ANCHOR_SIZE = (61, 20)                         # Breite, Höhe des Labels "Elementtyp" (Skalierung 1)
+ANCHOR_SCALES = (1.0, 1.25, 1.5, 1.75, 2.0)    # Windows-Skalierungen 100 % bis 200 %
+ANCHOR_MIN_SCORE = 0.8  # mit make_anchor_template auf eigenen Aufnahmen prüfen
+ANCHOR_SEARCH_MARGIN = 8  # Pixel um die erwartete Position, in denen der Anker im Bereich gesucht wird
+REGION_CALIBRATION_RETRY_S = 10.0  # nach erfolgloser Suche frühestens so spät erneut den ganzen Bildschirm absuchen
+# Nach so vielen erfolglosen Suchen in Folge keine automatische Suche mehr, bis zum Neustart oder bis
+# die Anker-Vorlage ersetzt wird (passt die Vorlage nicht, kostete sonst fast jeder Scan eine Suche)
+REGION_CALIBRATION_MAX_FAILURES = 3
+
+
+class AnchorMatch(NamedTuple):
+    x: int          # linke obere Ecke im durchsuchten Bild
+    y: int
+    scale: float
+    score: float
+
+
+# Der Zustand der Kalibrierung wird vom Scan-Thread und vom Hintergrund-Thread der Suche gelesen und
+# geschrieben: alle Zugriffe auf die folgenden Variablen nur unter _anchor_lock. Wird zusätzlich
+# pipeline.lock gebraucht (neuer Bereich und Skalierung zusammen), dann zuerst pipeline.lock.
+_anchor_templates: dict[float, np.ndarray] | None = None
+_anchor_lock = threading.Lock()
+_anchor_scale = 1.0  # Skalierung des Ankers im aktuellen Bereich (aus der Kalibrierung)
+_last_failed_calibration = 0.0
+_calibration_failures = 0
+_paused_template_mtime: int | None = None  # mtime der Vorlage, als die automatische Suche ausgesetzt wurde
+_calibration_thread: threading.Thread | None = None
+
+
+def _get_anchor_templates() -> dict[float, np.ndarray]:
+    """Vorlage je Skalierung (einmal geladen); leer, wenn die Vorlage fehlt."""
+    global _anchor_templates
+    with _anchor_lock:
+        if _anchor_templates is None:
+            template = cv2.imread(ANCHOR_TEMPLATE_PATH, cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                logger.warning(f"Anker-Vorlage '{ANCHOR_TEMPLATE_PATH}' nicht gefunden. Keine Kalibrierung des Bereichs.")
+                _anchor_templates = {}
+            else:
+                _anchor_templates = scale_anchor_template(template)
+        return _anchor_templates
+
+
+def scale_anchor_template(template: np.ndarray) -> dict[float, np.ndarray]:
+    """Die Vorlage in allen ANCHOR_SCALES."""
+    return {scale: template if scale == 1.0 else
+            cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC) for scale in ANCHOR_SCALES}
+
+
+def _template_mtime() -> int | None:
     try:
-        logger.info(f"Starte OCR-Durchlauf 1 mit Konfiguration: {config_pass1}")
-        full_text_pass1 = pytesseract.image_to_string(processed_img, config=config_pass1)
-        logger.info(f"--- OCR Roh-Text (Durchlauf 1) ---\n{full_text_pass1}\n--------------------")
+        return os.stat(ANCHOR_TEMPLATE_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+
+def cut_anchor_template(gray_img: np.ndarray) -> np.ndarray:
+    """Ausschnitt des Ankers aus einer Aufnahme des richtig eingestellten Bereichs (Skalierung 1)."""
+    x, y = -ANCHOR_REGION_OFFSETS[0], -ANCHOR_REGION_OFFSETS[1]
+    width, height = ANCHOR_SIZE
+    if gray_img.shape[0] < y + height or gray_img.shape[1] < x + width:
+        raise ValueError(f"Aufnahme {gray_img.shape[1]}x{gray_img.shape[0]} zu klein für den Anker bei ({x}, {y}).")
+    return gray_img[y:y + height, x:x + width].copy()
+
+
+def find_anchor(gray_img: np.ndarray, scales: tuple[float, ...] = ANCHOR_SCALES) -> AnchorMatch | None:
+    """Bester Treffer der Anker-Vorlage (normierte Kreuzkorrelation) über die Skalierungen, oder None."""
+    best = None
+    for scale, template in _get_anchor_templates().items():
+        if scale not in scales or template.shape[0] > gray_img.shape[0] or template.shape[1] > gray_img.shape[1]:
+            continue
+        _, score, _, (x, y) = cv2.minMaxLoc(cv2.matchTemplate(gray_img, template, cv2.TM_CCOEFF_NORMED))
+        if score >= ANCHOR_MIN_SCORE and (best is None or score > best.score):
+            best = AnchorMatch(x, y, scale, float(score))
+    return best
+
+
+def region_from_anchor(anchor_x: int, anchor_y: int, scale: float,
+                       bounds: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+    """Bereich des Eigenschaftenfensters zum Anker (Bildschirmkoordinaten), begrenzt auf bounds."""
+    left, top, right, bottom = (int(round(offset * scale)) for offset in ANCHOR_REGION_OFFSETS)
+    return (max(bounds[0], anchor_x + left), max(bounds[1], anchor_y + top),
+            min(bounds[2], anchor_x + right), min(bounds[3], anchor_y + bottom))
+
+
+def anchor_in_region(gray_img: np.ndarray, scale: float | None = None) -> bool:
+    """
+    True, wenn der Anker in der Aufnahme des Bereichs an seiner erwarteten Stelle (± ANCHOR_SEARCH_MARGIN)
+    liegt. scale: Skalierung des Ankers (Standard: aus der Kalibrierung, sonst 1).
+    """
+    if scale is None:
+        with _anchor_lock:
+            scale = _anchor_scale
+    templates = _get_anchor_templates()
+    if scale not in templates:
+        return False
+    expected_x = -int(round(ANCHOR_REGION_OFFSETS[0] * scale))
+    expected_y = -int(round(ANCHOR_REGION_OFFSETS[1] * scale))
+    height, width = templates[scale].shape
+    window = gray_img[max(0, expected_y - ANCHOR_SEARCH_MARGIN):expected_y + height + ANCHOR_SEARCH_MARGIN,
+                      max(0, expected_x - ANCHOR_SEARCH_MARGIN):expected_x + width + ANCHOR_SEARCH_MARGIN]
+    return find_anchor(window, (scale,)) is not None
+
+
+def load_calibrated_region(path: str = REGION_CALIBRATION_PATH) -> tuple[int, int, int, int] | None:
+    """Gespeicherter Bereich aus der letzten Kalibrierung (setzt auch die Skalierung des Ankers), oder None."""
+    global _anchor_scale
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            calibration = json.load(f)
+        region = tuple(int(v) for v in calibration["bereich"])
+        scale = float(calibration.get("skalierung", 1.0))
+        if len(region) != 4 or region[2] <= region[0] or region[3] <= region[1]:
+            raise ValueError(f"ungültiger Bereich {region}")
+    except (OSError, KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Kalibrierung '{path}' nicht lesbar: {e}. Verwende SCREEN_REGION.")
+        return None
+    with _anchor_lock:
+        _anchor_scale = scale
+    logger.info(f"Kalibrierter Bildschirmbereich aus '{path}': {region} (Skalierung {scale:g})")
+    return region
+
+
+def calibrate_region(backend: CaptureBackend | None = None, path: str | None = REGION_CALIBRATION_PATH,
+                     pipeline: PreprocessPipeline | None = None) -> tuple[int, int, int, int] | None:
+    """
+    Sucht den Anker in einer Aufnahme aller Bildschirme, berechnet daraus den Bereich des
+    Eigenschaftenfensters und speichert ihn (path=None: nicht speichern); mit pipeline wird er dort
+    als neuer Bereich gesetzt. None, wenn der Anker fehlt.
+    """
+    global _last_failed_calibration, _anchor_scale, _calibration_failures, _paused_template_mtime
+    backend = backend or get_capture_backend()
+    start = time.perf_counter()
+    bounds = backend.screen_bounds()
+    screen = backend.grab_gray(bounds)
+    match = find_anchor(screen)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if match is None:
+        logger.warning(f"Kalibrierung: Anker nicht auf dem Bildschirm {bounds} gefunden ({elapsed_ms:.0f} ms).")
+        with _anchor_lock:
+            _last_failed_calibration = time.monotonic()
+            _calibration_failures += 1
+            failures = _calibration_failures
+            if failures == REGION_CALIBRATION_MAX_FAILURES:
+                _paused_template_mtime = _template_mtime()
+        if failures == REGION_CALIBRATION_MAX_FAILURES:
+            logger.warning(f"Anker {failures}-mal in Folge nicht gefunden. Automatische Kalibrierung "
+                           f"ausgesetzt bis zum Neustart oder bis '{ANCHOR_TEMPLATE_PATH}' ersetzt wird.")
+        return None
+    region = region_from_anchor(bounds[0] + match.x, bounds[1] + match.y, match.scale, bounds)
+    logger.info(f"Kalibrierung: Anker bei ({bounds[0] + match.x}, {bounds[1] + match.y}), Skalierung {match.scale:g}, "
+                f"Übereinstimmung {match.score:.2f} -> Bereich {region} ({elapsed_ms:.0f} ms).")
+    if pipeline is None:
+        with _anchor_lock:
+            _anchor_scale, _calibration_failures = match.scale, 0
+    else:
+        with pipeline.lock, _anchor_lock:
+            _anchor_scale, _calibration_failures, pipeline.region = match.scale, 0, region
+    if path:
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"bereich": list(region), "anker": [bounds[0] + match.x, bounds[1] + match.y],
+                           "skalierung": match.scale, "uebereinstimmung": round(match.score, 3),
+                           "erstellt": time.strftime("%Y-%m-%d %H:%M:%S")}, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning(f"Kalibrierter Bereich konnte nicht in '{path}' gespeichert werden: {e}")
+    return region
+
+
+def _calibration_allowed() -> bool:
+    """
+    Ob jetzt eine Suche über den ganzen Bildschirm laufen darf (Wartezeit, Aussetzen nach Fehlschlägen);
+    nur unter _anchor_lock aufrufen.
+    """
+    global _calibration_failures, _anchor_templates
+    if _calibration_failures >= REGION_CALIBRATION_MAX_FAILURES:
+        if _template_mtime() == _paused_template_mtime:
+            return False
+        logger.info(f"Anker-Vorlage '{ANCHOR_TEMPLATE_PATH}' ersetzt. Automatische Kalibrierung wieder aktiv.")
+        _calibration_failures = 0
+        _anchor_templates = None
+    return time.monotonic() - _last_failed_calibration >= REGION_CALIBRATION_RETRY_S
+
+
+def _calibrate_in_background(pipeline: PreprocessPipeline):
+    try:
+        calibrate_region(pipeline=pipeline)
     except Exception as e:
-        logger.error(f"Fehler während OCR-Durchlauf 1: {e}", exc_info=True)
-        # Wenn der erste Durchlauf fehlschlägt, können wir nicht fortfahren
-        raise RuntimeError(f"Kritischer Fehler im ersten OCR-Durchlauf: {e}") from e
+        logger.error(f"Fehler bei der Kalibrierung im Hintergrund: {e}", exc_info=True)
+
+
+def _start_background_calibration(pipeline: PreprocessPipeline):
+    """Startet eine Suche im Hintergrund, sofern keine läuft und sie erlaubt ist; der neue Bereich gilt ab dem nächsten Scan."""
+    global _calibration_thread
+    with _anchor_lock:
+        if (_calibration_thread is not None and _calibration_thread.is_alive()) or not _calibration_allowed():
+            return
+        logger.info(f"Anker nicht im Bereich {pipeline.region}. Kalibriere im Hintergrund neu.")
+        _calibration_thread = threading.Thread(target=_calibrate_in_background, args=(pipeline,),
+                                               name="bereich-kalibrierung", daemon=True)
+        _calibration_thread.start()
+
+
+def capture_panel() -> np.ndarray:
+    """
+    Graustufen-Aufnahme des Eigenschaftenfensters über die gemeinsame Pipeline. Fehlt der Anker im
+    Bereich (Fenster verschoben, anderer Monitor), wird der Bereich im Hintergrund neu kalibriert und
+    gilt ab dem nächsten Scan; nur wenn der Bereich gar nicht mehr aufgenommen werden kann, sucht der
+    Scan selbst. Das Bild liegt im Puffer der Pipeline: wer es weiterverwendet, hält pipeline.lock,
+    bis er fertig ist (scan_panel).
+    """
+    pipeline = get_preprocess_pipeline()
+    with pipeline.lock:
+        return _capture_panel(pipeline)
 
-    # --- Initiales Parsen der Ergebnisse aus dem ersten Durchlauf ---
-    # Die Parsing-Logik (parse_number, Regex, etc.) bleibt genau wie bei Ihnen.
-    # Ich habe sie hier zur Vollständigkeit eingefügt.
+
+def _capture_panel(pipeline: PreprocessPipeline) -> np.ndarray:
+    calibration_enabled = REGION_CALIBRATION_ENABLED and bool(_get_anchor_templates())
+    try:
+        gray_img = pipeline.capture()
+    except RuntimeError as e:
+        if not calibration_enabled:
+            raise
+        logger.warning(f"Aufnahme des Bereichs {pipeline.region} fehlgeschlagen: {e}")
+        with _anchor_lock:
+            allowed = _calibration_allowed()
+        if not allowed or calibrate_region(pipeline=pipeline) is None:
+            raise RuntimeError(f"Screenshot des Bereichs {pipeline.region} nicht möglich und Anker nicht gefunden.") from e
+        return pipeline.capture()
+    if calibration_enabled and not anchor_in_region(gray_img):
+        _start_background_calibration(pipeline)
+    return gray_img
+
+
+# --- Feld-Grammatik (einmal kompiliert) ---
+
+# Je Feld: Muster für "Label [Trenner] Wert" (inkl. typischer OCR-Lesefehler der Labels).
+# Die Reihenfolge zählt: pro Zeile gewinnt das erste noch offene Feld, dessen Muster passt.
+FIELD_PATTERNS = {
+    "Elementtyp": r".*Elementtyp\s*[:.\-–\s|]*([^\n]+)",
+    "Elementnummer": r".*Elementnummer\s*[:.\-–\s|]*(\d+)",
+    "Tiefe": r".*Tiefe\s*[:.\-–\s|]*,?\s*([^\n]+)",
+    "Durchmesser": r".*(?:Durchmesser|Duahmaser|Duchmesser|Durchmeser|Bohezurchmaser|Durngangg|Boden)\s*[:.\-–\s|]*([^\n]+)",
+    "Begrenzungsbox Breite": r".*Begrenzungsbox\s+Breite\s*[:.\-–\s|]*([^\n]+)",
+    "Begrenzungsbox Länge": r".*Begrenzungsbox\s+Länge\s*[:.\-–\s|]*([^\n]+)",
+    "Feature-Typ": r".*(?:KnowledgeBase|i\.)?\s*F?eature[-\s]*Typ\s*[:.\-–\s|]*([^\n]*)",
+    "Name": r".*Name\s*[:.\-–\s|]*([^\n]+)",
+    "Kleinster Radius": r".*Kleinster\s+Radius\s*[:.\-–\s|]*([^\n]+)",
+    "Fasendurchmesser": r".*Fasendurchmesser\s*[:.\-–\s|]*([^\n]+)",
+    "Bohrdurchmesser": r".*Bohrdurchmesser\s*[:.\-–\s|]*([^\n]+)"
+}
+FIELD_REGEXES = {key: re.compile(pattern, re.IGNORECASE) for key, pattern in FIELD_PATTERNS.items()}
+
+# Label-Dispatcher: ein Feld kann in einer Zeile nur passen, wenn alle Wörter einer seiner
+# Label-Varianten (klein geschrieben) darin vorkommen. Nur diese Felder werden per Regex geprüft.
+_FIELD_ANCHORS = {
+    "Elementtyp": (("elementtyp",),),
+    "Elementnummer": (("elementnummer",),),
+    "Tiefe": (("tiefe",),),
+    "Durchmesser": tuple((label,) for label in (
+        "durchmesser", "duahmaser", "duchmesser", "durchmeser", "bohezurchmaser", "durngangg", "boden")),
+    "Begrenzungsbox Breite": (("begrenzungsbox", "breite"),),
+    "Begrenzungsbox Länge": (("begrenzungsbox", "länge"),),
+    "Feature-Typ": (("eature", "typ"),),
+    "Name": (("name",),),
+    "Kleinster Radius": (("kleinster", "radius"),),
+    "Fasendurchmesser": (("fasendurchmesser",),),
+    "Bohrdurchmesser": (("bohrdurchmesser",),),
+}
+_FIELD_ANCHOR_SETS = tuple((key, tuple(frozenset(words) for words in variants)) for key, variants in _FIELD_ANCHORS.items())
+_ANCHOR_WORDS = tuple(dict.fromkeys(word for variants in _FIELD_ANCHORS.values() for words in variants for word in words))
+# Nur bei diesen Zeichen weicht re.IGNORECASE für Label-Buchstaben von str.lower() ab ("İ", "ı", "ſ") -> alle Felder prüfen
+_CASEFOLD_EXCEPTIONS = re.compile("[\u0130\u0131\u017f]")
+
+
+def _candidate_fields(line: str) -> list[str]:
+    """Felder (in Musterreihenfolge), deren Label in der Zeile vorkommen kann."""
+    if _CASEFOLD_EXCEPTIONS.search(line):
+        return list(FIELD_REGEXES)
+    lowered = line.lower()
+    present = {word for word in _ANCHOR_WORDS if word in lowered}
+    if not present:
+        return []
+    return [key for key, variants in _FIELD_ANCHOR_SETS if any(words <= present for words in variants)]
+
+
+NUMERIC_FIELDS = {"Tiefe", "Durchmesser", "Begrenzungsbox Breite", "Begrenzungsbox Länge", "Kleinster Radius"}
+
+_NUMBER_TRAILING_JUNK = re.compile(r"[^\d.\s-]*$")
+_NUMBER_LEADING_JUNK = re.compile(r"^[^\d-]*")
+_NUMBER = re.compile(r"(-?\d+(?:\.\d+)?)")
+_DIGITS = re.compile(r"(\d+)")
+
+
+def parse_number(value_str: str, format_str: str | None = "{:.3f}") -> str | None:
+    if not isinstance(value_str, str): return None
+    cleaned_str = value_str.replace(",", ".").strip()
+    cleaned_str = _NUMBER_TRAILING_JUNK.sub("", cleaned_str).strip()
+    cleaned_str = _NUMBER_LEADING_JUNK.sub("", cleaned_str).strip()
+    match = _NUMBER.search(cleaned_str)
+    if match:
+        num_str = match.group(1)
+        try:
+            val = float(num_str)
+            return format_str.format(val) if format_str else num_str
+        except ValueError:
+            return num_str  # Gib den gefundenen String zurück, wenn er keine Zahl ist
+    return cleaned_str if value_str.strip() else None
+
+
+def _parse_field_value(key: str, raw_value: str) -> str | None:
+    if key in NUMERIC_FIELDS:
+        return parse_number(raw_value, None if key == "Durchmesser" else "{:.6f}")
+    if key == "Elementnummer":
+        num_match = _DIGITS.search(raw_value)
+        return num_match.group(1) if num_match else raw_value
+    return raw_value
+
+
+def parse_ocr_text(full_text: str, sources: dict | None = None) -> dict:
+    """
+    Extrahiert die Felder aus dem OCR-Text (eine Zeile = höchstens ein Feld).
+    Steht hinter einem Label kein Wert (z.B. "Feature-Typ" am Zeilenende), wird die
+    nächste Zeile ohne eigenes Label als Wert genommen.
+    Ist sources gesetzt, wird je gefundenem Feld eingetragen, aus welchen Zeilen
+    (Indizes in full_text.splitlines()) Label und Wert stammen.
+    """
     results = {
         "Elementtyp": None, "Elementnummer": None, "Begrenzungsbox Breite": None,
         "Begrenzungsbox Länge": None, "Tiefe": None, "Durchmesser": None,
         "Fasendurchmesser": None,
         "Feature-Typ": None, "Name": None, "Kleinster Radius": None
     }
-    patterns = {
-        "Elementtyp": r".*Elementtyp\s*[:.\-–\s|]*([^\n]+)",
-        "Elementnummer": r".*Elementnummer\s*[:.\-–\s|]*(\d+)",
-        "Tiefe": r".*Tiefe\s*[:.\-–\s|]*,?\s*([^\n]+)",
-        "Durchmesser": r".*(?:Durchmesser|Duahmaser|Duchmesser|Durchmeser|Bohezurchmaser|Durngangg|Boden)\s*[:.\-–\s|]*([^\n]+)",
-        "Begrenzungsbox Breite": r".*Begrenzungsbox\s+Breite\s*[:.\-–\s|]*([^\n]+)",
-        "Begrenzungsbox Länge": r".*Begrenzungsbox\s+Länge\s*[:.\-–\s|]*([^\n]+)",
-        "Feature-Typ": r".*(?:KnowledgeBase|i\.)?\s*F?eature[-\s]*Typ\s*[:.\-–\s|]*([^\n]*)",
-        "Name": r".*Name\s*[:.\-–\s|]*([^\n]+)",
-        "Kleinster Radius": r".*Kleinster\s+Radius\s*[:.\-–\s|]*([^\n]+)",
-        "Fasendurchmesser": r".*Fasendurchmesser\s*[:.\-–\s|]*([^\n]+)",
-        "Bohrdurchmesser": r".*Bohrdurchmesser\s*[:.\-–\s|]*([^\n]+)"
-    }
-
-    def parse_number(value_str: str, format_str: str | None = "{:.3f}") -> str | None:
-        if not isinstance(value_str, str): return None
-        # Ihre parse_number Funktion ist gut, wir behalten sie bei.
-        cleaned_str = value_str.replace(",", ".").strip()
-        cleaned_str = re.sub(r"[^\d.\s-]*$", "", cleaned_str).strip()
-        cleaned_str = re.sub(r"^[^\d-]*", "", cleaned_str).strip()
-        match = re.search(r"(-?\d+(?:\.\d+)?)", cleaned_str)
-        if match:
-            num_str = match.group(1)
-            try:
-                val = float(num_str)
-                return format_str.format(val) if format_str else num_str
-            except ValueError:
-                return num_str  # Gib den gefundenen String zurück, wenn er keine Zahl ist
-        return cleaned_str if value_str.strip() else None
-
-    # --- NEUER, ROBUSTERER PARSING-LOOP ---
-    lines = full_text_pass1.splitlines()
     processed_keys = set()
     last_key_found = None  # Merkt sich den Schlüssel aus der vorherigen Zeile
+    last_key_line = None
 
-    for i, line in enumerate(lines):
+    for line_index, line in enumerate(full_text.splitlines()):
         line = line.strip()
         if not line:
-            #last_key_found = None  # Zeilenumbruch setzt den Kontext zurück
             continue
 
         found_match_in_line = False
-        for key, pattern_str in patterns.items():
+        for key in _candidate_fields(line):
             if key in processed_keys:
                 continue
 
-            match = re.search(pattern_str, line, re.IGNORECASE)
+            match = FIELD_REGEXES[key].search(line)
             if match:
                 found_match_in_line = True
-                try:
-                    raw_value = match.group(1).strip()
-                    # WENN der Wert direkt gefunden wird (Standardfall)
-                    if raw_value:
-                        # Hier kommt Ihre bekannte Parsing-Logik rein
-                        parsed_value = None
-                        if key in ["Tiefe", "Durchmesser", "Begrenzungsbox Breite", "Begrenzungsbox Länge",
-                                   "Kleinster Radius"]:
-                            parsed_value = parse_number(raw_value, None if key == "Durchmesser" else "{:.6f}")
-                        elif key == "Elementnummer":
-                            num_match = re.search(r"(\d+)", raw_value)
-                            parsed_value = num_match.group(1) if num_match else raw_value
-                        else:
-                            parsed_value = raw_value
-
-                        if parsed_value is not None and str(parsed_value).strip():
-                            results[key] = str(parsed_value)
-                            processed_keys.add(key)
-                            logger.info(f"Gefunden (gleiche Zeile): {key} = '{results[key]}' (Roh: '{raw_value}')")
-                            last_key_found = None  # Erfolgreich, Kontext zurücksetzen
-                        else:
-                            # Schlüssel gefunden, aber Wert ist leer -> Merken für die nächste Zeile
-                            last_key_found = key
-                            logger.debug(
-                                f"Schlüssel '{key}' in Zeile '{line}' gefunden, aber Wert ist leer. Suche in nächster Zeile...")
-                    else:
-                        # Schlüssel gefunden, aber die Capturing-Group ist leer -> Merken für die nächste Zeile
-                        last_key_found = key
-                        logger.debug(
-                            f"Schlüssel '{key}' in Zeile '{line}' gefunden, aber Wert ist leer. Suche in nächster Zeile...")
-
-                except IndexError:
-                    # Das Pattern hat gepasst, aber keine Capturing-Group -> Merken für die nächste Zeile
+                raw_value = match.group(1).strip()
+                parsed_value = _parse_field_value(key, raw_value) if raw_value else None
+                if parsed_value is not None and str(parsed_value).strip():
+                    results[key] = str(parsed_value)
+                    processed_keys.add(key)
+                    if sources is not None:
+                        sources[key] = (line_index,)
+                    logger.info(f"Gefunden (gleiche Zeile): {key} = '{results[key]}' (Roh: '{raw_value}')")
+                    last_key_found = None  # Erfolgreich, Kontext zurücksetzen
+                else:
+                    # Schlüssel gefunden, aber Wert ist leer -> Merken für die nächste Zeile
                     last_key_found = key
+                    last_key_line = line_index
                     logger.debug(
-                        f"Schlüssel '{key}' in Zeile '{line}' gefunden (ohne Wert). Suche in nächster Zeile...")
+                        f"Schlüssel '{key}' in Zeile '{line}' gefunden, aber Wert ist leer. Suche in nächster Zeile...")
                 break  # Nur ein Schlüssel pro Zeile
 
         # WENN in dieser Zeile kein Schlüssel-Wert-Paar gefunden wurde,
@@ -218,56 +1241,626 @@ def ocr_line_parse(gray_img: np.ndarray) -> tuple[dict, str]:
         if not found_match_in_line and last_key_found:
             key = last_key_found
             raw_value = line  # Die ganze Zeile ist der potenzielle Wert
-
             logger.info(f"Versuche, Wert für Schlüssel '{key}' aus vorheriger Zeile in Zeile '{line}' zu finden.")
 
-            # Hier kommt wieder Ihre Parsing-Logik für den gefundenen Wert
-            parsed_value = None
-            if key in ["Tiefe", "Durchmesser", "Begrenzungsbox Breite", "Begrenzungsbox Länge", "Kleinster Radius"]:
-                parsed_value = parse_number(raw_value, None if key == "Durchmesser" else "{:.6f}")
-            elif key == "Elementnummer":
-                num_match = re.search(r"(\d+)", raw_value)
-                parsed_value = num_match.group(1) if num_match else raw_value
-            else:  # Das ist unser Fall für "Feature-Typ"
-                parsed_value = raw_value
-
+            parsed_value = _parse_field_value(key, raw_value)
             if parsed_value is not None and str(parsed_value).strip():
                 results[key] = str(parsed_value)
                 processed_keys.add(key)
+                if sources is not None:
+                    sources[key] = (last_key_line, line_index)
                 logger.info(f"Gefunden (nächste Zeile): {key} = '{results[key]}' (Roh: '{raw_value}')")
 
             last_key_found = None  # Kontext zurücksetzen, egal ob erfolgreich oder nicht
 
-    # --- 2. PRÜFUNG AUF PROBLEM-FALL & GEZIELTE KORREKTUR ---
-    # Prüfen, ob der bekannte Fehler bei "Begrenzungsbox Länge" aufgetreten ist.
-    problematic_value = "10.000000"
-    if results.get("Begrenzungsbox Länge") == problematic_value:
-        logger.warning(f"Problemfall erkannt: 'Begrenzungsbox Länge' ist '{problematic_value}'. Starte Korrekturlauf.")
+    return results
 
-        config_pass2 = f"--oem 3 --psm 11 --dpi 300 -l {TESS_LANG}"  # psm 11 für die Korrektur
-        full_text_pass2 = ""
-        try:
-            logger.info(f"Starte OCR-Durchlauf 2 (Korrektur) mit Konfiguration: {config_pass2}")
-            full_text_pass2 = pytesseract.image_to_string(processed_img, config=config_pass2)
-            logger.info(f"--- OCR Roh-Text (Durchlauf 2) ---\n{full_text_pass2}\n--------------------")
-
-            # Jetzt parsen wir den Text aus dem zweiten Durchlauf, aber NUR für den fehlerhaften Schlüssel
-            for line_pass2 in full_text_pass2.splitlines():
-                match_pass2 = re.search(patterns["Begrenzungsbox Länge"], line_pass2, re.IGNORECASE)
-                if match_pass2:
-                    raw_value_pass2 = match_pass2.group(1).strip()
-                    parsed_value_pass2 = parse_number(raw_value_pass2, "{:.6f}")
-
-                    # Nur wenn ein neuer, anderer Wert gefunden wurde, wird er aktualisiert.
-                    if parsed_value_pass2 and parsed_value_pass2 != problematic_value:
-                        logger.info(
-                            f"KORREKTUR ERFOLGREICH: 'Begrenzungsbox Länge' von '{results['Begrenzungsbox Länge']}' auf '{parsed_value_pass2}' geändert.")
-                        results["Begrenzungsbox Länge"] = parsed_value_pass2
-                        break  # Wir haben die Korrektur, Schleife beenden.
 
+# --- Volltext in Zeilenstreifen (Zeilen-Cache, optional parallel) ---
+# Das Zeilenprofil zerlegt das Bild in Textzeilen ("Label Wert"), die als einzelne Zeilen (psm 7)
+# erkannt und in der ursprünglichen Reihenfolge für parse_ocr_text zusammengesetzt werden. Die Wörter
+# je Zeile werden über die Pixel des Streifens zwischengespeichert: beim Wechsel zwischen ähnlichen
+# Features geht nur die geänderte Zeile an Tesseract. Tesseract nutzt je Bild nur einen Kern; mit
+# OCR_LINE_WORKERS werden die geänderten Zeilen in einem Prozess-Pool erkannt.
+
+LINE_STRIP_PSM = 7
+LINE_STRIP_CACHE_SIZE = 256
+_STRUCTURE_COLUMN_MIN_INK = 0.3   # durchgehende Linien ab diesem Anteil der Bildhöhe sind senkrechte Linien
+_LINE_DOT_GAP = 5                 # Lücken gepunkteter Linien bis hierhin werden geschlossen
+_LINE_COLUMN_MARGIN = 2           # Nachbarspalten einer Linie (Kantenpixel der Punkte) mit entfernen
+_TEXT_ROW_MIN_INK = 0.015         # Bildzeilen mit weniger Schrift-Pixeln gelten als Hintergrund
+_GRID_ROW_MIN_INK = 0.5           # ... mit mehr als waagrechte Gitterlinie
+_LINE_MAX_GAP = 2                 # Lücken bis hierhin (z.B. Umlaut-Punkte) gehören zur Zeile
+_LINE_MARGIN = 6
+_CELL_PADDING = 10                # weißer Rand um die Streifen; Tesseract erkennt Text am Bildrand schlecht
+
+_line_pool: ProcessPoolExecutor | None = None
+_line_pool_workers = 0
+_line_pool_lock = threading.Lock()
+
+
+class RowCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class RowTextCache:
+    """
+    Begrenzter LRU-Cache der erkannten Wörter je Textzeile, Schlüssel sind die Pixel des Streifens
+    (BLAKE2b). Zwischen ähnlichen Features ändern sich meist nur wenige Zeilen (z.B. Elementnummer,
+    Tiefe); nur diese werden neu erkannt.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def make_key(img: np.ndarray) -> tuple:
+        return img.shape, hashlib.blake2b(np.ascontiguousarray(img), digest_size=16).digest()
+
+    def get(self, key: tuple):
+        """Gespeichertes Ergebnis oder None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> RowCacheInfo:
+        with self._lock:
+            return RowCacheInfo(self.hits, self.misses, self.evictions, len(self._entries), self.maxsize)
+
+
+line_strip_cache = RowTextCache(LINE_STRIP_CACHE_SIZE)
+
+
+def _runs(mask: np.ndarray) -> list[tuple[int, int]]:
+    """Zusammenhängende True-Bereiche als (start, ende) mit ende exklusiv."""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+class TextStrip(NamedTuple):
+    image: np.ndarray   # Zeile ohne senkrechte Linien, mit weißem Rand
+    top: int            # y-Versatz des Streifens im Fenster (Streifen-y + top = Fenster-y)
+
+
+def _vertical_line_columns(ink: np.ndarray) -> np.ndarray:
+    """
+    Spalten mit senkrechten Linien (Rahmen, Baum, Trenner), samt _LINE_COLUMN_MARGIN Nachbarspalten.
+    Gezählt wird die längste zusammenhängende Linie, nicht die Schwärzung der Spalte: die linken Striche
+    untereinander stehender Labels ("E", "D", "B") schwärzen eine Spalte ebenfalls stark, sind aber je
+    Zeile unterbrochen. Lücken bis _LINE_DOT_GAP (gepunktete Baumlinien) werden vorher geschlossen.
+    """
+    min_length = max(1, int(_STRUCTURE_COLUMN_MIN_INK * ink.shape[0]))
+    mask = ink.astype(np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((_LINE_DOT_GAP, 1), np.uint8))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((min_length, 1), np.uint8))
+    columns = mask.any(axis=0).astype(np.uint8)
+    width = 2 * _LINE_COLUMN_MARGIN + 1
+    return cv2.dilate(columns.reshape(1, -1), np.ones((1, width), np.uint8)).ravel().astype(bool)
+
+
+def split_text_lines(processed_img: np.ndarray) -> list[TextStrip]:
+    """Zerlegt das Binärbild über das Zeilenprofil in Textzeilen-Streifen (von oben nach unten)."""
+    ink = processed_img < 128
+    structure_columns = _vertical_line_columns(ink)
+    row_ink = ink[:, ~structure_columns].sum(axis=1)
+    text_width = max(1, int((~structure_columns).sum()))
+    is_text = (row_ink >= max(3, _TEXT_ROW_MIN_INK * text_width)) & (row_ink < _GRID_ROW_MIN_INK * text_width)
+
+    lines = []
+    for top, bottom in _runs(is_text):
+        if lines and top - lines[-1][1] <= _LINE_MAX_GAP:
+            lines[-1] = (lines[-1][0], bottom)
+        else:
+            lines.append((top, bottom))
+    if not lines:
+        return []
+    min_height = 0.3 * float(np.median([bottom - top for top, bottom in lines]))
+
+    cleaned = processed_img.copy()
+    cleaned[:, structure_columns] = 255
+    height = processed_img.shape[0]
+    strips = []
+    for top, bottom in lines:
+        if bottom - top < min_height:
+            continue
+        crop_top = max(0, top - _LINE_MARGIN)
+        image = cv2.copyMakeBorder(cleaned[crop_top:min(height, bottom + _LINE_MARGIN)],
+                                   _CELL_PADDING, _CELL_PADDING, _CELL_PADDING, _CELL_PADDING,
+                                   cv2.BORDER_CONSTANT, value=255)
+        strips.append(TextStrip(image, crop_top - _CELL_PADDING))
+    return strips
+
+
+def _ocr_line_strip(strip: np.ndarray) -> list[OcrWord]:
+    """Läuft im Pool-Prozess (eigenes Backend je Prozess)."""
+    return run_ocr_data(strip, LINE_STRIP_PSM)
+
+
+def _init_line_worker():
+    logging.getLogger().setLevel(logging.WARNING)
+    get_ocr_backend()  # Sprachdaten einmal je Prozess laden
+
+
+def _get_line_pool(workers: int) -> ProcessPoolExecutor:
+    global _line_pool, _line_pool_workers
+    with _line_pool_lock:
+        if _line_pool is None or _line_pool_workers != workers:
+            if _line_pool is not None:
+                _line_pool.shutdown(wait=False)
+            _line_pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_line_worker)
+            _line_pool_workers = workers
+            logger.info(f"OCR-Prozess-Pool mit {workers} Prozessen gestartet.")
+        return _line_pool
+
+
+def ocr_line_strips(processed_img: np.ndarray, workers: int = OCR_LINE_WORKERS) -> list[OcrWord]:
+    """
+    Wörter des Fensters aus Zeilenstreifen (Positionen im Fenster, eine Zeile je Streifen).
+    Streifen mit unveränderten Pixeln kommen aus line_strip_cache; nur die übrigen werden erkannt,
+    bei workers > 1 parallel im Prozess-Pool. Ohne Textzeilen wird das ganze Bild erkannt (psm 4).
+    """
+    strips = split_text_lines(processed_img)
+    if not strips:
+        return run_ocr_data(processed_img, 4)
+    keys = [RowTextCache.make_key(strip.image) for strip in strips]
+    strip_words = [line_strip_cache.get(key) for key in keys]
+    changed = [i for i, words in enumerate(strip_words) if words is None]
+    images = [strips[i].image for i in changed]
+    if workers <= 1 or not images:
+        recognized = map(_ocr_line_strip, images)
+    else:
+        chunksize = max(1, len(images) // (workers * 4))
+        recognized = _get_line_pool(workers).map(_ocr_line_strip, images, chunksize=chunksize)
+    for i, words in zip(changed, recognized):
+        strip_words[i] = tuple(words)
+        line_strip_cache.put(keys[i], strip_words[i])
+    logger.info(f"Zeilenstreifen: {len(changed)} von {len(strips)} neu erkannt, übrige aus dem Zeilen-Cache.")
+    return [OcrWord(word.text, word.confidence, (left - _CELL_PADDING, top + strip.top, right - _CELL_PADDING,
+                                                 bottom + strip.top), line)
+            for line, (strip, words) in enumerate(zip(strips, strip_words))
+            for word in words for left, top, right, bottom in (word.box,)]
+
+
+# --- Konfidenz je Feld und gezielte Nachkorrektur ---
+# Durchlauf 1 liefert Wörter mit Konfidenz und Position. Die Konfidenz eines Feldes ist die des
+# unsichersten Wortes seines Wertes. Nur unsichere (oder als Lesefehler bekannte) Felder werden
+# nachträglich erkannt: der Umriss ihres Wertes wird ausgeschnitten und mit anderen Einstellungen
+# gelesen; das sicherste Ergebnis gewinnt.
+
+OCR_FIELD_MIN_CONFIDENCE = 60.0
+_NUMERIC_VALUE_FIELDS = NUMERIC_FIELDS | {"Elementnummer", "Fasendurchmesser", "Bohrdurchmesser"}
+_SUSPECT_VALUES = {"Begrenzungsbox Länge": {"10.000000"}}  # bekannte Lesefehler, werden immer nachgeprüft
+_RERECOGNITION_PSMS = (7, 13, 8)  # eine Zeile, Rohzeile, ein Wort
+_FIELD_BOX_MARGIN = 6
+
+
+class OcrPass(NamedTuple):
+    results: dict
+    confidences: dict[str, float]                   # je Feld: Konfidenz des unsichersten Wert-Wortes
+    boxes: dict[str, tuple[int, int, int, int]]     # je Feld: Umriss der Wert-Wörter
+    text: str
+
+
+def parse_ocr_words(words: list[OcrWord]) -> OcrPass:
+    """parse_ocr_text über die Wörter eines Durchlaufs, ergänzt um Konfidenz und Umriss je Feld."""
+    lines, line_texts, line_offsets = [], [], []
+    for line_words in group_lines(words):
+        texts = [" ".join(word.text.split()) for word in line_words]  # keine Zeilenumbrüche in Wörtern
+        kept = [(word, text) for word, text in zip(line_words, texts) if text]
+        offsets, position = [], 0
+        for _, text in kept:
+            offsets.append((position, position + len(text)))
+            position += len(text) + 1
+        lines.append([word for word, _ in kept])
+        line_texts.append(" ".join(text for _, text in kept))
+        line_offsets.append(offsets)
+    text = "\n".join(line_texts)
+
+    sources = {}
+    results = parse_ocr_text(text, sources)
+    confidences, boxes = {}, {}
+    for key, indices in sources.items():
+        value_line = indices[-1]
+        value_start = 0
+        if len(indices) == 1:  # Label und Wert in derselben Zeile
+            match = FIELD_REGEXES[key].search(line_texts[value_line])
+            value_start = match.start(1) if match else 0
+        value_words = [word for word, (_, end) in zip(lines[value_line], line_offsets[value_line]) if end > value_start]
+        if value_words:
+            confidences[key] = min(word.confidence for word in value_words)
+            boxes[key] = (min(word.box[0] for word in value_words), min(word.box[1] for word in value_words),
+                          max(word.box[2] for word in value_words), max(word.box[3] for word in value_words))
+    return OcrPass(results, confidences, boxes, text)
+
+
+def _crop_box(img: np.ndarray, box: tuple[int, int, int, int]) -> np.ndarray:
+    height, width = img.shape[:2]
+    left, top, right, bottom = box
+    crop = img[max(0, top - _FIELD_BOX_MARGIN):min(height, bottom + _FIELD_BOX_MARGIN),
+               max(0, left - _FIELD_BOX_MARGIN):min(width, right + _FIELD_BOX_MARGIN)]
+    return cv2.copyMakeBorder(crop, _CELL_PADDING, _CELL_PADDING, _CELL_PADDING, _CELL_PADDING,
+                              cv2.BORDER_CONSTANT, value=255)
+
+
+def rerecognize_fields(img: np.ndarray, ocr: OcrPass, backend: OcrBackend | None = None) -> tuple[dict, list[str]]:
+    """
+    Liest die Werte unsicherer Felder (< OCR_FIELD_MIN_CONFIDENCE) und bekannter Lesefehler
+    (_SUSPECT_VALUES) erneut aus ihrem Umriss. Liefert (Ergebnisse, nachgeprüfte Felder).
+    """
+    results, checked = dict(ocr.results), []
+    for key, value in ocr.results.items():
+        if value is None or key not in ocr.boxes:
+            continue
+        suspects = _SUSPECT_VALUES.get(key, ())
+        confidence = ocr.confidences[key]
+        if confidence >= OCR_FIELD_MIN_CONFIDENCE and value not in suspects:
+            continue
+        checked.append(key)
+        crop = _crop_box(img, ocr.boxes[key])
+        whitelist = NUMBER_WHITELIST if key in _NUMERIC_VALUE_FIELDS else None
+        best = None
+        for psm in _RERECOGNITION_PSMS:
+            words = run_ocr_data(crop, psm, whitelist, backend)
+            raw_value = " ".join(word.text for word in words)
+            candidate = _parse_field_value(key, raw_value) if raw_value else None
+            if candidate is None or not str(candidate).strip() or candidate in suspects:
+                continue
+            candidate_confidence = min(word.confidence for word in words)
+            if best is None or candidate_confidence > best[1]:
+                best = (str(candidate), candidate_confidence, psm)
+            if candidate_confidence >= OCR_FIELD_MIN_CONFIDENCE:
+                break
+        if best is not None and best[0] != value and (value in suspects or best[1] > confidence):
+            logger.info(f"KORREKTUR: '{key}' von '{value}' ({confidence:.0f}) auf '{best[0]}' ({best[1]:.0f}, "
+                        f"psm {best[2]}) geändert.")
+            results[key] = best[0]
+    return results, checked
+
+
+# --- Spekulative Volltext-Durchläufe ---
+
+_pass_pool: ThreadPoolExecutor | None = None
+_pass_pool_lock = threading.Lock()
+
+
+def _get_pass_pool() -> ThreadPoolExecutor:
+    global _pass_pool
+    if _pass_pool is None:
+        with _pass_pool_lock:
+            if _pass_pool is None:
+                _pass_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-durchlauf")
+    return _pass_pool
+
+
+def ocr_pass(img: np.ndarray, psm: int, backend: OcrBackend | None = None) -> OcrPass:
+    """Ein Volltext-Durchlauf mit Konfidenz und Umriss je Feld."""
+    return parse_ocr_words(run_ocr_data(img, psm, backend=backend))
+
+
+def _worker_pass(img: np.ndarray, psm: int) -> OcrPass:
+    return ocr_pass(img, psm, get_thread_ocr_backend())
+
+
+def merge_pass_results(primary: dict, primary_conf: dict[str, float],
+                       secondary: dict, secondary_conf: dict[str, float]) -> dict:
+    """
+    Führt die Felder von psm 4 (primary, behält die Zeilenstruktur) und psm 11 (secondary) zusammen.
+    psm 11 trennt Label und Wert oft in eigene Zeilen und liefert dann sicher erkannte, aber falsch
+    zugeordnete Werte; es ersetzt ein Feld deshalb nur, wenn psm 4 es nicht gefunden hat oder unsicher
+    ist (< OCR_FIELD_MIN_CONFIDENCE) und psm 11 sicherer ist. Bekannte Lesefehler (_SUSPECT_VALUES)
+    werden immer ersetzt.
+    """
+    merged = dict(primary)
+    for key, value in secondary.items():
+        if value is None or value == merged.get(key):
+            continue
+        current, current_conf = merged.get(key), primary_conf.get(key, 0.0)
+        other_conf = secondary_conf.get(key, 0.0)
+        if current in _SUSPECT_VALUES.get(key, ()):
+            reason = "Problemfall"
+        elif current is None and other_conf >= OCR_FIELD_MIN_CONFIDENCE:
+            reason = "fehlt in psm 4"
+        elif current is not None and current_conf < OCR_FIELD_MIN_CONFIDENCE and other_conf > current_conf:
+            reason = "sicherer"
+        else:
+            continue
+        logger.info(f"Zusammenführung: {key} '{current}' ({current_conf:.0f}) -> '{value}' ({other_conf:.0f}) [{reason}]")
+        merged[key] = value
+    return merged
+
+
+def speculative_passes(processed_img: np.ndarray) -> tuple[dict, str, str]:
+    """
+    Startet psm 11 im Hintergrund-Thread (eigene Engine) und psm 4 im aufrufenden Thread auf demselben Bild.
+    Liefert (zusammengeführte Ergebnisse, Text psm 4, Text psm 11).
+    """
+    future = _get_pass_pool().submit(_worker_pass, processed_img, 11)
+    pass1 = ocr_pass(processed_img, 4)
+    try:
+        pass2 = future.result()
+    except Exception as e:
+        logger.error(f"Fehler im parallelen Durchlauf (psm 11): {e}. Ergebnis aus psm 4 wird verwendet.")
+        return pass1.results, pass1.text, ""
+    return merge_pass_results(pass1.results, pass1.confidences, pass2.results, pass2.confidences), pass1.text, pass2.text
+
+
+# --- Scan-Cache ---
+
+class ScanCacheInfo(NamedTuple):
+    hits: int           # identische Pixel
+    near_hits: int      # Abweichung innerhalb SCAN_CACHE_PIXEL_TOLERANCE
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class ScanCache:
+    """
+    Begrenzter LRU-Cache der OCR-Ergebnisse je Graustufen-Aufnahme. Schlüssel ist eine CRC32-Prüfsumme
+    der Pixel; ein Treffer wird immer gegen das gespeicherte Bild geprüft. Ohne exakten Treffer wird
+    mit Bildern gleicher Größe verglichen, ob jedes Pixel höchstens tolerance Graustufen abweicht.
+    Die Einträge gelten nur für die Erkennungs-Einstellungen (recognition_settings), mit denen sie
+    entstanden sind; ändern sich diese, wird der Cache geleert. Zu jedem Eintrag kann je Material-Root
+    die Zuordnung des Ergebnisses (z.B. rule_engine.PrcResolution) abgelegt werden (scan_and_resolve).
+    """
+
+    def __init__(self, maxsize: int = SCAN_CACHE_SIZE, tolerance: int = SCAN_CACHE_PIXEL_TOLERANCE):
+        self.maxsize = maxsize
+        self.tolerance = tolerance
+        self._entries: OrderedDict[tuple, tuple[np.ndarray, dict, str, dict]] = OrderedDict()
+        self._settings: tuple | None = None
+        self._lock = threading.Lock()
+        self.hits = self.near_hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def make_key(gray_img: np.ndarray) -> tuple:
+        gray_img = np.ascontiguousarray(gray_img)
+        return gray_img.shape, zlib.crc32(gray_img)
+
+    def _find(self, gray_img: np.ndarray, key: tuple) -> tuple[tuple | None, bool]:
+        """(Schlüssel des passenden Eintrags oder None, exakter Treffer); nur unter self._lock aufrufen."""
+        entry = self._entries.get(key)
+        if entry is not None and cv2.norm(gray_img, entry[0], cv2.NORM_INF) == 0:
+            return key, True
+        if self.tolerance > 0:
+            for other_key in reversed(self._entries):
+                image = self._entries[other_key][0]
+                if image.shape == gray_img.shape and cv2.norm(gray_img, image, cv2.NORM_INF) <= self.tolerance:
+                    return other_key, False
+        return None, False
+
+    def get(self, gray_img: np.ndarray, settings: tuple) -> tuple[dict, str] | None:
+        """(Ergebnisse, Text) des gleichen Fensters oder None. Die Ergebnisse sind eine Kopie."""
+        key = self.make_key(gray_img)
+        with self._lock:
+            if settings != self._settings:
+                if self._entries:
+                    logger.debug(f"Erkennungs-Einstellungen geändert, Scan-Cache geleert ({len(self._entries)} Einträge).")
+                self._entries.clear()
+                self._settings = settings
+            found, exact = self._find(gray_img, key)
+            if found is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(found)
+            if exact:
+                self.hits += 1
+            else:
+                self.near_hits += 1
+            _, results, text, _ = self._entries[found]
+            return dict(results), text
+
+    def get_resolution(self, gray_img: np.ndarray, settings: tuple, material_root_path: str):
+        """Zum gleichen Fenster abgelegte Zuordnung für material_root_path oder None (ungeprüft)."""
+        with self._lock:
+            if settings != self._settings:
+                return None
+            found, _ = self._find(gray_img, self.make_key(gray_img))
+            return None if found is None else self._entries[found][3].get(material_root_path)
+
+    def put_resolution(self, gray_img: np.ndarray, settings: tuple, material_root_path: str, resolution):
+        """Legt die Zuordnung zum Eintrag des gleichen Fensters ab (ohne Eintrag: nichts)."""
+        with self._lock:
+            if settings != self._settings:
+                return
+            found, _ = self._find(gray_img, self.make_key(gray_img))
+            if found is not None:
+                self._entries[found][3][material_root_path] = resolution
+
+    def put(self, gray_img: np.ndarray, settings: tuple, results: dict, text: str):
+        if self.maxsize <= 0:
+            return
+        key = self.make_key(gray_img)
+        with self._lock:
+            if settings != self._settings:
+                return  # Einstellungen wurden zwischenzeitlich geändert
+            self._entries[key] = (gray_img.copy(), dict(results), text, {})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> ScanCacheInfo:
+        with self._lock:
+            return ScanCacheInfo(self.hits, self.near_hits, self.misses, self.evictions,
+                                 len(self._entries), self.maxsize)
+
+
+scan_cache = ScanCache()
+
+
+def recognition_settings() -> tuple:
+    """Einstellungen, die das Ergebnis eines Scans bestimmen (Schlüssel der Gültigkeit im Scan-Cache)."""
+    return (OCR_BACKEND, OCR_SPECULATIVE_PASSES, OCR_LINE_STRIPS or OCR_LINE_WORKERS > 0,
+            CONTENT_CROP_ENABLED, get_preprocess_config())
+
+
+def scan_cache_info() -> ScanCacheInfo:
+    """Zähler des Scan-Caches (Treffer, Treffer mit Toleranz, Fehlschläge, Verdrängungen)."""
+    return scan_cache.info()
+
+
+def ocr_line_parse(gray_img: np.ndarray, debug_scan: debug_dump.DebugScan | None = None) -> tuple[dict, str]:
+    """
+    Führt OCR durch und extrahiert spezifische Daten.
+    Ist das Fenster seit einem der letzten Scans unverändert, wird dessen Ergebnis ohne OCR geliefert.
+    Ist debug_scan gesetzt, werden Tesseract-Eingabebild, Roh-Texte und Ergebnisse darin abgelegt.
+    """
+    if gray_img is None or gray_img.size == 0:
+        logger.error("Ungültiges Graustufenbild an ocr_line_parse übergeben.")
+        raise ValueError("Ungültiges Graustufenbild für OCR erhalten.")
+
+    settings = recognition_settings()
+    if SCAN_CACHE_ENABLED:
+        start = time.perf_counter()
+        cached = scan_cache.get(gray_img, settings)
+        if cached is not None:
+            results, full_text = cached
+            info = scan_cache.info()
+            logger.info(f"Fenster unverändert, Ergebnis aus dem Scan-Cache in {(time.perf_counter() - start) * 1e6:.0f} µs "
+                        f"(Treffer {info.hits}, mit Toleranz {info.near_hits}, Fehlschläge {info.misses}): {results}")
+            if debug_scan is not None:
+                debug_scan.add_text("ocr_text_cache.txt", full_text)
+                debug_scan.add_json("ergebnis.json", results)
+            return results, full_text
+
+    with get_preprocess_pipeline().lock:  # die Vorverarbeitungs-Puffer werden von Scan zu Scan wiederverwendet
+        results, full_text = _recognize_panel(gray_img, debug_scan)
+    if SCAN_CACHE_ENABLED:
+        scan_cache.put(gray_img, settings, results, full_text)
+    return results, full_text
+
+
+def scan_panel(debug_scan: debug_dump.DebugScan | None = None) -> tuple[dict, str]:
+    """
+    Aufnahme (capture_panel) und OCR (ocr_line_parse) des Eigenschaftenfensters. Die Sperre der Pipeline
+    wird von der Aufnahme bis zum Ende der Erkennung gehalten, damit ein zweiter Scan (z.B. doppelt
+    gedrückter Hotkey) den Aufnahmepuffer nicht überschreibt, während dieser noch gelesen wird.
+    """
+    with get_preprocess_pipeline().lock:
+        gray_img = capture_panel()
+        if debug_scan is not None:
+            debug_scan.add_image("2_graustufen", gray_img)
+        return ocr_line_parse(gray_img, debug_scan=debug_scan)
+
+
+def scan_and_resolve(material_root_path: str, resolve: Callable[[dict, str], object],
+                     debug_scan: debug_dump.DebugScan | None = None) -> tuple[dict, str, object]:
+    """
+    scan_panel und Zuordnung des Ergebnisses: resolve(Ergebnisse, material_root_path) liefert eine
+    Zuordnung mit path und is_current(material_root_path) (z.B. rule_engine.PrcResolution) oder None.
+    Die Zuordnung wird im Eintrag des Scan-Caches abgelegt; ist das Fenster unverändert und die
+    Zuordnung noch aktuell, entfallen OCR und Regelsuche. Liefert (Ergebnisse, Text, Zuordnung).
+    """
+    with get_preprocess_pipeline().lock:
+        gray_img = capture_panel()
+        if debug_scan is not None:
+            debug_scan.add_image("2_graustufen", gray_img)
+        results, full_text = ocr_line_parse(gray_img, debug_scan=debug_scan)
+        settings = recognition_settings()
+        if SCAN_CACHE_ENABLED:
+            resolution = scan_cache.get_resolution(gray_img, settings, material_root_path)
+            if resolution is not None and resolution.is_current(material_root_path):
+                logger.info(f"Zuordnung aus dem Scan-Cache: '{resolution.path}'")
+                return results, full_text, resolution
+        resolution = resolve(results, material_root_path)
+        if SCAN_CACHE_ENABLED and resolution is not None:
+            scan_cache.put_resolution(gray_img, settings, material_root_path, resolution)
+        return results, full_text, resolution
+
+
+def _recognize_panel(gray_img: np.ndarray, debug_scan: debug_dump.DebugScan | None) -> tuple[dict, str]:
+    """OCR des Fensters als Volltext; unsichere Felder werden gezielt aus ihrem Ausschnitt nachgelesen."""
+    # --- Bildvorverarbeitung (Upscaling + Binarisierung für bessere Erkennung) ---
+    config = get_preprocess_config()
+    logger.info(f"Vorverarbeitung: {config.describe()}")
+    if CONTENT_CROP_ENABLED:
+        gray_img = crop_to_content(gray_img)
+    processed_img = get_preprocess_pipeline().process(gray_img, config)
+
+    # Debug-Bild merken, um zu sehen, was Tesseract bekommt (geschrieben wird im Hintergrund)
+    if debug_scan is not None:
+        debug_scan.add_image("3_tesseract_eingabe", processed_img)
+
+    if OCR_SPECULATIVE_PASSES:
+        try:
+            logger.info(f"Starte OCR-Durchläufe psm 4 und psm 11 parallel (Backend: {get_ocr_backend().name})")
+            results, full_text_pass1, full_text_pass2 = speculative_passes(processed_img)
         except Exception as e:
-            logger.error(
-                f"Fehler während des Korrekturlaufs (Durchlauf 2): {e}. Ergebnis aus Durchlauf 1 wird beibehalten.")
+            logger.error(f"Fehler während der OCR-Durchläufe: {e}", exc_info=True)
+            raise RuntimeError(f"Kritischer Fehler im ersten OCR-Durchlauf: {e}") from e
+        logger.info(f"--- OCR Roh-Text (Durchlauf 1) ---\n{full_text_pass1}\n--------------------")
+        logger.info(f"OCR Parsing Ergebnisse (FINAL): {results}")
+        if debug_scan is not None:
+            debug_scan.add_text("ocr_text_durchlauf1.txt", full_text_pass1)
+            debug_scan.add_text("ocr_text_durchlauf2.txt", full_text_pass2)
+            debug_scan.add_json("ergebnis.json", results)
+        return results, full_text_pass1
+
+    # --- 1. ERSTER OCR-DURCHLAUF (Zeilenstreifen mit Zeilen-Cache oder psm 4; Wörter mit Konfidenz) ---
+    try:
+        if OCR_LINE_STRIPS or OCR_LINE_WORKERS > 0:
+            logger.info(f"Starte OCR-Durchlauf 1 (Zeilenstreifen, psm {LINE_STRIP_PSM}, "
+                        f"{f'{OCR_LINE_WORKERS} Prozesse' if OCR_LINE_WORKERS > 1 else 'im Scan-Thread'})")
+            words = ocr_line_strips(processed_img, OCR_LINE_WORKERS)
+        else:
+            logger.info(f"Starte OCR-Durchlauf 1 (psm 4, Backend: {get_ocr_backend().name})")
+            words = run_ocr_data(processed_img, 4)
+    except Exception as e:
+        logger.error(f"Fehler während OCR-Durchlauf 1: {e}", exc_info=True)
+        # Wenn der erste Durchlauf fehlschlägt, können wir nicht fortfahren
+        raise RuntimeError(f"Kritischer Fehler im ersten OCR-Durchlauf: {e}") from e
+
+    first_pass = parse_ocr_words(words)
+    full_text_pass1 = first_pass.text
+    logger.info(f"--- OCR Roh-Text (Durchlauf 1) ---\n{full_text_pass1}\n--------------------")
+    logger.info(f"Konfidenz je Feld: { {key: round(conf) for key, conf in first_pass.confidences.items()} }")
+
+    # --- 2. GEZIELTE KORREKTUR: nur unsichere Felder, nur ihr Ausschnitt ---
+    results = first_pass.results
+    try:
+        results, checked = rerecognize_fields(processed_img, first_pass)
+        if checked and debug_scan is not None:
+            debug_scan.add_json("nachgeprueft.json", {key: {"wert": first_pass.results[key],
+                                                            "konfidenz": first_pass.confidences[key],
+                                                            "umriss": first_pass.boxes[key]} for key in checked})
+    except Exception as e:
+        logger.error(f"Fehler während der Nachkorrektur: {e}. Ergebnis aus Durchlauf 1 wird beibehalten.")
 
     logger.info(f"OCR Parsing Ergebnisse (FINAL): {results}")
-    return results, full_text_pass1  # Wir geben den Text des ersten Durchlaufs zurück, da er die richtige Struktur hat
\ No newline at end of file
+    if debug_scan is not None:
+        debug_scan.add_text("ocr_text_durchlauf1.txt", full_text_pass1)
+        debug_scan.add_json("ergebnis.json", results)
+    return results, full_text_pass1  # Wir geben den Text des ersten Durchlaufs zurück, da er die richtige Struktur hat
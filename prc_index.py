@@ -0,0 +1,370 @@
+# prc_index.py
+"""
+Dieses Modul enthält einen Verzeichnis-Index für die Prozess-Ordner (K:\\Esprit\\Prozesse\\...).
+
+Jeder Ordner wird einmal per os.scandir gelesen; gemerkt werden die sortierte Liste der
+Einträge und je Präfix (Teil des Dateinamens vor dem ersten "_") die erste .prc-Datei.
+Bei jeder Abfrage wird nur die mtime des Ordners geprüft (ein stat statt listdir + isfile
+pro Eintrag); hat sie sich geändert, wird der Ordner neu gelesen. Mit max_age_s entfällt
+auch dieses stat für Ordner, die vor kurzem geprüft wurden (Treffer des PRC-Caches).
+
+Optional wird der Index in einer lokalen SQLite-Datei (PrcIndexStore) abgelegt. Nach einem
+Neustart werden die Ordner daraus gelesen statt vom Netzlaufwerk; die mtime-Prüfung bleibt
+dieselbe, das Vorwärmen gleicht den gespeicherten Stand im Hintergrund mit dem Share ab.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, NamedTuple
+
+# --- Logging  ---
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - (%(module)s) - %(message)s')
+
+
+# --- Konfiguration Vorwärmen ---
+PREWARM_MAX_WORKERS = 4
+PREWARM_ROOT_TIMEOUT_S = 60.0  # pro Material-Root
+
+# --- Konfiguration persistenter Index ---
+PRC_INDEX_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prc_index.sqlite3")
+
+
+class DirListing(NamedTuple):
+    """Zwischengespeicherter Inhalt eines Ordners."""
+    mtime_ns: int
+    subdirs: tuple[str, ...]  # Namen, sortiert
+    prc_files: tuple[str, ...]  # Namen, sortiert
+    first_prc_by_prefix: dict[str, str]  # Präfix -> Name der ersten .prc-Datei
+
+
+def _prc_prefix(name: str) -> str | None:
+    """Teil des Dateinamens vor dem ersten "_" (None, wenn es keinen gibt)."""
+    return name.split("_", 1)[0] if "_" in name else None
+
+
+def _build_listing(mtime_ns: int, subdirs, prc_files) -> DirListing:
+    first_prc_by_prefix: dict[str, str] = {}
+    for name in prc_files:
+        prefix = _prc_prefix(name)
+        if prefix is not None:
+            first_prc_by_prefix.setdefault(prefix, name)
+    return DirListing(mtime_ns, tuple(subdirs), tuple(prc_files), first_prc_by_prefix)
+
+
+class PrcIndexStore:
+    """
+    Lokale SQLite-Ablage des Verzeichnis-Index.
+    Tabelle 'ordner': gelesene Ordner mit ihrer mtime; Tabelle 'eintraege': Unterordner und .prc-Dateien
+    je Ordner (path, parent, prefix, name, mtime_ns), indiziert über (parent, prefix).
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS ordner (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS eintraege (
+            path TEXT PRIMARY KEY,
+            parent TEXT NOT NULL,
+            prefix TEXT,
+            name TEXT NOT NULL,
+            ist_ordner INTEGER NOT NULL,
+            mtime_ns INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_eintraege_parent_prefix ON eintraege (parent, prefix);
+    """
+
+    def __init__(self, db_path: str = PRC_INDEX_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self._SCHEMA)
+        logger.info(f"Persistenter Prozess-Index geöffnet: '{db_path}'.")
+
+    def load_listing(self, dir_path: str) -> DirListing | None:
+        """Gespeicherter Inhalt eines Ordners oder None, wenn er noch nie gelesen wurde."""
+        with self._lock:
+            row = self._conn.execute("SELECT mtime_ns FROM ordner WHERE path = ?", (dir_path,)).fetchone()
+            if row is None:
+                return None
+            entries = self._conn.execute(
+                "SELECT name, ist_ordner FROM eintraege WHERE parent = ? ORDER BY name", (dir_path,)).fetchall()
+        subdirs = [name for name, is_dir in entries if is_dir]
+        prc_files = [name for name, is_dir in entries if not is_dir]
+        return _build_listing(row[0], subdirs, prc_files)
+
+    def save_listing(self, dir_path: str, listing: DirListing, entry_mtimes: dict[str, int]):
+        """Ersetzt den gespeicherten Inhalt eines Ordners."""
+        rows = [(os.path.join(dir_path, name), dir_path, None, name, 1, entry_mtimes.get(name))
+                for name in listing.subdirs]
+        rows += [(os.path.join(dir_path, name), dir_path, _prc_prefix(name), name, 0, entry_mtimes.get(name))
+                 for name in listing.prc_files]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM eintraege WHERE parent = ?", (dir_path,))
+            self._conn.executemany("INSERT OR REPLACE INTO eintraege VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR REPLACE INTO ordner VALUES (?, ?)", (dir_path, listing.mtime_ns))
+
+    def forget(self, dir_path: str):
+        """Entfernt einen nicht mehr vorhandenen Ordner aus der Ablage."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM eintraege WHERE parent = ?", (dir_path,))
+            self._conn.execute("DELETE FROM ordner WHERE path = ?", (dir_path,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM eintraege")
+            self._conn.execute("DELETE FROM ordner")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PrcDirectoryIndex:
+    """Index (Material-Root, relativer Unterordner, Präfix) -> erste passende .prc-Datei."""
+
+    def __init__(self):
+        self._listings: dict[str, DirListing] = {}
+        self._checked: dict[str, float] = {}  # Ordner -> time.monotonic() der letzten mtime-Prüfung
+        self._target_dirs: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+        self.store: PrcIndexStore | None = None
+
+    def attach_store(self, store: PrcIndexStore | None):
+        """Verbindet den Index mit einer persistenten Ablage (None trennt sie wieder)."""
+        with self._lock:
+            self.store = store
+            self._listings.clear()
+            self._checked.clear()
+
+    def find_prc(self, material_root_path: str, relative_subdir: str, prefix: str,
+                 probed: list | None = None) -> str | None:
+        """
+        Alphabetisch erste .prc-Datei im Unterordner, deren Name mit 'PRÄFIX_' beginnt.
+        Ist probed eine Liste, wird (Ordner, verwendetes DirListing oder None) angehängt.
+        """
+        key = (material_root_path, relative_subdir)
+        search_dir = self._target_dirs.get(key)
+        if search_dir is None:
+            search_dir = os.path.normpath(os.path.join(material_root_path, relative_subdir))
+            self._target_dirs[key] = search_dir
+
+        listing = self.get_listing(search_dir)
+        if probed is not None:
+            probed.append((search_dir, listing))
+        if listing is None:
+            logger.warning(f"Zielverzeichnis '{search_dir}' (basierend auf '{relative_subdir}') nicht gefunden.")
+            return None
+
+        if "_" in prefix:  # Präfix-Tabelle kennt nur den Teil vor dem ersten "_"
+            prefix_to_search = prefix + "_"
+            name = next((n for n in listing.prc_files if n.startswith(prefix_to_search)), None)
+        else:
+            name = listing.first_prc_by_prefix.get(prefix)
+
+        if name is None:
+            logger.info(f"Keine .prc-Datei mit Präfix '{prefix}_' im Verzeichnis '{search_dir}' gefunden.")
+            return None
+        full_path = os.path.join(search_dir, name)
+        logger.info(f"FINALE AUSWAHL (erste Datei mit Präfix '{prefix}_'): '{full_path}'.")
+        return full_path
+
+    def get_listing(self, dir_path: str, max_age_s: float = 0.0) -> DirListing | None:
+        """
+        Inhalt des Ordners; neu gelesen nur, wenn sich seine mtime geändert hat. None, wenn kein Ordner.
+        Mit max_age_s entfällt auch das stat, wenn die mtime vor weniger als max_age_s Sekunden
+        geprüft wurde (z.B. Cache-Treffer, die sonst jeden Zielordner auf dem Share abfragen).
+        """
+        now = time.monotonic()
+        checked = self._checked.get(dir_path)
+        if checked is not None and now - checked < max_age_s:
+            return self._listings.get(dir_path)
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            with self._lock:
+                was_indexed = self._listings.pop(dir_path, None) is not None
+                self._checked[dir_path] = now
+            if was_indexed:
+                self._forget_persisted(dir_path)
+            return None
+
+        listing = self._listings.get(dir_path)
+        if listing is None and self.store is not None:
+            listing = self._load_persisted(dir_path)
+        if listing is None or listing.mtime_ns != mtime_ns:
+            listing = self._scan(dir_path, mtime_ns)
+        with self._lock:
+            if listing is None:  # Lesefehler: beim nächsten Mal erneut prüfen
+                self._checked.pop(dir_path, None)
+            else:
+                self._checked[dir_path] = now
+        return listing
+
+    def _load_persisted(self, dir_path: str) -> DirListing | None:
+        try:
+            listing = self.store.load_listing(dir_path)
+        except sqlite3.Error as e:
+            logger.error(f"Fehler beim Lesen des persistenten Index für '{dir_path}': {e}")
+            return None
+        if listing is not None:
+            with self._lock:
+                self._listings[dir_path] = listing
+        return listing
+
+    def _forget_persisted(self, dir_path: str):
+        if self.store is None:
+            return
+        try:
+            self.store.forget(dir_path)
+        except sqlite3.Error as e:
+            logger.error(f"Fehler beim Entfernen von '{dir_path}' aus dem persistenten Index: {e}")
+
+    def _scan(self, dir_path: str, mtime_ns: int) -> DirListing | None:
+        subdirs, prc_files = [], []
+        entry_mtimes: dict[str, int] = {}
+        keep_mtimes = self.store is not None
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            subdirs.append(entry.name)
+                        elif entry.name.lower().endswith(".prc") and entry.is_file():
+                            prc_files.append(entry.name)
+                        else:
+                            continue
+                        if keep_mtimes:  # unter Windows liefert scandir die stat-Daten ohne Zusatzaufruf
+                            entry_mtimes[entry.name] = entry.stat().st_mtime_ns
+                    except OSError as e:
+                        logger.debug(f"Eintrag '{entry.path}' übersprungen: {e}")
+        except NotADirectoryError:
+            return None
+        except OSError as e:
+            logger.error(f"Fehler beim Lesen des Verzeichnisses '{dir_path}': {e}")
+            return None
+
+        subdirs.sort()
+        prc_files.sort()
+        listing = _build_listing(mtime_ns, subdirs, prc_files)
+        with self._lock:
+            self._listings[dir_path] = listing
+        if self.store is not None:
+            try:
+                self.store.save_listing(dir_path, listing, entry_mtimes)
+            except sqlite3.Error as e:
+                logger.error(f"Fehler beim Speichern von '{dir_path}' im persistenten Index: {e}")
+        logger.debug(f"Verzeichnis indiziert: '{dir_path}' ({len(subdirs)} Ordner, {len(prc_files)} .prc)")
+        return listing
+
+    def index_root(self, material_root_path: str, priority_subdirs=(), deadline: float | None = None) -> int:
+        """
+        Liest den Material-Root samt aller Unterordner ein, die relativen priority_subdirs
+        (z.B. Zielordner der Regeln) zuerst. Gibt die Anzahl der Ordner zurück.
+        Wird deadline (time.monotonic()) überschritten, bricht das Einlesen mit TimeoutError ab.
+        """
+        root = os.path.normpath(material_root_path)
+        pending = [root] + [os.path.normpath(os.path.join(root, sub)) for sub in reversed(list(priority_subdirs))]
+        visited = set()
+        count = 0
+        while pending:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Zeitüberschreitung beim Indizieren von '{root}' nach {count} Ordnern.")
+            dir_path = pending.pop()
+            if dir_path in visited:
+                continue
+            visited.add(dir_path)
+            listing = self.get_listing(dir_path)
+            if listing is None:
+                continue
+            count += 1
+            pending.extend(os.path.join(dir_path, name) for name in reversed(listing.subdirs))
+        return count
+
+    def invalidate(self, dir_path: str | None = None):
+        """Verwirft den Index eines Ordners (oder alles), auch in der persistenten Ablage."""
+        with self._lock:
+            if dir_path is None:
+                self._listings.clear()
+                self._checked.clear()
+            else:
+                self._listings.pop(os.path.normpath(dir_path), None)
+                self._checked.pop(os.path.normpath(dir_path), None)
+        if self.store is None:
+            return
+        try:
+            if dir_path is None:
+                self.store.clear()
+            else:
+                self.store.forget(os.path.normpath(dir_path))
+        except sqlite3.Error as e:
+            logger.error(f"Fehler beim Verwerfen des persistenten Index: {e}")
+
+
+# Gemeinsamer Index für App und Regel-Engine
+directory_index = PrcDirectoryIndex()
+
+
+# --- Vorwärmen beim App-Start ---
+
+class PrewarmProgress(NamedTuple):
+    """Fortschritt des Vorwärmens nach Abschluss eines Material-Roots."""
+    done: int
+    total: int
+    root: str
+    dirs_indexed: int
+    error: str | None
+
+
+def prewarm_roots(root_paths: list[str], priority_subdirs=(),
+                  on_progress: Callable[[PrewarmProgress], None] | None = None,
+                  index: PrcDirectoryIndex | None = None,
+                  max_workers: int = PREWARM_MAX_WORKERS,
+                  per_root_timeout: float = PREWARM_ROOT_TIMEOUT_S) -> threading.Thread:
+    """
+    Indiziert alle Material-Roots parallel in einem Thread-Pool und kehrt sofort zurück.
+    on_progress wird aus dem Hintergrund-Thread nach jedem fertigen (oder abgebrochenen) Root aufgerufen.
+    """
+    index = index or directory_index
+    unique_roots = list(dict.fromkeys(os.path.normpath(p) for p in root_paths if p))
+    priority_subdirs = tuple(priority_subdirs)
+
+    def index_one(root: str) -> int:
+        return index.index_root(root, priority_subdirs, deadline=time.monotonic() + per_root_timeout)
+
+    def run():
+        started = time.perf_counter()
+        done = 0
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prc-prewarm") as pool:
+            futures = {pool.submit(index_one, root): root for root in unique_roots}
+            for future in as_completed(futures):
+                root = futures[future]
+                done += 1
+                dirs_indexed, error = 0, None
+                try:
+                    dirs_indexed = future.result()
+                    logger.info(f"Vorwärmen: '{root}' indiziert ({dirs_indexed} Ordner).")
+                except Exception as e:
+                    error = str(e)
+                    logger.warning(f"Vorwärmen von '{root}' fehlgeschlagen: {e}")
+                if on_progress:
+                    try:
+                        on_progress(PrewarmProgress(done, len(unique_roots), root, dirs_indexed, error))
+                    except Exception as e:
+                        logger.error(f"Fehler im Fortschritts-Callback des Vorwärmens: {e}", exc_info=True)
+        logger.info(f"Vorwärmen abgeschlossen: {len(unique_roots)} Material-Roots in "
+                    f"{time.perf_counter() - started:.1f} s.")
+
+    thread = threading.Thread(target=run, name="prc-prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -5,18 +5,44 @@ Es geht davon aus, dass die OCR-Kriterien zu einem logischen Prozess führen,
 der durch einen numerischen Präfix im Dateinamen (XX_) innerhalb eines
 spezifischen Unterordners identifiziert wird. Der Rest des Dateinamens kann variieren.
 
-Regel-Struktur:
+Die Regeln stehen in der Regeldatei regeln.json (Aufbau siehe load_rules_file) und
+werden beim Laden in Rule-Objekte übersetzt:
   [Keywords],
-  Lambda-Bedingung (erwartet: ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r),
-  (RELATIVER_UNTERORDNER, PRÄFIX) ODER Aktions-Lambda (erwartet gleiche Argumente wie Bedingung, gibt (RELATIVER_UNTERORDNER, PRÄFIX) zurück)
-Beispiel für das dritte Element (statisch): (r"01_Plan-Aussen-Fase-Tasche", "01")
+  Bedingung: bands(param=(von, bis[, "[]"|"[)"|"(]"|"()"]), ...) ODER
+             Lambda-Bedingung (erwartet: ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia),
+  (RELATIVER_UNTERORDNER, PRÄFIX) ODER CaseTarget/Aktions-Lambda (erwartet gleiche Argumente wie Bedingung,
+  gibt (RELATIVER_UNTERORDNER, PRÄFIX) oder None zurück)
+  optional: kulissen_only=True (Regel gilt nur im Material-Root "KULISSEN-2025")
+
+Die Regeln werden zu einem CompiledRuleSet kompiliert (sortiert und nach Keywords
+gruppiert); ändert sich die Regeldatei, wird sie beim nächsten Scan neu geladen.
+Numerische Bänder (bands(...)) werden je (Keyword, Parameter) in einem IntervalIndex
+abgelegt, sodass die Kandidatensuche per Bisektion in O(log n) erfolgt.
+
+Vor find_prc_path_by_rules liegt ein LRU-Cache (ResolutionCache) mit dem Schlüssel
+(Material-Root, Feature-Typ, auf OCR-Genauigkeit gerundete Zahlenwerte). Er wird geleert,
+wenn das Regelwerk neu geladen wird; ein Treffer gilt nur, solange die dabei geprüften
+Zielordner im Verzeichnis-Index unverändert sind (geprüft höchstens alle RESOLUTION_RECHECK_S).
+resolve_prc_path liefert dazu eine PrcResolution, die der Aufrufer (Scan-Cache) aufbewahren und
+mit is_current() ebenso prüfen kann.
+
+Für ganze Feature-Listen (Export aus Esprit) gibt es resolve_batch(): die Tabelle wird nach
+Feature-Typ gruppiert und die Bänder je Gruppe als NumPy-Masken ausgewertet.
 """
 
 import os
-import logging
 import re
+import csv
+import json
+import logging
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Callable, NamedTuple
 
-from sympy import andre
+import numpy as np
+
+import prc_index
 
 # --- Logging Konfiguration ---
 logger = logging.getLogger(__name__)
@@ -25,665 +51,865 @@ if not logger.hasHandlers():
                         format='%(asctime)s - %(levelname)s - (%(module)s) - %(message)s')
 
 
-# --- Regelbasierte Zuordnung für .prc-Dateien ---
-
-def find_prc_path_by_rules(feature_type_lower: str | None, ocr_all_results: dict,
-                           material_root_path: str | None) -> str | None:
-    if not feature_type_lower or not ocr_all_results or not material_root_path:
-        logger.warning(
-            f"find_prc_path_by_rules mit unvollständigen Daten: ft='{feature_type_lower}', ocr_results='{ocr_all_results}', root='{material_root_path}'"
-        )
+# --- Datenstrukturen ---
+
+class Rule(NamedTuple):
+    """Eine Zuordnungsregel. Einfache Regeln dürfen als 3-Tupel notiert werden."""
+    keywords: list[str]
+    condition: Callable[..., bool]
+    target: tuple[str, str] | Callable[..., tuple[str, str] | None]
+    kulissen_only: bool = False
+
+
+class FeatureValues(NamedTuple):
+    """Die Argumente der Regel-Lambdas, in derselben Reihenfolge wie deren Signatur."""
+    ft_lower: str
+    ocr_res: dict
+    dia: float | None
+    bbox_b: float | None
+    tief: float | None
+    bbox_l: float | None
+    kl_r: float | None
+    fase_dia: float | None
+    bohr_dia: float | None
+
+    @classmethod
+    def from_ocr(cls, feature_type_lower: str, ocr_all_results: dict) -> "FeatureValues":
+        """Wandelt die OCR-Strings in Floats um (None, wenn leer oder nicht lesbar)."""
+        return cls(feature_type_lower, ocr_all_results,
+                   *(_parse_ocr_float(ocr_all_results, OCR_KEYS[param]) for param in NUMERIC_PARAMS))
+
+
+# Numerische Parameter und ihre Feldnamen im OCR-Ergebnis
+NUMERIC_PARAMS = FeatureValues._fields[2:]
+OCR_KEYS = {
+    "dia": "Durchmesser",
+    "bbox_b": "Begrenzungsbox Breite",
+    "tief": "Tiefe",
+    "bbox_l": "Begrenzungsbox Länge",
+    "kl_r": "Kleinster Radius",
+    "fase_dia": "Fasendurchmesser",
+    "bohr_dia": "Bohrdurchmesser",
+}
+
+
+class Band(NamedTuple):
+    """Numerischer Wertebereich eines Parameters. None als Grenze bedeutet unbeschränkt."""
+    param: str
+    lo: float | None
+    hi: float | None
+    lo_inclusive: bool = True
+    hi_inclusive: bool = True
+
+    def contains(self, value: float | None) -> bool:
+        if value is None:
+            return False
+        if self.lo is not None and not (self.lo <= value if self.lo_inclusive else self.lo < value):
+            return False
+        if self.hi is not None and not (value <= self.hi if self.hi_inclusive else value < self.hi):
+            return False
+        return True
+
+    def mask(self, values: np.ndarray) -> np.ndarray:
+        """Vektorisierte Form von contains() für eine Spalte (NaN steht für None)."""
+        result = ~np.isnan(values)
+        if self.lo is not None:
+            result &= (values >= self.lo) if self.lo_inclusive else (values > self.lo)
+        if self.hi is not None:
+            result &= (values <= self.hi) if self.hi_inclusive else (values < self.hi)
+        return result
+
+    def __str__(self) -> str:
+        lo = "-∞" if self.lo is None else f"{self.lo:g}"
+        hi = "∞" if self.hi is None else f"{self.hi:g}"
+        return f"{'[' if self.lo_inclusive else '('}{lo}, {hi}{']' if self.hi_inclusive else ')'}"
+
+
+class BandCondition:
+    """Bedingung aus numerischen Bändern; alle Bänder müssen erfüllt sein."""
+
+    def __init__(self, bands_: tuple[Band, ...]):
+        self.bands = bands_
+
+    @property
+    def primary_band(self) -> Band | None:
+        """Das erste Band bestimmt den Parameter, nach dem die Regel indiziert wird."""
+        return self.bands[0] if self.bands else None
+
+    def matches(self, features: "FeatureValues") -> bool:
+        for band in self.bands:
+            if not band.contains(getattr(features, band.param)):
+                return False
+        return True
+
+    def mask(self, columns: dict[str, np.ndarray], n: int) -> np.ndarray:
+        """Vektorisierte Form von matches() für n Zeilen (Spalten je Parameter, NaN steht für None)."""
+        result = np.ones(n, dtype=bool)
+        for band in self.bands:
+            result &= band.mask(columns[band.param])
+        return result
+
+    def __call__(self, *args) -> bool:
+        # Gleiche Signatur wie eine Lambda-Bedingung
+        return self.matches(FeatureValues(*args))
+
+    def __repr__(self) -> str:
+        return "bands(" + ", ".join(f"{b.param}={b}" for b in self.bands) + ")"
+
+
+def bands(**ranges: tuple) -> BandCondition:
+    """
+    Baut eine BandCondition, z.B. bands(dia=(2.0, 6.97, "[)"), tief=(0.0, 40.0)).
+    Standard ist "[]" (beide Grenzen inklusive); (None, None) bedeutet "Wert vorhanden".
+    """
+    built = []
+    for param, spec in ranges.items():
+        if param not in FeatureValues._fields[2:]:
+            raise ValueError(f"Unbekannter Parameter für Band: '{param}'")
+        lo, hi = spec[0], spec[1]
+        brackets = spec[2] if len(spec) > 2 else "[]"
+        built.append(Band(param, lo, hi, brackets[0] == "[", brackets[1] == "]"))
+    return BandCondition(tuple(built))
+
+
+def _parse_ocr_float(ocr_all_results: dict, key: str) -> float | None:
+    return _parse_float(ocr_all_results.get(key), key)
+
+
+def _parse_float(value_str, key: str) -> float | None:
+    if not value_str:
+        return None
+    try:
+        return float(str(value_str).replace(",", "."))
+    except ValueError:
+        logger.warning(f"Konnte {key} '{value_str}' nicht in Float umwandeln.")
         return None
 
-    # --- NUR Kulissen regeln benutzen ---
-    current_root_basename = os.path.basename(os.path.normpath(material_root_path)).lower()
-    is_kulissen_2025_active = (current_root_basename == "kulissen-2025")
-    logger.debug(
-        f"Aktueller Material-Root-Basisname: '{current_root_basename}'. Kulissen-Modus aktiv: {is_kulissen_2025_active}")
 
-    # --- Werteextraktion aus OCR ---
-    d_float_str = ocr_all_results.get("Durchmesser")
-    d_float = None
-    if d_float_str:
-        try:
-            d_float = float(str(d_float_str).replace(",", "."))
-        except ValueError:
-            logger.warning(f"Konnte Durchmesser '{d_float_str}' nicht in Float umwandeln.")
+def is_kulissen_root(material_root_path: str) -> bool:
+    """Kulissen-Regeln gelten nur, wenn der Material-Root 'KULISSEN-2025' heißt."""
+    return os.path.basename(os.path.normpath(material_root_path)).lower() == "kulissen-2025"
 
-    tiefe_str = ocr_all_results.get("Tiefe")
-    tiefe_float = None
-    if tiefe_str:
-        try:
-            tiefe_float = float(str(tiefe_str).replace(",", "."))
-        except ValueError:
-            logger.warning(f"Konnte Tiefe '{tiefe_str}' nicht in Float umwandeln.")
 
-    bbox_breite_str = ocr_all_results.get("Begrenzungsbox Breite")
-    bbox_breite_float = None
-    if bbox_breite_str:
-        try:
-            bbox_breite_float = float(str(bbox_breite_str).replace(",", "."))
-        except ValueError:
-            logger.warning(f"Konnte Begrenzungsbox Breite '{bbox_breite_str}' nicht in Float umwandeln.")
+# --- Regeldatei (regeln.json) ---
 
-    bbox_laenge_str = ocr_all_results.get("Begrenzungsbox Länge")
-    bbox_laenge_float = None
-    if bbox_laenge_str:
-        try:
-            bbox_laenge_float = float(str(bbox_laenge_str).replace(",", "."))
-        except ValueError:
-            logger.warning(f"Konnte Begrenzungsbox Länge '{bbox_laenge_str}' nicht in Float umwandeln.")
+RULES_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regeln.json")
 
-    kleinster_radius_str = ocr_all_results.get("Kleinster Radius")
-    kleinster_radius_float = None
-    if kleinster_radius_str:
-        try:
-            kleinster_radius_float = float(str(kleinster_radius_str).replace(",", "."))
-        except ValueError:
-            logger.warning(f"Konnte Kleinster Radius '{kleinster_radius_str}' nicht in Float umwandeln.")
+# Schlüssel eines Regel-/Fall-Eintrags, die keine Parameter-Bänder sind
+_ENTRY_META_KEYS = {"prefix", "subdir", "faelle", "feature_enthaelt", "info"}
+
+
+class Case(NamedTuple):
+    """Ein Fall einer Aktions-Regel: erster passender Fall bestimmt das Ziel."""
+    condition: BandCondition
+    feature_contains: str | None
+    target: tuple[str, str]
+
+
+class CaseTarget:
+    """Deklarative Form eines Aktions-Lambdas (z.B. Plan-Kaskade, Kulissen-Bohrungen)."""
 
-    fasen_dia_str = ocr_all_results.get("Fasendurchmesser")
-    fasen_dia_float = None
-    if fasen_dia_str:
+    def __init__(self, cases: tuple[Case, ...]):
+        self.cases = cases
+
+    def select(self, features: "FeatureValues") -> tuple[str, str] | None:
+        for case in self.cases:
+            if case.feature_contains is not None and case.feature_contains not in features.ft_lower:
+                continue
+            if case.condition.matches(features):
+                return case.target
+        return None
+
+    def __call__(self, *args) -> tuple[str, str] | None:
+        # Gleiche Signatur wie ein Aktions-Lambda
+        return self.select(FeatureValues(*args))
+
+
+def _bands_from_entry(entry: dict) -> BandCondition:
+    """Alle Nicht-Meta-Schlüssel eines Eintrags sind Bänder: Zahl (==), [von, bis] oder [von, bis, "[)"]."""
+    if not isinstance(entry, dict):
+        raise ValueError(f"Eintrag ist kein Objekt: {entry!r}")
+    ranges = {}
+    for param, spec in entry.items():
+        if param in _ENTRY_META_KEYS:
+            continue
+        if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+            ranges[param] = (float(spec), float(spec))
+        elif isinstance(spec, list) and len(spec) in (2, 3):
+            ranges[param] = tuple(spec)
+        else:
+            raise ValueError(f"Ungültiger Wertebereich für '{param}': {spec!r}")
+    return bands(**ranges)
+
+
+def _require_list(value, key: str) -> list:
+    if not isinstance(value, list):
+        raise ValueError(f"'{key}' muss eine Liste sein: {value!r}")
+    return value
+
+
+def _target_from_entry(entry: dict, default_subdir: str | None) -> tuple[str, str]:
+    subdir = entry.get("subdir", default_subdir)
+    prefix = entry.get("prefix")
+    if not isinstance(subdir, str) or not isinstance(prefix, str):
+        raise ValueError(f"Eintrag ohne gültiges 'subdir'/'prefix': {entry!r}")
+    return subdir, prefix
+
+
+def load_rules_file(path: str = RULES_FILE_PATH) -> list[Rule]:
+    """
+    Lädt die Regeln aus der Regeldatei. Aufbau (analog regelübersicht.md):
+
+      {"kategorien": [{"kategorie": ..., "keywords": [...], "nur_kulissen": false, "subdir": ...,
+                       "regeln": [{"dia": [1.52, 2.5], "prefix": "01"}, ...]}]}
+
+    Statt "prefix" kann eine Regel "faelle" enthalten: eine Liste von Einträgen mit eigenen
+    Bändern, optional "feature_enthaelt" und eigenem "subdir"/"prefix"; der erste passende
+    Fall bestimmt das Ziel. Wirft ValueError bei ungültigem Inhalt.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("kategorien", []), list):
+        raise ValueError(f"'{path}' muss ein Objekt mit einer Liste 'kategorien' enthalten")
+
+    rules = []
+    for category in data.get("kategorien", []):
+        if not isinstance(category, dict):
+            raise ValueError(f"Ungültige Kategorie in '{path}': {category!r}")
+        name = category.get("kategorie", "?")
         try:
-            fasen_dia_float = float(str(fasen_dia_str).replace(",", "."))
-        except ValueError:
-            logger.warning(f"Konnte Fasendurchmesser '{fasen_dia_str}' nicht in Float umwandeln.")
+            keywords = _require_list(category["keywords"], "keywords")
+            if not all(isinstance(kw, str) and kw.strip() for kw in keywords):
+                raise ValueError(f"'keywords' darf nur nicht leere Texte enthalten: {keywords!r}")
+            keywords = [kw.lower() for kw in keywords]
+            default_subdir = category.get("subdir")
+            kulissen_only = bool(category.get("nur_kulissen", False))
+            for entry in _require_list(category["regeln"], "regeln"):
+                condition = _bands_from_entry(entry)
+                if "faelle" in entry:
+                    target = CaseTarget(tuple(
+                        Case(_bands_from_entry(case), case.get("feature_enthaelt"),
+                             _target_from_entry(case, default_subdir))
+                        for case in _require_list(entry["faelle"], "faelle")))
+                else:
+                    target = _target_from_entry(entry, default_subdir)
+                rules.append(Rule(keywords, condition, target, kulissen_only))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Ungültige Kategorie '{name}' in '{path}': {e}") from e
+    return rules
+
+
+
+# --- Intervall-Index für Band-Regeln ---
+
+class IntervalIndex:
+    """
+    Index über die Bänder eines Parameters innerhalb einer Keyword-Gruppe.
+
+    Alle Bandgrenzen werden sortiert; sie zerlegen die Zahlengerade in 2n+1 Elementarbereiche
+    (offene Abschnitte zwischen den Grenzen und die Grenzpunkte selbst). Für jeden Bereich
+    werden die abdeckenden Regeln in Prioritätsreihenfolge vorberechnet, lookup() ist
+    damit eine Bisektion. Überlappungen und Lücken werden beim Aufbau ermittelt.
+    """
+
+    def __init__(self, keyword: str, param: str, entries: list[tuple[int, Band, BandCondition, Rule]]):
+        self.keyword = keyword
+        self.param = param
+        self._bounds = sorted({v for _, band, _, _ in entries for v in (band.lo, band.hi) if v is not None})
+        self._regions: list[tuple[int, ...]] = []
+        for region in range(2 * len(self._bounds) + 1):
+            representative = self._representative(region)
+            self._regions.append(tuple(pos for pos, band, _, _ in entries if band.contains(representative)))
+        # NaN liegt in keinem Bereich, erfüllt aber "Wert vorhanden"
+        self._unbounded_positions = tuple(pos for pos, band, _, _ in entries if band.lo is None and band.hi is None)
+
+        self.overlaps = self._find_overlaps(entries)
+        self.gaps = self._find_gaps()
+
+    def _representative(self, region: int) -> float:
+        bounds = self._bounds
+        if not bounds:
+            return 0.0
+        if region % 2 == 1:
+            return bounds[region // 2]
+        i = region // 2
+        if i == 0:
+            return bounds[0] - 1.0
+        if i == len(bounds):
+            return bounds[-1] + 1.0
+        return (bounds[i - 1] + bounds[i]) / 2.0
+
+    def lookup(self, value: float | None) -> tuple[int, ...]:
+        """Positionen der Regeln, deren Band den Wert enthält (in Prioritätsreihenfolge)."""
+        if value is None:
+            return ()
+        if value != value:  # NaN
+            return self._unbounded_positions
+        i = bisect_left(self._bounds, value)
+        if i < len(self._bounds) and self._bounds[i] == value:
+            return self._regions[2 * i + 1]
+        return self._regions[2 * i]
+
+    @staticmethod
+    def _find_overlaps(entries) -> list[str]:
+        """Regelpaare, deren Bänder sich in allen gemeinsamen Parametern überschneiden."""
+        overlaps = []
+        for i, (_, band_a, cond_a, rule_a) in enumerate(entries):
+            for _, band_b, cond_b, rule_b in entries[i + 1:]:
+                other_b = {b.param: b for b in cond_b.bands}
+                if all(b.param not in other_b or _bands_intersect(b, other_b[b.param]) for b in cond_a.bands):
+                    overlaps.append(f"{band_a} {_describe_target(rule_a.target)} überlappt "
+                                    f"{band_b} {_describe_target(rule_b.target)}")
+        return overlaps
+
+    def _find_gaps(self) -> list[str]:
+        """Nicht abgedeckte Bereiche zwischen dem ersten und dem letzten abgedeckten Bereich."""
+        gaps = []
+        bounds = self._bounds
+        covered = [region for region, positions in enumerate(self._regions) if positions]
+        if not covered:
+            return gaps
+        region, last_covered = covered[0], covered[-1]
+        while region < last_covered:
+            if self._regions[region]:
+                region += 1
+                continue
+            start = region
+            while not self._regions[region + 1]:
+                region += 1
+            left = f"[{bounds[start // 2]:g}" if start % 2 == 1 else f"({bounds[start // 2 - 1]:g}"
+            right = f"{bounds[region // 2]:g}]" if region % 2 == 1 else f"{bounds[region // 2]:g})"
+            gaps.append(f"{left}, {right}")
+            region += 1
+        return gaps
+
+
+def _bands_intersect(a: Band, b: Band) -> bool:
+    lo, lo_inclusive = a.lo, a.lo_inclusive
+    if lo is None or (b.lo is not None and (b.lo > lo or (b.lo == lo and not b.lo_inclusive))):
+        lo, lo_inclusive = b.lo, b.lo_inclusive
+    hi, hi_inclusive = a.hi, a.hi_inclusive
+    if hi is None or (b.hi is not None and (b.hi < hi or (b.hi == hi and not b.hi_inclusive))):
+        hi, hi_inclusive = b.hi, b.hi_inclusive
+    if lo is None or hi is None:
+        return True
+    return lo < hi or (lo == hi and lo_inclusive and hi_inclusive)
+
+
+def _describe_target(target) -> str:
+    return "(Aktion)" if callable(target) else f"-> {target[0]!r}/{target[1]!r}"
+
+
+# --- Keyword-Erkennung ---
+
+class KeywordMatcher:
+    """
+    Findet alle Regel-Keywords im Feature-Typ in einem Durchlauf.
+
+    Die Keywords werden zu einem Trie-förmigen Regex zusammengefasst; ein Lookahead liefert
+    an jeder Startposition das längste passende Keyword. Kürzere, darin enthaltene Keywords
+    (z.B. "nuten" in "nuten rückzug") werden über eine vorberechnete Enthaltensein-Tabelle
+    ergänzt. Das Ergebnis entspricht einer Substring-Suche je Keyword; die frühere
+    Wortgrenzen-Suche für "reib mit o"/"reib ohne o" fiel ohnehin auf Substring zurück.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted({kw for kw in keywords if kw}, key=lambda kw: (-len(kw), kw))
+        self._pattern = re.compile("(?=(" + _trie_regex(self.keywords) + "))") if self.keywords else None
+        self._contained = {kw: tuple(other for other in self.keywords if other in kw) for kw in self.keywords}
+
+    def match(self, feature_type_lower: str) -> list[tuple[str, int]]:
+        """Gefundene Keywords mit ihrer Spezifität (Länge), spezifischstes zuerst."""
+        if self._pattern is None:
+            return []
+        found = set()
+        for longest_kw in self._pattern.findall(feature_type_lower):
+            found.update(self._contained[longest_kw])
+        return [(kw, len(kw)) for kw in sorted(found, key=lambda kw: (-len(kw), kw))]
+
+
+def _trie_regex(words: list[str]) -> str:
+    """Regex in Trie-Form: gemeinsame Präfixe werden nur einmal geprüft, längere Treffer bevorzugt."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+# --- Kompiliertes Regelwerk ---
+
+class CompiledRuleSet:
+    """
+    Einmalig vorbereitetes Regelwerk: Regeln sind nach Spezifität (längstes Keyword zuerst)
+    sortiert und je Keyword in Buckets abgelegt. resolve() prüft nur die Regeln, deren
+    Keyword der KeywordMatcher im Feature-Typ findet, in der ursprünglichen Reihenfolge.
+    Band-Regeln eines Keywords werden je Parameter über einen IntervalIndex vorgefiltert.
+    """
+
+    def __init__(self, rules: list):
+        rules = [r if isinstance(r, Rule) else Rule(*r) for r in rules]
+        # Sortiert die Regeln von spezifisch (längstes Keyword) nach allgemein (stabil)
+        self.rules: tuple[Rule, ...] = tuple(
+            sorted(rules, key=lambda rule: len(max(rule.keywords, key=len)), reverse=True))
+
+        self._conditions = tuple(
+            rule.condition.matches if isinstance(rule.condition, BandCondition)
+            else (lambda features, condition=rule.condition: condition(*features))
+            for rule in self.rules)
+        self._targets = tuple(
+            rule.target.select if isinstance(rule.target, CaseTarget)
+            else (lambda features, action=rule.target: action(*features)) if callable(rule.target)
+            else (lambda features, static_target=rule.target: static_target)
+            for rule in self.rules)
+
+        # Je Keyword: Regeln ohne Band-Bedingung (linear geprüft) und Intervall-Indizes je Parameter
+        self._positions_by_keyword: dict[str, list[int]] = {}
+        self._indexes_by_keyword: dict[str, list[IntervalIndex]] = {}
+        self._all_positions_by_keyword: dict[str, list[int]] = {}
+        band_entries: dict[tuple[str, str], list] = {}
+        for position, rule in enumerate(self.rules):
+            primary = rule.condition.primary_band if isinstance(rule.condition, BandCondition) else None
+            for kw in rule.keywords:
+                self._all_positions_by_keyword.setdefault(kw, []).append(position)
+                self._positions_by_keyword.setdefault(kw, [])
+                if primary is None:
+                    self._positions_by_keyword[kw].append(position)
+                else:
+                    band_entries.setdefault((kw, primary.param), []).append(
+                        (position, primary, rule.condition, rule))
+
+        for (kw, param), entries in band_entries.items():
+            index = IntervalIndex(kw, param, entries)
+            self._indexes_by_keyword.setdefault(kw, []).append(index)
+            for overlap in index.overlaps:
+                logger.warning(f"Regel-Überlappung '{kw}'/{param}: {overlap} (erste Regel gewinnt).")
+            if index.gaps:
+                logger.info(f"Nicht abgedeckte Bereiche '{kw}'/{param}: {', '.join(index.gaps)}")
+
+        self.keyword_matcher = KeywordMatcher(self._positions_by_keyword)
+        # True, wenn alle Regeln deklarativ sind (nur Feature-Typ und Zahlenwerte, keine Lambdas auf ocr_res)
+        self.cacheable = all(isinstance(rule.condition, BandCondition)
+                             and (isinstance(rule.target, CaseTarget) or not callable(rule.target))
+                             for rule in self.rules)
+
+        logger.debug(f"Regelwerk kompiliert: {len(self.rules)} Regeln, "
+                     f"{len(self._positions_by_keyword)} Keywords, {len(band_entries)} Intervall-Indizes.")
+
+    def target_subdirs(self) -> list[str]:
+        """Alle statisch bekannten Zielordner (ohne Aktions-Lambdas), z.B. zum Vorwärmen des Index."""
+        subdirs = []
+        for rule in self.rules:
+            if isinstance(rule.target, CaseTarget):
+                subdirs.extend(case.target[0] for case in rule.target.cases)
+            elif not callable(rule.target):
+                subdirs.append(rule.target[0])
+        return list(dict.fromkeys(subdirs))
+
+    def candidate_positions(self, features: FeatureValues) -> list[int]:
+        """Positionen aller Regeln, deren Keyword im Feature-Typ vorkommt und deren Band passt (sortiert)."""
+        positions = set()
+        for kw, _ in self.keyword_matcher.match(features.ft_lower):
+            positions.update(self._positions_by_keyword[kw])
+            for index in self._indexes_by_keyword.get(kw, ()):
+                positions.update(index.lookup(getattr(features, index.param)))
+        return sorted(positions)
+
+    def keyword_positions(self, ft_lower: str) -> list[int]:
+        """Positionen aller Regeln, deren Keyword im Feature-Typ vorkommt, unabhängig von den Werten (sortiert)."""
+        positions = set()
+        for kw, _ in self.keyword_matcher.match(ft_lower):
+            positions.update(self._all_positions_by_keyword[kw])
+        return sorted(positions)
+
+    def iter_targets(self, features: FeatureValues, material_root_path: str):
+        """
+        Liefert (Keywords, (RELATIVER_UNTERORDNER, PRÄFIX)) aller passenden Regeln in Prüfreihenfolge,
+        ohne im Dateisystem zu suchen.
+        """
+        is_kulissen_2025_active = is_kulissen_root(material_root_path)
+        logger.debug(f"--- Beginn Regelprüfung für Feature-Typ: '{features.ft_lower}' "
+                     f"(Kulissen-Modus aktiv: {is_kulissen_2025_active}) ---")
+
+        for position in self.candidate_positions(features):
+            keywords_in_rule, _, _, kulissen_only = self.rules[position]
+            if kulissen_only and not is_kulissen_2025_active:
+                continue
+
+            if not self._conditions[position](features):
+                logger.debug(f"Bedingung für Keywords '{keywords_in_rule}' (Feature: '{features.ft_lower}') NICHT erfüllt.")
+                continue
+
+            target_tuple_for_action = self._targets[position](features)
+            if target_tuple_for_action is None:
+                logger.debug(f"Kein Fall der Regel '{keywords_in_rule}' trifft zu. Überspringe.")
+                continue  # Nächste Regel prüfen
+
+            try:
+                relative_subdir, desired_prefix_str = target_tuple_for_action
+            except (TypeError, ValueError) as e:
+                logger.error(
+                    f"Regel '{keywords_in_rule}' lieferte ungültiges 'target_tuple_for_action': {target_tuple_for_action}. Fehler: {e}")
+                continue  # Nächste Regel prüfen
+
+            logger.info(f"REGEL-MATCH: Keywords='{keywords_in_rule}'. Bedingung erfüllt. "
+                        f"Ziel-Unterordner: '{relative_subdir}', Gewünschter Präfix: '{desired_prefix_str}_'.")
+            yield keywords_in_rule, (relative_subdir, desired_prefix_str)
+
+    def resolve(self, features: FeatureValues, material_root_path: str, probed: list | None = None) -> str | None:
+        """
+        Wertet die Kandidaten-Regeln aus und liefert die erste existierende .prc-Datei.
+        probed sammelt die geprüften Zielordner (siehe PrcDirectoryIndex.find_prc).
+        """
+        for _, (relative_subdir, desired_prefix_str) in self.iter_targets(features, material_root_path):
+            selected_file_path = prc_index.directory_index.find_prc(
+                material_root_path, relative_subdir, desired_prefix_str, probed)
+            if selected_file_path:
+                return selected_file_path
+        return None
 
-    bohr_dia_str = ocr_all_results.get("Bohrdurchmesser")
-    bohr_dia_float = None
-    if bohr_dia_str:
+
+# --- Aktives Regelwerk mit Hot-Reload ---
+
+_compiled_rule_set: CompiledRuleSet | None = None
+_loaded_rules_mtime: int | None = None
+_reload_lock = threading.Lock()
+
+
+def get_rule_set() -> CompiledRuleSet:
+    """
+    Liefert das aktive Regelwerk. Ändert sich die mtime der Regeldatei, wird sie neu
+    kompiliert und die Referenz atomar ausgetauscht. Laufende Scans arbeiten mit ihrer
+    Referenz weiter; während ein anderer Thread kompiliert, wird das bisherige Regelwerk
+    geliefert statt zu warten. Eine fehlerhafte Datei wird geloggt und das bisherige
+    Regelwerk beibehalten.
+    """
+    global _compiled_rule_set, _loaded_rules_mtime
+    try:
+        mtime = os.stat(RULES_FILE_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    current = _compiled_rule_set
+    if current is not None and mtime == _loaded_rules_mtime:
+        return current
+    if not _reload_lock.acquire(blocking=current is None):
+        return current
+
+    try:
+        if _compiled_rule_set is not None and mtime == _loaded_rules_mtime:
+            return _compiled_rule_set
         try:
-            bohr_dia_float = float(str(bohr_dia_str).replace(",", "."))
-        except ValueError:
-            logger.warning(f"Konnte Bohrdurchmesser '{bohr_dia_str}' nicht in Float umwandeln.")
+            if mtime is None:
+                raise FileNotFoundError(f"Regeldatei nicht gefunden: {RULES_FILE_PATH}")
+            new_rule_set = CompiledRuleSet(load_rules_file(RULES_FILE_PATH))
+            logger.info(f"Regelwerk aus '{RULES_FILE_PATH}' geladen: {len(new_rule_set.rules)} Regeln.")
+        except (OSError, ValueError) as e:
+            logger.error(f"Regeldatei konnte nicht geladen werden: {e}. "
+                         f"{'Bisheriges Regelwerk bleibt aktiv.' if _compiled_rule_set else 'Keine Regeln aktiv.'}")
+            new_rule_set = _compiled_rule_set or CompiledRuleSet([])
+        _compiled_rule_set = new_rule_set
+        _loaded_rules_mtime = mtime
+        return new_rule_set
+    finally:
+        _reload_lock.release()
+
+
+# --- Ergebnis-Cache ---
+
+RESOLUTION_CACHE_SIZE = 512
+# Ein Treffer fragt die geprüften Zielordner höchstens so oft per stat ab (prc_index.get_listing mit
+# max_age_s); neue oder gelöschte .prc-Dateien werden spätestens nach dieser Zeit erkannt
+RESOLUTION_RECHECK_S = 5.0
+OCR_DECIMALS = 6  # Esprit zeigt die Werte mit 6 Nachkommastellen
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    maxsize: int
+
+
+def _listings_current(probed: tuple) -> bool:
+    """True, solange der Verzeichnis-Index für jeden geprüften Zielordner dasselbe DirListing liefert."""
+    return all(prc_index.directory_index.get_listing(dir_path, RESOLUTION_RECHECK_S) is listing
+               for dir_path, listing in probed)
+
+
+class PrcResolution(NamedTuple):
+    """Ergebnis von resolve_prc_path samt den Angaben, unter denen es gültig bleibt."""
+    path: str | None
+    material_root_path: str
+    rule_set: CompiledRuleSet
+    probed: tuple | None  # geprüfte Zielordner als (Ordner, DirListing); None = nicht wiederverwendbar
+
+    def is_current(self, material_root_path: str) -> bool:
+        """Gleicher Material-Root, gleiches Regelwerk und unveränderte Zielordner."""
+        return (self.probed is not None and material_root_path == self.material_root_path
+                and get_rule_set() is self.rule_set and _listings_current(self.probed))
+
+
+class ResolutionCache:
+    """
+    Begrenzter LRU-Cache für aufgelöste PRC-Pfade (auch "nichts gefunden").
+    Ein Eintrag merkt sich die geprüften Zielordner samt DirListing; liefert der
+    Verzeichnis-Index für einen davon ein anderes Listing, gilt der Eintrag als veraltet.
+    Die mtime eines Ordners wird dafür höchstens alle RESOLUTION_RECHECK_S Sekunden abgefragt.
+    """
+
+    def __init__(self, maxsize: int = RESOLUTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, tuple[str | None, tuple]] = OrderedDict()
+        self._rule_set: CompiledRuleSet | None = None
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    @staticmethod
+    def make_key(features: FeatureValues, material_root_path: str) -> tuple:
+        return (material_root_path, features.ft_lower,
+                *(None if v is None else round(v, OCR_DECIMALS) for v in features[2:]))
+
+    def get(self, key: tuple, rule_set: CompiledRuleSet) -> tuple[str | None, tuple] | None:
+        """(Pfad, geprüfte Zielordner) bei gültigem Treffer, sonst None."""
+        with self._lock:
+            if rule_set is not self._rule_set:
+                if self._entries:
+                    self.invalidations += 1
+                    logger.debug(f"Regelwerk geändert, PRC-Cache geleert ({len(self._entries)} Einträge).")
+                self._entries.clear()
+                self._rule_set = rule_set
+            entry = self._entries.get(key)
+        if entry is not None:
+            if _listings_current(entry[1]):
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self.hits += 1
+                return entry
+            with self._lock:
+                self._entries.pop(key, None)
+                self.invalidations += 1
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: tuple, rule_set: CompiledRuleSet, path: str | None, probed: list):
+        with self._lock:
+            if rule_set is not self._rule_set:
+                return  # Regelwerk wurde zwischenzeitlich neu geladen
+            self._entries[key] = (path, tuple(probed))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.invalidations,
+                             len(self._entries), self.maxsize)
+
+
+resolution_cache = ResolutionCache()
+
+
+def cache_info() -> CacheInfo:
+    """Zähler des PRC-Caches (Treffer, Fehlschläge, Verdrängungen, Invalidierungen)."""
+    return resolution_cache.info()
+
+
+# --- Regelbasierte Zuordnung für .prc-Dateien ---
+
+def find_prc_path_by_rules(feature_type_lower: str | None, ocr_all_results: dict,
+                           material_root_path: str | None) -> str | None:
+    resolution = resolve_prc_path(feature_type_lower, ocr_all_results, material_root_path)
+    return resolution.path if resolution is not None else None
 
+
+def resolve_prc_path(feature_type_lower: str | None, ocr_all_results: dict,
+                     material_root_path: str | None) -> PrcResolution | None:
+    """
+    Wie find_prc_path_by_rules, liefert aber die PrcResolution (Pfad oder None samt geprüften
+    Zielordnern); None bei unvollständigen Daten.
+    """
+    if not feature_type_lower or not ocr_all_results or not material_root_path:
+        logger.warning(
+            f"find_prc_path_by_rules mit unvollständigen Daten: ft='{feature_type_lower}', ocr_results='{ocr_all_results}', root='{material_root_path}'"
+        )
+        return None
+
+    features = FeatureValues.from_ocr(feature_type_lower.strip().lower(), ocr_all_results)
     logger.info(
-        f"Suche PRC: Feature='{feature_type_lower}', Ø='{d_float_str}' (num: {d_float}), "
-        f"Tiefe='{tiefe_str}' (num: {tiefe_float}), "
-        f"BBoxBreite='{bbox_breite_str}' (num: {bbox_breite_float}), BBoxLänge='{bbox_laenge_str}' (num: {bbox_laenge_float}), "
-        f"KlRadius='{kleinster_radius_str}' (num: {kleinster_radius_float}), Material-Root='{material_root_path}'"
+        f"Suche PRC: Feature='{feature_type_lower}', Ø='{ocr_all_results.get('Durchmesser')}' (num: {features.dia}), "
+        f"Tiefe='{ocr_all_results.get('Tiefe')}' (num: {features.tief}), "
+        f"BBoxBreite='{ocr_all_results.get('Begrenzungsbox Breite')}' (num: {features.bbox_b}), "
+        f"BBoxLänge='{ocr_all_results.get('Begrenzungsbox Länge')}' (num: {features.bbox_l}), "
+        f"KlRadius='{ocr_all_results.get('Kleinster Radius')}' (num: {features.kl_r}), Material-Root='{material_root_path}'"
     )
 
-    # --- Regeldefinitionen --------------------------------------------------------------------------
-
-    base_rules = [
-
-        # --- Planen (kombinierte Regel) ---
-        (["plan"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         tief is not None and 0.0 <= tief <= 62.0 and
-         bbox_b is not None and 0.0 < bbox_b <= 2000.0 and
-         bbox_l is not None and 0.0 < bbox_l <= 2000.0,
-         # Aktions-Lambda
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         (r"01_Plan-Aussen-Fase-Tasche", "06") if (
-                 0.0 <= bbox_l <= 50.0 and  # X
-                 0.0 <= bbox_b <= 60.0 and  # Y
-                 0.0 <= tief <= 40.0  # Z
-         ) else
-         (r"01_Plan-Aussen-Fase-Tasche", "04") if (
-                 50.01 <= bbox_l <= 160.0 and
-                 0.0 <= bbox_b <= 45.0 and
-                 0.0 <= tief <= 40.0
-         ) else
-         (r"01_Plan-Aussen-Fase-Tasche", "02") if (
-                 40.01 <= tief <= 52.0
-         ) else
-         (r"01_Plan-Aussen-Fase-Tasche", "03") if "plan 10" in ft_lower else  # Depo 16 - 10
-         (r"01_Plan-Aussen-Fase-Tasche", "07") if "plan 16" in ft_lower else  # Depo 16 - 16
-         (r"01_Plan-Aussen-Fase-Tasche", "01")  # Depo 16 - 20
-         ),
-
-        # --- Nuten --- mit Rückzug muss immer vor nuten stehen !
-        (["nuten rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 3.1 <= bbox_b <= 4.0,
-         (r"07_NUTEN\NUTEN mit Rückzug", "01")),
-        (["nuten rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 4.1 <= bbox_b <= 6.0,
-         (r"07_NUTEN\NUTEN mit Rückzug", "02")),
-        (["nuten rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 6.1 <= bbox_b <= 8.0,
-         (r"07_NUTEN\NUTEN mit Rückzug", "03")),
-        (["nuten rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 8.1 <= bbox_b <= 9.0,
-         (r"07_NUTEN\NUTEN mit Rückzug", "04")),
-        (["nuten rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 9.1 <= bbox_b <= 14.0,
-         (r"07_NUTEN\NUTEN mit Rückzug", "05")),
-        (["nuten rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 14.1 <= bbox_b <= 18.0,
-         (r"07_NUTEN\NUTEN mit Rückzug", "06")),
-        (["nuten rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 18.1 <= bbox_b <= 22.0,
-         (r"07_NUTEN\NUTEN mit Rückzug", "07")),
-
-        # --- Nuten ---
-        (["nuten"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 3.1 <= bbox_b <= 4.0,
-         (r"07_NUTEN", "01")),
-        (["nuten"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 4.1 <= bbox_b <= 6.0,
-         (r"07_NUTEN", "02")),
-        (["nuten"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 6.1 <= bbox_b <= 8.0,
-         (r"07_NUTEN", "03")),
-        (["nuten"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 8.1 <= bbox_b <= 9.0,
-         (r"07_NUTEN", "04")),
-        (["nuten"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 9.1 <= bbox_b <= 14.0,
-         (r"07_NUTEN", "05")),
-        (["nuten"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 14.1 <= bbox_b <= 18.0,
-         (r"07_NUTEN", "06")),
-        (["nuten"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r,
-                fase_dia, bohr_dia: bbox_b is not None and 18.1 <= bbox_b <= 22.0,
-         (r"07_NUTEN", "07")),
-
-        # --- Tasche Profit Offene Taschen mit Kleinster Radius erkennung---
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 18.0 and
-        kl_r is not None and 1.51 <= kl_r <= 2.0,
-         (r"02_Taschen\Profit", "01")),
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 21.0 and
-        kl_r is not None and 2.01 <= kl_r <= 2.5,
-         (r"02_Taschen\Profit", "02")),
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 21.0 and
-        kl_r is not None and 2.51 <= kl_r <= 3.0,
-         (r"02_Taschen\Profit", "03")),
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 20.0 and
-        kl_r is not None and 3.01 <= kl_r <= 4.0,
-         (r"02_Taschen\Profit", "04")),
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 25.0 and
-        kl_r is not None and 4.01 <= kl_r <= 5.0,
-         (r"02_Taschen\Profit", "05")),
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 40.0 and
-        kl_r is not None and 5.01 <= kl_r <= 6.0,
-         (r"02_Taschen\Profit", "07")),
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 35.0 and
-        kl_r is not None and 6.01 <= kl_r <= 8.0,
-         (r"02_Taschen\Profit", "08")),
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 40.0 and
-        kl_r is not None and 8.01 <= kl_r <= 10.0,
-         (r"02_Taschen\Profit", "10")),
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 40.0 and
-        kl_r is not None and kl_r > 10.0,
-         (r"02_Taschen\Profit", "11")),
-        (["tasche profit radius"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 40.01 <= tief <= 52.0 and
-        kl_r is not None and kl_r > 10.0,
-         (r"02_Taschen\Profit", "14")),
-
-        # --- Tasche Profit auswahl anhand Taschengröße und tiefe ---
-        (["tasche profit"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 25.0 and
-        bbox_l is not None and 10.0 <= bbox_l <= 2000.0 and
-        bbox_b is not None and 10.0 <= bbox_b <= 2000.0 and
-        kl_r is not None and 2.5 <= kl_r <= 4.98,
-         (r"02_Taschen\Profit", "06")),
-        (["tasche profit"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 40.0 and
-        bbox_l is not None and 30.01 <= bbox_l <= 2000.0 and
-        bbox_b is not None and 30.01 <= bbox_b <= 2000.0,
-         (r"02_Taschen\Profit", "11")),
-        (["tasche profit"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 40.01 <= tief <= 52.0 and
-        bbox_l is not None and 30.01 <= bbox_l <= 2000.0 and
-        bbox_b is not None and 30.01 <= bbox_b <= 2000.0,
-         (r"02_Taschen\Profit", "14")),
-        (["tasche profit"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 40.0 and
-        bbox_l is not None and 15.01 <= bbox_l <= 30.0 and
-        bbox_b is not None and 15.01 <= bbox_b <= 30.0,
-         (r"02_Taschen\Profit", "07")),
-        (["tasche profit"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 21.0 and
-        bbox_l is not None and 10.01 <= bbox_l <= 15.0 and
-        bbox_b is not None and 10.01 <= bbox_b <= 15.0,
-         (r"02_Taschen\Profit", "03")),
-        (["tasche profit"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        tief is not None and 0.0 <= tief <= 18.0 and
-        bbox_l is not None and 0.0 <= bbox_l <= 10.0 and
-        bbox_b is not None and 0.0 <= bbox_b <= 10.0,
-         (r"02_Taschen\Profit", "01")),
-
-        # Bohrungserkennung KULISSEN
-        (["bohrung tief km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         dia is not None and bohr_dia is not None,
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         (r"02_B-Seite 2312", "10") if dia == 12.0 and bohr_dia >= 18.0 else
-         (r"02_B-Seite 2312", "11") if dia == 14.0 and bohr_dia >= 20.0 else
-         (r"02_B-Seite 2312", "12") if dia == 17.5 and bohr_dia >= 27.0 else
-         (r"02_B-Seite 2312", "13") if dia == 22.0 and bohr_dia >= 33.0 else
-         None
-         ),
-
-
-
-        # --- Passung Fräsen ---
-        (["passung fräsen"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 1.52 <= dia <= 2.5,
-         (r"06_Passung Fräsen", "01")),
-        (["passung fräsen"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 2.51 <= dia <= 3.5,
-         (r"06_Passung Fräsen", "02")),
-        (["passung fräsen"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 3.51 <= dia <= 4.5,
-         (r"06_Passung Fräsen", "03")),
-        (["passung fräsen"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 4.51 <= dia <= 6.5,
-         (r"06_Passung Fräsen", "04")),
-        (["passung fräsen"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 6.51 <= dia <= 8.5,
-         (r"06_Passung Fräsen", "05")),
-        (["passung fräsen"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 8.51 <= dia <= 10.5,
-         (r"06_Passung Fräsen", "06")),
-        (["passung fräsen"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 10.51 <= dia <= 14.5,
-         (r"06_Passung Fräsen", "07")),
-        (["passung fräsen"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 14.51 <= dia <= 18.5,
-         (r"06_Passung Fräsen", "08")),
-        (["passung fräsen"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 12.51 <= dia <= 23.5,
-         (r"06_Passung Fräsen", "09")),
-        (["passung fräsen"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        dia is not None and 23.51 <= dia <= 31.0 and
-        tief is not None and 0.0 <= tief <= 40.0,
-         (r"06_Passung Fräsen", "10")),
-        (["passung fräsen"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        dia is not None and 31.01 <= dia <= 39.0 and
-        tief is not None and 0.0 <= tief <= 40.0,
-         (r"06_Passung Fräsen", "11")),
-        (["passung fräsen"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-        dia is not None and 31.01 <= dia <= 39.0 and
-        tief is not None and 40.01 <= tief <= 52.0,
-         (r"06_Passung Fräsen", "13")),
-
-        # --- Bohrung KM (mit Senkung) ---
-        (["bohrung km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 2.5 <= dia <= 3.7,
-         (r"05_DGB\nur Senkung", "01")),
-        (["bohrung km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 4.0 <= dia <= 5.0,
-         (r"05_DGB\nur Senkung", "02")),
-        (["bohrung km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 5.1 <= dia <= 6.2,
-         (r"05_DGB\nur Senkung", "03")),
-        (["bohrung km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 6.3 <= dia <= 8.7,
-         (r"05_DGB\nur Senkung", "04")),
-        (["bohrung km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 8.9 <= dia <= 10.0,
-         (r"05_DGB\nur Senkung", "05")),
-        (["bohrung km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 10.1 <= dia <= 10.8,
-         (r"05_DGB\nur Senkung", "06")),
-        (["bohrung km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 10.9 <= dia <= 12.0,
-         (r"05_DGB\nur Senkung", "07")),
-        (["bohrung km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 12.1 <= dia <= 14.0,
-         (r"05_DGB\nur Senkung", "08")),
-        (["bohrung km"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 16.1 <= dia <= 18.0,
-         (r"05_DGB\nur Senkung", "09")),
-
-        # --- Trennen D80x3 ---
-        (["trennen"], lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: True, (r"13_Trennen", "01")),
-
-        # --- Bohrung Allgemein mit Rückzug ---
-        (["bohrung rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 2.0 <= dia < 6.97,
-         (r"05_DGB\+DGB mit Rückzug", "01")),
-        (["bohrung rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 7.02 <= dia < 9.29,
-         (r"05_DGB\+DGB mit Rückzug", "01")),
-        (["bohrung rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 6.99 <= dia < 7.01,
-         (r"05_DGB\+DGB mit Rückzug", "03")),
-        (["bohrung rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 9.3 <= dia <= 17.5,
-         (r"05_DGB\+DGB mit Rückzug", "02")),
-        (["bohrung rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 17.99 <= dia < 18.01,
-         (r"05_DGB\+DGB mit Rückzug", "04")),
-        (["bohrung rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 19.99 <= dia < 20.01,
-         (r"05_DGB\+DGB mit Rückzug", "05")),
-        (["bohrung rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 21.99 <= dia < 22.01,
-         (r"05_DGB\+DGB mit Rückzug", "06")),
-        (["bohrung rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 25.99 <= dia < 26.01,
-         (r"05_DGB\+DGB mit Rückzug", "07")),
-
-        # --- Bohrung Allgemein ---
-        # Sonderbohrer 7,8
-        (["bohrung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 7.79 <= dia < 7.81,
-         (r"05_DGB", "08")),
-
-        (["bohrung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 2.0 <= dia < 6.97,
-         (r"05_DGB", "01")),
-        (["bohrung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 7.81 <= dia < 9.29,
-         (r"05_DGB", "01")),
-        (["bohrung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 6.99 <= dia < 7.01,
-         (r"05_DGB", "03")),
-
-
-        (["bohrung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 9.3 <= dia <= 17.5,
-         (r"05_DGB", "02")),
-        (["bohrung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 17.99 <= dia < 18.01,
-         (r"05_DGB", "04")),
-        (["bohrung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 19.99 <= dia < 20.01,
-         (r"05_DGB", "05")),
-        (["bohrung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 21.99 <= dia < 22.01,
-         (r"05_DGB", "06")),
-        (["bohrung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 25.99 <= dia < 26.01,
-         (r"05_DGB", "07")),
-
-        # --- Gewinde --- mit Rückzug muss immer vor gewinde stehen!
-        (["gewinde m rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 2.0 <= dia <= 7.0,
-         (r"03_Bohrungen\Bohrungen mit Rückzug", "03")),
-        (["gewinde m rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 7.01 < dia <= 12.5,
-         (r"03_Bohrungen\Bohrungen mit Rückzug", "04")),
-
-        # --- Gewinde ---
-        (["gewinde m", "gewinde"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 2.0 <= dia <= 7.0,
-         (r"03_Bohrungen", "03")),
-        (["gewinde m", "gewinde"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 7.01 < dia <= 12.5,
-         (r"03_Bohrungen", "04")),
-
-        # --- Reiben --- mit Rückzug muss immer vor reiben stehen!
-        (["reib ohne o rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 3.0 <= dia <= 8.05,
-         (r"03_Bohrungen\Bohrungen mit Rückzug", "05")),
-        (["reib ohne o rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 10.0 <= dia <= 12.05,
-         (r"03_Bohrungen\Bohrungen mit Rückzug", "06")),
-        (["reib mit o rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 3.0 <= dia <= 8.05,
-         (r"03_Bohrungen\Bohrungen mit Rückzug", "01")),
-        (["reib mit o rückzug"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 10.0 <= dia <= 12.05,
-         (r"03_Bohrungen\Bohrungen mit Rückzug", "02")),
-
-        # --- Reiben ---
-        (["reib ohne o"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 3.0 <= dia <= 8.05,
-         (r"03_Bohrungen", "05")),
-        (["reib ohne o"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 10.0 <= dia <= 12.05,
-         (r"03_Bohrungen", "06")),
-        (["reib mit o"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 3.0 <= dia <= 8.05,
-         (r"03_Bohrungen", "01")),
-        (["reib mit o"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia: dia is not None and 10.0 <= dia <= 12.05,
-         (r"03_Bohrungen", "02")),
-
-        # ========================================KULISSEN======================================================
-
-        # --- Kulisse A seite Planen ---
-        (["ak kulisse a"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         tief is not None and 0.0 <= tief <= 80.0,
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         (r"01_A-Seite 2312", "01")
-         ),
-
-        (["ak kulisse b"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         tief is not None and 0.0 <= tief <= 80.0,
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         (r"02_B-Seite 2312", "01") if 0.0 <= tief <= 30.0 else
-         (r"02_B-Seite 2312", "02")
-         ),
-
-        # ---Bohrungen D16 mit unterschiedlichen Fasen---
-        (["d16", "di6"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         dia == 16.0 and fase_dia is not None,
-
-         # 2. Aktions-Lambda (Der "Manager"):
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         (r"02_B-Seite 2312", "14") if fase_dia == 22.0 else
-         (r"01_A-Seite 2312", "02") if fase_dia == 18.0 else
-         None
-         ),
-
-        # NP Spannnippel
-        (["np"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         dia is not None and dia == 6.8,
-         (r"01_A-Seite 2312", "03")
-         ),
-
-        # Wurm
-        (["wand wurm"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         kl_r is not None,
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         (r"02_B-Seite 2312", "07") if kl_r <= 12.0 else
-         (r"02_B-Seite 2312", "08")
-         ),
-
-        (["wurm"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         kl_r is not None,
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         (r"02_B-Seite 2312", "03") if kl_r <= 15.0 else
-         (r"02_B-Seite 2312", "04") if kl_r <= 24.0 else
-         (r"02_B-Seite 2312", "05") if kl_r <= 34.0 else
-         (r"02_B-Seite 2312", "06")
-         ),
-
-        # Gewinde M12
-        (["m12"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         dia is not None and 7.01 < dia <= 12.5,
-         (r"02_B-Seite 2312", "09")),
-
-        # Bohrung Passung
-        (["bohrung passung"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         dia is not None,
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         (r"02_B-Seite 2312", "15") if dia == 9.9 else
-         (r"02_B-Seite 2312", "16") if dia == 11.9 else
-         (r"02_B-Seite 2312", "17") if dia == 15.9 else
-         (r"02_B-Seite 2312", "18") if dia == 19.9 else
-         None
-         ),
-
-        # --- NEUE REGEL: Tasche D24 ---
-        (["tasche d24"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         True,
-         (r"02_B-Seite 2312", "19")),
-
-        (["m10x1"],
-         lambda ft_lower, ocr_res, dia, bbox_b, tief, bbox_l, kl_r, fase_dia, bohr_dia:
-         is_kulissen_2025_active and
-         dia is not None and dia == 9.0,
-         (r"02_B-Seite 2312", "20")),
-
-
-
-
-    ]
-    #====================================================ENDE===============================================
-
-    keywords_requiring_exact_search_logic = {"reib mit o", "reib ohne o"}  # ggf. anpassen
-
-    logger.debug(f"--- Beginn Regelprüfung für Feature-Typ: '{feature_type_lower}' ---")
-
-    # ---> NEU: Sortiert die Regeln von spezifisch (längstes Keyword) nach allgemein <---
-    sorted_rules = sorted(base_rules, key=lambda rule: len(max(rule[0], key=len)), reverse=True)
-
-    # Umbenennung des dritten Elements für Klarheit im Loop
-    for keywords_in_rule, condition_func, action_provider_or_static_tuple in sorted_rules:
-
-        keyword_match_successful = False
-        # --- Keyword-Matching (Ihre bestehende Logik, ggf. leicht angepasst) ---
-        apply_exact_search_for_this_rule = any(
-            kw_from_rule in keywords_requiring_exact_search_logic for kw_from_rule in keywords_in_rule)
-
-        if apply_exact_search_for_this_rule:
-            for kw in keywords_in_rule:
-                # Exakte Suche verwendet Wortgrenzen
-                if re.search(r'\b' + re.escape(kw) + r'\b', feature_type_lower, re.IGNORECASE):
-                    keyword_match_successful = True
-                    logger.debug(
-                        f"EXAKTE SUCHE (Regel '{keywords_in_rule}'): Keyword '{kw}' in '{feature_type_lower}' gefunden.")
-                    break
-            if not keyword_match_successful and keywords_in_rule:  # Fallback, falls \b nicht passt
-                for kw in keywords_in_rule:
-                    if kw in feature_type_lower:  # Standard 'in' prüft Substring
-                        keyword_match_successful = True
-                        logger.debug(
-                            f"EXAKTE SUCHE FALLBACK (Regel '{keywords_in_rule}'): Keyword '{kw}' in '{feature_type_lower}' gefunden.")
-                        break
-                if not keyword_match_successful and keywords_in_rule:
-                    logger.debug(
-                        f"EXAKTE SUCHE (Regel '{keywords_in_rule}'): Keines der Keywords passte exakt in '{feature_type_lower}'.")
-        else:  # Standard Substring Suche
-            for kw in keywords_in_rule:
-                if kw in feature_type_lower:
-                    keyword_match_successful = True
-                    logger.debug(
-                        f"STANDARD SUCHE (Regel '{keywords_in_rule}'): Keyword '{kw}' in '{feature_type_lower}' gefunden.")
-                    break
-            if not keyword_match_successful and keywords_in_rule:  # Nur loggen wenn Keywords da waren, aber nicht gematcht haben
-                logger.debug(
-                    f"STANDARD SUCHE (Regel '{keywords_in_rule}'): Keines der Keywords als Substring in '{feature_type_lower}' gefunden.")
-        # --- Ende Keyword-Matching ---
-
-        if keyword_match_successful:
-            # --- Bedingungsprüfung ---
-            # Argumente entsprechend der neuen Signatur übergeben
-            if condition_func(feature_type_lower, ocr_all_results, d_float, bbox_breite_float, tiefe_float,
-                              bbox_laenge_float, kleinster_radius_float, fasen_dia_float, bohr_dia_float):
-
-                target_tuple_for_action = None
-                # Prüfen, ob action_provider_or_static_tuple eine Funktion (Aktions-Lambda) ist
-                if callable(action_provider_or_static_tuple):
-                    # Ja, also aufrufen, um das (subdir, prefix)-Tupel zu bekommen
-                    # Argumente entsprechend der neuen Signatur übergeben
-                    target_tuple_for_action = action_provider_or_static_tuple(
-                        feature_type_lower, ocr_all_results, d_float,
-                        bbox_breite_float, tiefe_float, bbox_laenge_float, kleinster_radius_float, fasen_dia_float,
-                        bohr_dia_float
-                    )
-                    if target_tuple_for_action is None:
-                        logger.debug(f"Aktions-Lambda für Regel '{keywords_in_rule}' gab None zurück. Überspringe.")
-                        continue  # Nächste Regel prüfen
-                else:
-                    # Nein, es ist ein statisches Tupel
-                    target_tuple_for_action = action_provider_or_static_tuple
-
-                # Versuche nun, das Ergebnis zu entpacken
-                try:
-                    relative_subdir, desired_prefix_str = target_tuple_for_action
-                except (TypeError, ValueError) as e:
-                    logger.error(
-                        f"Regel '{keywords_in_rule}' (Keywords: {keywords_in_rule}) lieferte ungültiges 'target_tuple_for_action': {target_tuple_for_action}. Fehler: {e}")
-                    continue  # Nächste Regel prüfen
-
-                logger.info(f"REGEL-MATCH: Keywords='{keywords_in_rule}'. Bedingung erfüllt. "
-                            f"Ziel-Unterordner: '{relative_subdir}', Gewünschter Präfix: '{desired_prefix_str}_'.")
-
-                actual_search_dir = os.path.normpath(os.path.join(material_root_path, relative_subdir))
-
-                if not os.path.isdir(actual_search_dir):
-                    logger.warning(
-                        f"Zielverzeichnis '{actual_search_dir}' für Regel '{keywords_in_rule}' (basierend auf '{relative_subdir}') nicht gefunden.")
-                    continue
-
-                found_matching_files = []
-                prefix_to_search = desired_prefix_str + "_"
-
-                logger.debug(
-                    f"Suche in '{actual_search_dir}' nach Dateien, die mit '{prefix_to_search}' beginnen und auf '.prc' enden.")
-
-                try:
-                    dir_listing = sorted(os.listdir(actual_search_dir))
-                except OSError as e:
-                    logger.error(f"Fehler beim Lesen des Verzeichnisses '{actual_search_dir}': {e}")
-                    continue
-
-                for item_in_dir in dir_listing:
-                    if item_in_dir.startswith(prefix_to_search) and item_in_dir.lower().endswith(".prc"):
-                        full_path = os.path.join(actual_search_dir, item_in_dir)
-                        if os.path.isfile(full_path):
-                            found_matching_files.append(full_path)
-                            logger.info(f"Datei-Match aufgrund Präfix '{prefix_to_search}': '{full_path}'")
-
-                if found_matching_files:
-                    selected_file_path = found_matching_files[0]
-                    logger.info(
-                        f"FINALE AUSWAHL (erste Datei mit Präfix '{prefix_to_search}'): '{selected_file_path}'.")
-                    return selected_file_path
-                else:
-                    logger.info(
-                        f"Keine .prc-Datei mit Präfix '{prefix_to_search}' im Verzeichnis '{actual_search_dir}' gefunden.")
-
-            else:  # condition_func nicht erfüllt
-                log_values = (
-                    f"Ø(dia):{d_float}, BBoxB(bbox_b):{bbox_breite_float}, Tiefe(tief):{tiefe_float}, "
-                    f"BBoxL(bbox_l):{bbox_laenge_float}, KlRad(kl_r):{kleinster_radius_float}"
-                )
-                logger.debug(
-                    f"Bedingung für Keywords '{keywords_in_rule}' (Feature: '{feature_type_lower}') NICHT erfüllt. OCR-Werte: {log_values}")
-
-    logger.warning(
-        f"Keine passende Regel mit existierender Datei (basierend auf Präfix-Suche) für Feature='{feature_type_lower}', OCR-Daten='{ocr_all_results}' in '{material_root_path}' gefunden.")
-    return None
\ No newline at end of file
+    rule_set = get_rule_set()
+    probed = None
+    if rule_set.cacheable:
+        key = resolution_cache.make_key(features, material_root_path)
+        entry = resolution_cache.get(key, rule_set)
+        if entry is not None:
+            selected_file_path, probed = entry
+            logger.info(f"PRC aus Cache: '{selected_file_path}' ({resolution_cache.info()}).")
+        else:
+            probed = []
+            selected_file_path = rule_set.resolve(features, material_root_path, probed)
+            resolution_cache.put(key, rule_set, selected_file_path, probed)
+            probed = tuple(probed)
+    else:
+        selected_file_path = rule_set.resolve(features, material_root_path)
+    if not selected_file_path:
+        logger.warning(
+            f"Keine passende Regel mit existierender Datei (basierend auf Präfix-Suche) für Feature='{feature_type_lower}', OCR-Daten='{ocr_all_results}' in '{material_root_path}' gefunden.")
+    return PrcResolution(selected_file_path, material_root_path, rule_set, probed)
+
+
+# --- Batch-Auswertung (ganze Feature-Listen) ---
+
+FEATURE_TABLE_DTYPE = np.dtype([("ft", object)] + [(param, np.float64) for param in NUMERIC_PARAMS])
+BATCH_RESULT_DTYPE = np.dtype([("subdir", object), ("prefix", object), ("path", object)])
+
+
+def feature_table(rows: list[dict]) -> np.ndarray:
+    """
+    Baut aus Zeilen-Dicts ein strukturiertes Array (FEATURE_TABLE_DTYPE). Spalten dürfen wie
+    die Parameter (ft, dia, bbox_b, ...) oder wie die OCR-Felder ("Feature-Typ", "Durchmesser", ...)
+    heißen; leere oder nicht lesbare Werte werden NaN.
+    """
+    table = np.empty(len(rows), dtype=FEATURE_TABLE_DTYPE)
+    for i, row in enumerate(rows):
+        ft = row.get("ft", row.get("Feature-Typ"))
+        values = []
+        for param in NUMERIC_PARAMS:
+            value = _parse_float(row.get(param, row.get(OCR_KEYS[param])), param)
+            values.append(np.nan if value is None else value)
+        table[i] = (str(ft or "").strip().lower(), *values)
+    return table
+
+
+def load_feature_table(path: str) -> np.ndarray:
+    """Liest eine Feature-Liste aus einer CSV- (Trennzeichen ; , oder Tab) oder JSONL-Datei."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+            except csv.Error:
+                dialect = csv.excel
+            rows = list(csv.DictReader(f, dialect=dialect))
+    logger.info(f"Feature-Liste '{path}' gelesen: {len(rows)} Zeilen.")
+    return feature_table(rows)
+
+
+def resolve_batch(table: np.ndarray, material_root_path: str) -> np.ndarray:
+    """
+    Löst eine ganze Feature-Tabelle (siehe feature_table/load_feature_table) auf.
+    Liefert ein strukturiertes Array (subdir, prefix, path) je Zeile; None, wo keine Datei passt.
+
+    Die Regeln werden in derselben Reihenfolge wie in CompiledRuleSet.resolve() geprüft, aber je
+    Regel einmal für alle noch offenen Zeilen, deren Feature-Typ eines ihrer Keywords enthält:
+    Bänder als NumPy-Masken über die ganze Spalte, Keyword-Treffer einmal je Feature-Typ.
+    """
+    rule_set = get_rule_set()
+    table = np.asarray(table)
+    n = len(table)
+    result = np.empty(n, dtype=BATCH_RESULT_DTYPE)
+    result.fill((None, None, None))
+    if n == 0:
+        return result
+
+    is_kulissen_2025_active = is_kulissen_root(material_root_path)
+    columns = {param: np.asarray(table[param], dtype=np.float64) for param in NUMERIC_PARAMS}
+    feature_types = np.array([str(ft or "").strip().lower() for ft in table["ft"]], dtype=object)
+    unique_types, type_of_row = np.unique(feature_types, return_inverse=True)
+
+    # Regel-Position -> Feature-Typen (Indizes in unique_types), in denen eines ihrer Keywords vorkommt
+    types_by_position: dict[int, list[int]] = {}
+    for type_index, ft_lower in enumerate(unique_types):
+        if ft_lower:
+            for position in rule_set.keyword_positions(ft_lower):
+                types_by_position.setdefault(position, []).append(type_index)
+
+    found_paths: dict[tuple[str, str], str | None] = {}
+    open_rows = np.ones(n, dtype=bool)
+
+    def rows_of_types(type_indexes) -> np.ndarray:
+        selected = np.zeros(len(unique_types), dtype=bool)
+        selected[type_indexes] = True
+        return selected[type_of_row]
+
+    def assign(rows: np.ndarray, target) -> None:
+        try:
+            relative_subdir, prefix = target
+        except (TypeError, ValueError) as e:
+            logger.error(f"Ungültiges Ziel {target!r} in der Batch-Auswertung: {e}")
+            return
+        key = (relative_subdir, prefix)
+        if key not in found_paths:
+            found_paths[key] = prc_index.directory_index.find_prc(material_root_path, relative_subdir, prefix)
+        if found_paths[key]:
+            result[rows] = (relative_subdir, prefix, found_paths[key])
+            open_rows[rows] = False
+
+    for position in sorted(types_by_position):
+        rule = rule_set.rules[position]
+        if rule.kulissen_only and not is_kulissen_2025_active:
+            continue
+        candidates = open_rows & rows_of_types(types_by_position[position])
+        if not candidates.any():
+            continue
+
+        if isinstance(rule.condition, BandCondition) and isinstance(rule.target, CaseTarget):
+            matching = candidates & rule.condition.mask(columns, n)
+            for case in rule.target.cases:  # erster passender Fall gewinnt
+                case_rows = matching & case.condition.mask(columns, n)
+                if case.feature_contains is not None:
+                    case_rows &= rows_of_types(
+                        [i for i, ft_lower in enumerate(unique_types) if case.feature_contains in ft_lower])
+                if case_rows.any():
+                    matching &= ~case_rows
+                    assign(case_rows, case.target)
+        elif isinstance(rule.condition, BandCondition) and not callable(rule.target):
+            matching = candidates & rule.condition.mask(columns, n)
+            if matching.any():
+                assign(matching, rule.target)
+        else:
+            # Lambda-Regeln: zeilenweise (ocr_res ist hier leer)
+            for row in np.flatnonzero(candidates):
+                features = FeatureValues(feature_types[row], {}, *(
+                    None if np.isnan(columns[param][row]) else float(columns[param][row]) for param in NUMERIC_PARAMS))
+                if rule_set._conditions[position](features):
+                    target = rule_set._targets[position](features)
+                    if target is not None:
+                        assign(np.array([row]), target)
+
+        if not open_rows.any():
+            break
+
+    logger.info(f"Batch-Auswertung: {n - int(open_rows.sum())}/{n} Features in '{material_root_path}' aufgelöst "
+                f"({len(unique_types)} Feature-Typen).")
+    return result
@@ -0,0 +1,104 @@
+# tests/test_calibration.py
+"""Kalibrierung des Bildschirmbereichs im Hintergrund, während gescannt wird (Wiedergabe statt Bildschirm)."""
+
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+import ocr_recognition
+
+ANCHOR = (80, 130)  # linke obere Ecke des Ankers auf dem "Bildschirm"
+SCALE = 1.25
+
+
+@pytest.fixture
+def screen(tmp_path, monkeypatch):
+    """Bildschirm mit dem Anker in Skalierung SCALE; Bereich und Skalierung anfangs falsch."""
+    rng = np.random.default_rng(7)
+    template = rng.integers(0, 256, (ocr_recognition.ANCHOR_SIZE[1], ocr_recognition.ANCHOR_SIZE[0]), dtype=np.uint8)
+    cv2.imwrite(str(tmp_path / "anker.png"), template)
+    scaled = ocr_recognition.scale_anchor_template(template)[SCALE]
+    image = np.full((1300, 700), 230, dtype=np.uint8)
+    image[ANCHOR[1]:ANCHOR[1] + scaled.shape[0], ANCHOR[0]:ANCHOR[0] + scaled.shape[1]] = scaled
+    cv2.imwrite(str(tmp_path / "bildschirm.png"), image)
+
+    monkeypatch.setattr(ocr_recognition, "ANCHOR_TEMPLATE_PATH", str(tmp_path / "anker.png"))
+    monkeypatch.setattr(ocr_recognition, "REGION_CALIBRATION_ENABLED", True)
+    monkeypatch.setattr(ocr_recognition, "REGION_CALIBRATION_RETRY_S", 0.0)
+    monkeypatch.setattr(ocr_recognition, "_anchor_templates", None)
+    monkeypatch.setattr(ocr_recognition, "_anchor_scale", 1.0)
+    monkeypatch.setattr(ocr_recognition, "_calibration_failures", 0)
+    monkeypatch.setattr(ocr_recognition, "_last_failed_calibration", 0.0)
+    monkeypatch.setattr(ocr_recognition, "_paused_template_mtime", None)
+    monkeypatch.setattr(ocr_recognition, "_calibration_thread", None)
+    monkeypatch.setattr(ocr_recognition, "_capture_backend",
+                        ocr_recognition.ReplayCaptureBackend(str(tmp_path / "bildschirm.png")))
+    pipeline = ocr_recognition.PreprocessPipeline((0, 0, 357, 886))
+    monkeypatch.setattr(ocr_recognition, "_preprocess_pipeline", pipeline)
+    calibration_path = str(tmp_path / "bereich.json")
+    monkeypatch.setattr(ocr_recognition, "_calibrate_in_background",
+                        lambda p: ocr_recognition.calibrate_region(pipeline=p, path=calibration_path))
+    expected = ocr_recognition.region_from_anchor(*ANCHOR, SCALE, (0, 0, image.shape[1], image.shape[0]))
+    return pipeline, expected
+
+
+def test_calibration_and_scans_run_concurrently(screen):
+    pipeline, expected = screen
+    seen, errors = [], []
+
+    def scan():
+        try:
+            for _ in range(20):
+                with pipeline.lock:
+                    img = ocr_recognition.capture_panel()
+                    seen.append((pipeline.region, ocr_recognition.anchor_in_region(img)))
+        except Exception as e:  # pragma: no cover - Fehler im Thread an den Test melden
+            errors.append(e)
+
+    def calibrate():
+        try:
+            for _ in range(3):
+                ocr_recognition.calibrate_region(pipeline=pipeline, path=None)
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=scan) for _ in range(4)] + [threading.Thread(target=calibrate) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if ocr_recognition._calibration_thread is not None:
+        ocr_recognition._calibration_thread.join()
+
+    assert errors == []
+    assert pipeline.region == expected
+    with ocr_recognition._anchor_lock:
+        assert ocr_recognition._anchor_scale == SCALE
+        assert ocr_recognition._calibration_failures == 0
+    # Bereich und Skalierung wechseln zusammen: im neuen Bereich liegt der Anker immer an seiner Stelle
+    assert all(found for region, found in seen if region == expected)
+    assert not any(found for region, found in seen if region != expected)
+
+
+def test_concurrent_failed_calibrations_are_all_counted(screen, tmp_path, monkeypatch):
+    pipeline, _ = screen
+    monkeypatch.setattr(ocr_recognition, "REGION_CALIBRATION_MAX_FAILURES", 1000)
+    cv2.imwrite(str(tmp_path / "leer.png"), np.full((300, 400), 230, dtype=np.uint8))
+    monkeypatch.setattr(ocr_recognition, "_capture_backend",
+                        ocr_recognition.ReplayCaptureBackend(str(tmp_path / "leer.png")))
+
+    def calibrate():
+        for _ in range(3):
+            assert ocr_recognition.calibrate_region(pipeline=pipeline, path=None) is None
+
+    threads = [threading.Thread(target=calibrate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with ocr_recognition._anchor_lock:
+        assert ocr_recognition._calibration_failures == 24
+        assert ocr_recognition._last_failed_calibration > 0
+    assert pipeline.region == (0, 0, 357, 886)
@@ -0,0 +1,73 @@
+# tests/test_capture.py
+"""Capture-Backends ohne Bildschirm: mss über ein nachgebildetes Modul."""
+
+import threading
+import types
+
+import numpy as np
+import pytest
+
+import ocr_recognition
+
+
+class FakeShot:
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.raw = bytearray(width * height * 4)
+
+
+class FakeMss:
+    """Zählt offene Handles; eine Aufnahme darf nur laufen, wenn keine andere läuft."""
+    opened = []
+
+    def __init__(self):
+        self.closed = False
+        self.busy = threading.Lock()
+        self.monitors = [{"left": 0, "top": 0, "width": 1920, "height": 1080}]
+        FakeMss.opened.append(self)
+
+    def grab(self, monitor):
+        assert not self.closed
+        assert self.busy.acquire(blocking=False), "gleichzeitige Aufnahmen auf einem Handle"
+        try:
+            return FakeShot(monitor["width"], monitor["height"])
+        finally:
+            self.busy.release()
+
+    def close(self):
+        self.closed = True
+
+
+def _open_handles():
+    return sum(not handle.closed for handle in FakeMss.opened)
+
+
+@pytest.fixture
+def fake_mss(monkeypatch):
+    FakeMss.opened = []
+    monkeypatch.setattr(ocr_recognition, "mss", types.SimpleNamespace(mss=FakeMss))
+    return FakeMss
+
+
+def test_scan_threads_share_one_mss_handle(fake_mss):
+    backend = ocr_recognition.MssBackend()
+    bbox = (10, 20, 110, 70)
+
+    def scan():  # wie im Programm: jeder Scan in einem eigenen, danach beendeten Thread
+        for _ in range(5):
+            assert backend.grab_gray(bbox).shape == (50, 100)
+
+    threads = [threading.Thread(target=scan) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    calibration = threading.Thread(target=backend.screen_bounds)
+    calibration.start()
+    calibration.join()
+
+    assert _open_handles() == 1
+    backend.close()
+    assert _open_handles() == 0
+    assert backend.grab(bbox).shape == (50, 100, 3)  # nach close neu angelegt
+    assert _open_handles() == 1
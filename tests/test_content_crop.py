@@ -0,0 +1,40 @@
+# tests/test_content_crop.py
+"""Zuschnitt auf den Inhalt (content_bounds) an synthetischen Fenstern."""
+
+import numpy as np
+
+import ocr_recognition
+
+
+def _text_row(img, top, height=10, left=20, letters=12):
+    """Zeile aus kurzen dunklen Strichen (wie Buchstaben), je Zeile etwas anders verteilt."""
+    for i in range(letters):
+        x = left + i * 8 + (top // 10 + i) % 3
+        img[top:top + height, x:x + 3] = 0
+
+
+def _panel():
+    img = np.full((420, 200), 255, dtype=np.uint8)
+    img[:, 2] = 0                             # Rahmen links, über die ganze Höhe
+    for top in (10, 30, 50):                  # kleiner Block: z.B. Überschrift und erste Zeilen
+        _text_row(img, top)
+    for top in range(100, 300, 20):           # großer Block: die Tabelle
+        _text_row(img, top)
+    img[380:395, 10:190] = 0                  # Bildlaufleiste: ein Balken ...
+    img[383:392, 100:120] = 255               # ... mit Schieber
+    return img
+
+
+def test_content_bounds_keeps_all_text_blocks():
+    top, bottom, left, right = ocr_recognition.content_bounds(_panel())
+    assert top <= 10 and bottom >= 290       # beide Blöcke mit Schrift
+    assert bottom < 380                       # Bildlaufleiste ohne Schrift fällt weg
+    assert left == 0 and right >= 20 + 11 * 8 + 5
+
+
+def test_content_bounds_without_text_keeps_largest_block():
+    img = np.full((300, 200), 255, dtype=np.uint8)
+    img[20:30, 10:190] = 0
+    img[100:160, 10:190] = 0
+    top, bottom, _, _ = ocr_recognition.content_bounds(img)
+    assert (top, bottom) == (100 - ocr_recognition._CONTENT_MARGIN, 160 + ocr_recognition._CONTENT_MARGIN)
@@ -0,0 +1,68 @@
+# tests/test_line_strips.py
+"""Zeilenstreifen des Volltext-Durchlaufs: Linien-Erkennung und Zeilen-Cache (ohne Tesseract)."""
+
+import numpy as np
+import pytest
+
+import ocr_recognition
+from benchmarks.fixtures import load_panel_image
+
+
+class CountingBackend(ocr_recognition.OcrBackend):
+    """Merkt sich die erkannten Bilder und liefert je Bild ein Wort."""
+    name = "zaehler"
+
+    def __init__(self):
+        self.images = []
+
+    def image_to_data(self, img, psm, whitelist=None):
+        self.images.append(img.copy())
+        return [ocr_recognition.OcrWord(f"wort{len(self.images)}", 95.0, (10, 10, 20, 20), 0)]
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = CountingBackend()
+    monkeypatch.setattr(ocr_recognition, "_ocr_backend", backend)
+    monkeypatch.setattr(ocr_recognition, "line_strip_cache", ocr_recognition.RowTextCache(256))
+    return backend
+
+
+def test_vertical_line_columns_ignore_aligned_label_strokes():
+    ink = np.zeros((300, 60), dtype=bool)
+    ink[:, 5] = True                  # durchgehender Rahmen
+    ink[::2, 15] = True               # gepunktete Baumlinie
+    for top in range(10, 290, 30):    # linke Striche untereinander stehender Labels, je Zeile unterbrochen
+        ink[top:top + 20, 40] = True
+    columns = ocr_recognition._vertical_line_columns(ink)
+    assert columns[5] and columns[15]
+    assert not columns[40]
+    assert ink[:, 40].mean() >= ocr_recognition._STRUCTURE_COLUMN_MIN_INK  # früher als Linie entfernt
+
+
+def test_only_changed_row_is_recognized_again(backend):
+    img = load_panel_image()
+    strips = ocr_recognition.split_text_lines(img)
+    assert len(strips) > 10
+
+    first = ocr_recognition.ocr_line_strips(img, 0)
+    assert len(backend.images) == len(strips)
+    backend.images.clear()
+    assert ocr_recognition.ocr_line_strips(img, 0) == first
+    assert backend.images == []
+
+    # ein Pixel mitten in einer Textzeile ändern
+    index = len(strips) // 2
+    changed = img.copy()
+    row = strips[index].top + ocr_recognition._CELL_PADDING + ocr_recognition._LINE_MARGIN
+    text_columns = np.flatnonzero(~ocr_recognition._vertical_line_columns(img < 128))
+    column = int(text_columns[len(text_columns) // 2])
+    changed[row, column] = 255 - changed[row, column]
+
+    words = ocr_recognition.ocr_line_strips(changed, 0)
+    new_strips = ocr_recognition.split_text_lines(changed)
+    assert [strip.top for strip in new_strips] == [strip.top for strip in strips]
+    assert len(backend.images) == 1
+    assert np.array_equal(backend.images[0], new_strips[index].image)
+    assert [word.line for word in words] == [word.line for word in first]
+    assert [word.text for word in words if word.line != index] == [word.text for word in first if word.line != index]
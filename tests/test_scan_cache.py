@@ -0,0 +1,95 @@
+# tests/test_scan_cache.py
+"""Scan-Cache: Ergebnis und Zuordnung (PRC-Pfad) unveränderter Fenster ohne OCR und Regelsuche."""
+
+import os
+
+import numpy as np
+import pytest
+
+import ocr_recognition
+import prc_index
+import rule_engine
+from benchmarks.fixtures import MATERIAL_TREE_LAYOUT, build_material_tree, load_ocr_corpus
+
+
+class FakeResolution:
+    def __init__(self, path):
+        self.path = path
+        self.current = True
+
+    def is_current(self, material_root_path):
+        return self.current
+
+
+@pytest.fixture
+def scanner(monkeypatch):
+    """Fenster-Bild zum Austauschen, gezählte Erkennungen und Zuordnungen."""
+    state = {"image": np.full((40, 60), 255, dtype=np.uint8), "recognized": 0, "resolved": []}
+
+    def recognize(gray_img, debug_scan):
+        state["recognized"] += 1
+        return {"Feature-Typ": "Bohrung"}, "Feature-Typ Bohrung"
+
+    def resolve(results, material_root_path):
+        resolution = FakeResolution(os.path.join(material_root_path, f"{len(state['resolved']):02d}_Bohren.prc"))
+        state["resolved"].append(resolution)
+        return resolution
+
+    monkeypatch.setattr(ocr_recognition, "SCAN_CACHE_ENABLED", True)
+    monkeypatch.setattr(ocr_recognition, "scan_cache", ocr_recognition.ScanCache(maxsize=4, tolerance=0))
+    monkeypatch.setattr(ocr_recognition, "capture_panel", lambda: state["image"])
+    monkeypatch.setattr(ocr_recognition, "_recognize_panel", recognize)
+    state["scan"] = lambda root: ocr_recognition.scan_and_resolve(root, resolve)
+    return state
+
+
+def test_unchanged_panel_reuses_results_and_path(scanner):
+    results, _, first = scanner["scan"]("root_a")
+    assert scanner["recognized"] == 1 and len(scanner["resolved"]) == 1
+
+    again, _, second = scanner["scan"]("root_a")
+    assert again == results
+    assert second is first
+    assert scanner["recognized"] == 1 and len(scanner["resolved"]) == 1
+
+
+def test_path_is_resolved_again_per_root_and_when_stale(scanner):
+    _, _, first = scanner["scan"]("root_a")
+    _, _, other_root = scanner["scan"]("root_b")
+    assert other_root is not first
+    assert scanner["recognized"] == 1 and len(scanner["resolved"]) == 2
+
+    first.current = False  # z.B. Regelwerk neu geladen oder Zielordner geändert
+    _, _, refreshed = scanner["scan"]("root_a")
+    assert refreshed is not first and len(scanner["resolved"]) == 3
+    assert scanner["scan"]("root_a")[2] is refreshed
+
+    scanner["image"] = scanner["image"].copy()
+    scanner["image"][0, 0] = 0  # anderes Fenster: neue Erkennung und Zuordnung
+    scanner["scan"]("root_a")
+    assert scanner["recognized"] == 2 and len(scanner["resolved"]) == 4
+
+
+def test_prc_resolution_tracks_probed_folders(tmp_path, monkeypatch):
+    monkeypatch.setattr(rule_engine, "RESOLUTION_RECHECK_S", 0.0)
+    monkeypatch.setattr(rule_engine, "resolution_cache", rule_engine.ResolutionCache())
+    root = build_material_tree(str(tmp_path), "+1.2379", MATERIAL_TREE_LAYOUT)
+    prc_index.directory_index.index_root(root)
+
+    for ocr_results in load_ocr_corpus():
+        resolution = rule_engine.resolve_prc_path(ocr_results["Feature-Typ"].lower(), ocr_results, root)
+        if resolution is not None and resolution.path:
+            break
+    else:
+        pytest.fail("Kein Korpus-Eintrag mit passender Datei.")
+    assert resolution.is_current(root)
+    assert not resolution.is_current(str(tmp_path / "anderer_root"))
+
+    cached = rule_engine.resolve_prc_path(ocr_results["Feature-Typ"].lower(), ocr_results, root)
+    assert cached.path == resolution.path and cached.probed == resolution.probed  # aus dem ResolutionCache
+
+    target_dir = os.path.dirname(resolution.path)
+    os.remove(resolution.path)
+    stat = os.stat(target_dir)
+    os.utime(target_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert not resolution.is_current(root)